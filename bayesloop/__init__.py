@@ -16,3 +16,4 @@ from .parser import Parser
 from .helper import cint, oint
 from .jeffreys import getJeffreysPrior, computeJeffreysPriorAR1
 from .fileIO import save, load
+from .parallel import WorkerPool
@@ -23,22 +23,81 @@ import sympy.stats
 from copy import copy, deepcopy
 from collections import OrderedDict, Iterable
 from inspect import getargspec
+import tempfile
+import os
+import time
+import multiprocessing
 from tqdm import tqdm, tqdm_notebook
-from .helper import assignNestedItem, recursiveIndex, flatten, createColormap, oint, cint, freeSymbols
+from .helper import assignNestedItem, recursiveIndex, flatten, createColormap, oint, cint, freeSymbols, HyperGrid, \
+    SegmentCache
 from .preprocessing import movingWindow
 from .observationModels import ObservationModel
 from .transitionModels import TransitionModel, CombinedTransitionModel, SerialTransitionModel
 from .exceptions import ConfigurationError, PostProcessingError
+from .fileIO import _writeCheckpoint, _readCheckpoint
 from .parser import Parser
 
+# study that is fitted by the worker processes of the 'multiprocessing' backend of HyperStudy.fit (worker processes are
+# forked after it is set, so that they share its data, parameter grid and likelihood values with the main process)
+_forkedStudy = None
+
+
+def _forkedParallelFit(args):
+    """
+    Fits a part of the hyper-grid values of the study that has been shared with the worker processes of the
+    'multiprocessing' backend of HyperStudy.fit.
+
+    Args:
+        args(tuple): Arguments of HyperStudy._parallelFit
+
+    Returns:
+        tuple: Reductions of the partial fit (see HyperStudy._getFitReductions)
+    """
+    evidenceOnly = args[3]
+    return _forkedStudy._parallelFit(*args)._getFitReductions(averages=not evidenceOnly)
+
 
 class Study(object):
     """
     Fits with fixed hyper-parameters and hyper-parameter optimization. This class implements a
     forward-backward-algorithm for analyzing time series data using hierarchical models. For efficient computation,
     all parameter distributions are discretized on a parameter grid.
+
+    Args:
+        silent(bool): If set to True, no output is generated on creation of the study.
+        likelihoodCacheSize(float): Maximal size (in megabytes) of the array of likelihood values that is computed
+            once per fit and re-used in the backward pass. If the likelihood values of all time steps exceed this
+            size, they are re-computed in the backward pass instead.
+        logSpace(bool): If set to True, the fit method multiplies likelihood values and normalizes the parameter
+            distributions in log-space. This avoids aborted fits due to numerical underflow if the likelihood of single
+            data points is extremely small (e.g. for high-count data), at the cost of a slower fit.
+        storageDirectory(str): If a directory is specified, the sequence of posterior distributions (and the average
+            posterior sequence of hyper-studies) is stored in a memory-mapped file in this directory instead of the
+            main memory. This allows to analyze long data sets on large parameter grids.
+        marginalsOnly(bool): If set to True, the fit method only stores the marginal posterior distribution of each
+            parameter (and the posterior mean values) instead of the joint posterior distribution for each time step.
+            Methods that rely on the joint distribution (e.g. eval, simulate) are not available in this case. The
+            forward pass then also stores joint distributions only at checkpoints (see checkpointInterval), so that
+            peak memory consumption grows with sqrt(T) instead of T.
+        checkpointInterval(int, str): If only marginal distributions are stored (see marginalsOnly), the forward pass
+            only stores every k-th forward distribution (k = checkpointInterval) and re-computes the intermediate ones
+            segment by segment during the backward pass. If set to 'auto' (or None, the default), k is set to the
+            square root of the number of time steps, so that memory consumption grows with sqrt(T) instead of T. If
+            set to 1, all forward distributions are stored and none are re-computed. For these fits, no likelihood
+            cache is created (see likelihoodCacheSize), only the likelihood values of the re-computed segment are kept
+            in memory (a cache that is shared among the hyper-grid values of a HyperStudy is still used). Setting a
+            checkpoint interval without marginalsOnly raises a ConfigurationError, as the joint distributions of
+            all time steps are stored in this case.
+        posteriorCallback: Function that is called with the time stamp and the joint posterior distribution for each
+            time step during the backward pass (i.e. in reversed order). Can be used to process the joint posterior
+            distributions of fits that only store marginal distributions, in which case the joint distributions are
+            re-computed from checkpoints (see checkpointInterval).
+        dtype: Floating point type of the parameter grid, likelihood values and (stored) parameter distributions. Using
+            np.float32 halves memory consumption, while (log-)evidence values are still accumulated in double
+            precision.
     """
-    def __init__(self, silent=False):
+    def __init__(self, silent=False, likelihoodCacheSize=1000., logSpace=False, storageDirectory=None,
+                 marginalsOnly=False, checkpointInterval=None, posteriorCallback=None, dtype=np.float64):
         self.observationModel = None
         self.transitionModel = None
 
@@ -54,13 +113,28 @@ class Study(object):
         self.formattedTimestamps = None
 
         self.posteriorSequence = []
+        self.marginalPosteriorSequences = []
         self.posteriorMeanValues = []
+        self.posteriorVarianceValues = []
         self.logEvidence = 0
         self.localEvidence = []
 
         self.selectedHyperParameters = []
         self.fitWarningCounter = 0
 
+        self.likelihoodCacheSize = likelihoodCacheSize
+        self.likelihoodCache = None
+        self.likelihoodCacheShared = False
+        self.pruningThreshold = None
+        self.prunedTimeStep = None
+        self.logEvidenceTrajectory = None
+        self.logSpace = logSpace
+        self.storageDirectory = storageDirectory
+        self.marginalsOnly = marginalsOnly
+        self.checkpointInterval = checkpointInterval
+        self.posteriorCallback = posteriorCallback
+        self.dtype = dtype
+
         if not silent:
             print('+ Created new study.')
 
@@ -161,8 +235,8 @@ class Study(object):
             else:  # equally spaced (regular grid)
                 self.latticeConstant.append(np.abs(v[0] - v[1]))
 
-        # create grid
-        self.grid = [m for m in np.meshgrid(*self.marginalGrid, indexing='ij')]
+        # create open grid (arrays broadcast against each other, without storing values for the full grid)
+        self.grid = [m.astype(self.dtype) for m in np.meshgrid(*self.marginalGrid, indexing='ij', sparse=True)]
 
         # if observation model is updated, transition model must know the new lattice constant
         if self.transitionModel is not None:
@@ -198,11 +272,11 @@ class Study(object):
             prior /= np.prod(self.latticeConstant)  # convert to prob. density
             if not silent:
                 print('    + Set uniform prior with parameter boundaries.')
-            return prior
+            return np.asarray(prior, dtype=self.dtype)
 
         # check whether correctly shaped numpy array is provided
         if isinstance(prior, np.ndarray):
-            if np.all(prior.shape == self.grid[0].shape):
+            if prior.shape == tuple(self.gridSize):
                 norm = np.sum(prior)
                 if norm != 1.:
                     prior /= norm
@@ -212,7 +286,7 @@ class Study(object):
                 else:
                     if not silent:
                         print('    + Set prior (numpy array).')
-                return prior
+                return np.asarray(prior, dtype=self.dtype)
             else:
                 raise ConfigurationError('Prior array does not match parameter grid size.')
 
@@ -228,7 +302,7 @@ class Study(object):
             else:
                 if not silent:
                     print('    + Set prior (function): {}'.format(prior.__name__))
-            return values
+            return np.asarray(values, dtype=self.dtype)
 
         # check whether single random variable is provided
         if type(prior) is sympy.stats.rv.RandomSymbol:
@@ -254,7 +328,8 @@ class Study(object):
             # set density as lambda function
             if not silent:
                 print('    + Set prior (sympy): {}'.format(pdf))
-            return lambdify(x, pdf, modules=['numpy', {'factorial': factorial, 'beta': beta_func}])(*self.grid)
+            values = lambdify(x, pdf, modules=['numpy', {'factorial': factorial, 'beta': beta_func}])(*self.grid)
+            return np.asarray(values*np.ones(self.gridSize), dtype=self.dtype)  # broadcast values to full grid
 
     def setTransitionModel(self, T, silent=False):
         """
@@ -343,16 +418,44 @@ class Study(object):
         if not silent:
             print('    + Formatted data.')
 
-        # initialize array for posterior distributions
-        if not evidenceOnly:
-            self.posteriorSequence = np.empty([len(self.formattedData)]+self.gridSize)
+        # forward distributions are only stored at checkpoints if only marginal distributions are needed
+        checkpointInterval = None
+        checkpoints = None
+        if self.marginalsOnly and not (forwardOnly or evidenceOnly):
+            checkpointInterval = self._getCheckpointInterval()
+            checkpoints = self._allocateSequence([int(np.ceil(len(self.formattedData)/checkpointInterval))] +
+                                                 self.gridSize)
+
+        # initialize array for posterior distributions (the joint distributions are also needed for the backward pass
+        # if only marginal distributions are stored)
+        self.posteriorSequence = []
+        self.marginalPosteriorSequences = []
+        if not (evidenceOnly or (forwardOnly and self.marginalsOnly) or checkpoints is not None):
+            self.posteriorSequence = self._allocateSequence([len(self.formattedData)]+self.gridSize)
+        if self.marginalsOnly and not evidenceOnly:
+            self.marginalPosteriorSequences = [np.empty([len(self.formattedData), n], dtype=self.dtype)
+                                               for n in self.gridSize]
 
         # initialize array for computed evidence (marginal likelihood)
         self.logEvidence = 0
         self.localEvidence = np.empty(len(self.formattedData))
 
+        # the running log-evidence is recorded if the fit may be pruned (see HyperStudy.fit)
+        self.prunedTimeStep = None
+        if self.pruningThreshold is not None:
+            self.logEvidenceTrajectory = np.empty(len(self.formattedData))
+
         # set prior distribution for forward-pass
         alpha = self._computePrior(silent=silent)
+        if self.logSpace:
+            with np.errstate(divide='ignore'):
+                alpha = np.log(alpha)
+
+        # likelihood values are needed in both forward and backward pass, compute them only once if memory permits
+        # (a cache that is shared among multiple fits, e.g. by a HyperStudy, is used as is; with checkpoints, the
+        # likelihood values are kept for the re-computed segment only)
+        if not (forwardOnly or evidenceOnly or self.likelihoodCacheShared or checkpoints is not None):
+            self._createLikelihoodCache(silent=silent)
 
         # show progressbar if silent=False
         if not silent:
@@ -367,44 +470,61 @@ class Study(object):
         # forward pass
         for i in enum:
 
-            # compute likelihood
-            likelihood = self.observationModel.processedPdf(self.grid, self.formattedData[i])
-
-            # force dtype float on likelihood (in case it is of dtype object)
-            if likelihood.dtype == np.object:
-                likelihood = likelihood.astype(np.float)
-
-            # update alpha based on likelihood
-            alpha *= likelihood
+            # compute likelihood (log-likelihood for fits in log-space)
+            likelihood = self._computeLikelihood(i)
+
+            if self.logSpace:
+                # update log-alpha based on log-likelihood, normalization constant is computed using log-sum-exp
+                alpha += likelihood
+                with np.errstate(divide='ignore'):
+                    logNorm = np.float64(logsumexp(alpha))
+                valid = np.isfinite(logNorm)
+                if valid:
+                    alpha -= logNorm
+            else:
+                # update alpha based on likelihood
+                alpha *= likelihood
 
-            # normalization constant of alpha is used to compute evidence
-            norm = np.sum(alpha)
+                # normalize alpha (for numerical stability), the normalization constant is used to compute evidence
+                norm = self._normalizeDistribution(alpha)
+                valid = norm > 0.
+                if valid:
+                    logNorm = np.log(norm)
 
-            # normalize alpha (for numerical stability)
-            if norm > 0.:
-                alpha /= norm
-            else:
+            if not valid:
                 # if all probability values are zero, normalization is not possible
-                if self.fitWarningCounter < 5:
-                    print('    ! WARNING: Forward pass distribution contains only zeros, check parameter boundaries!')
-                    print('      Stopping inference process. Setting model evidence to zero.')
-                elif self.fitWarningCounter == 5:
-                    print('    ! WARNING: Will omit further warnings about parameter boundaries.')
-
-                self.fitWarningCounter += 1
+                self._warnEmptyDistribution('Forward pass')
                 self.logEvidence = -np.inf
+                self._releaseLikelihoodCache()
                 return
 
             # update log-evidence and compute local evidence
-            self.logEvidence += np.log(norm)
-            self.localEvidence[i] = norm * np.prod(self.latticeConstant)  # integration yields evidence, not only sum
+            self.logEvidence += logNorm
+            self.localEvidence[i] = np.exp(logNorm) * np.prod(self.latticeConstant)  # integration yields evidence
+
+            # abandon fit if the running log-evidence falls below the pruning threshold; the log-evidence is left at
+            # its running value (see HyperStudy._fitHyperGridValue)
+            if self.pruningThreshold is not None:
+                self.logEvidenceTrajectory[i] = self.logEvidence
+                if self.logEvidence < self.pruningThreshold[i]:
+                    self.prunedTimeStep = i
+                    self._releaseLikelihoodCache()
+                    return
 
-            # alphas are stored as preliminary posterior distributions
-            if not evidenceOnly:
+            # alphas are stored as preliminary posterior distributions (in log-space for fits in log-space)
+            if forwardOnly and self.marginalsOnly:
+                self._storeMarginalDistributions(i, np.exp(alpha) if self.logSpace else alpha)
+            elif checkpoints is not None:
+                if i % checkpointInterval == 0:
+                    checkpoints[i // checkpointInterval] = alpha
+            elif not evidenceOnly:
                 self.posteriorSequence[i] = alpha
 
             # compute alpha for next iteration
-            alpha = self.transitionModel.computeForwardPrior(alpha, self.formattedTimestamps[i])
+            if self.logSpace:
+                alpha = self._computeLogPrior(alpha, self.formattedTimestamps[i])
+            else:
+                alpha = self.transitionModel.computeForwardPrior(alpha, self.formattedTimestamps[i])
 
         # remove progressbar correctly
         if not silent:
@@ -420,10 +540,13 @@ class Study(object):
             if self.observationModel.prior is not None:
                 beta = self._computePrior(silent=True)
             else:
-                beta = np.ones(self.gridSize)  # flat prior
+                beta = np.ones(self.gridSize, dtype=self.dtype)  # flat prior
 
             # normalize beta (for numerical stability only)
             beta /= np.sum(beta)
+            if self.logSpace:
+                with np.errstate(divide='ignore'):
+                    beta = np.log(beta)
 
             # show progressbar if silent=False
             if not silent:
@@ -436,60 +559,374 @@ class Study(object):
                 enum = np.arange(0, len(self.formattedData))[::-1]
 
             # backward pass
+            segmentStart = len(self.formattedData)
             for i in enum:
-                # posterior ~ alpha*beta
-                self.posteriorSequence[i] *= beta  # alpha*beta
-
-                # normalize posterior wrt the parameters
-                norm = np.sum(self.posteriorSequence[i])
-                if norm > 0.:
-                    self.posteriorSequence[i] /= np.sum(self.posteriorSequence[i])
+                # forward distribution of current time step (posterior is computed in place)
+                if checkpoints is None:
+                    posterior = self.posteriorSequence[i]
                 else:
-                    # if all posterior probabilities are zero, normalization is not possible
-                    if self.fitWarningCounter < 5:
-                        print('    ! WARNING: Posterior distribution contains only zeros, check parameter boundaries!')
-                        print('      Stopping inference process. Setting model evidence to zero.')
-                    elif self.fitWarningCounter == 5:
-                        print('    ! WARNING: Will omit further warnings about parameter boundaries.')
+                    # re-compute forward distributions of current segment from last checkpoint
+                    if i < segmentStart:
+                        segmentStart = i - i % checkpointInterval
+                        segment, segmentLikelihoods = \
+                            self._recomputeForwardDistributions(checkpoints[i // checkpointInterval], segmentStart,
+                                                                i + 1)
+                    posterior = segment[i - segmentStart]
+
+                if self.logSpace:
+                    # log-posterior ~ log-alpha + log-beta
+                    logPosterior = posterior + beta
+
+                    # normalize posterior wrt the parameters and convert it back from log-space
+                    with np.errstate(divide='ignore'):
+                        logNorm = logsumexp(logPosterior)
+                    valid = np.isfinite(logNorm)
+                    if valid:
+                        logPosterior -= logNorm
+                        posterior[...] = np.exp(logPosterior)
+                else:
+                    # posterior ~ alpha*beta
+                    posterior *= beta  # alpha*beta
 
-                    self.fitWarningCounter += 1
+                    # normalize posterior wrt the parameters
+                    valid = self._normalizeDistribution(posterior) > 0.
+
+                if not valid:
+                    # if all posterior probabilities are zero, normalization is not possible
+                    self._warnEmptyDistribution('Posterior')
                     self.logEvidence = -np.inf
+                    self._releaseLikelihoodCache()
                     return
 
-                # re-compute likelihood
-                likelihood = self.observationModel.processedPdf(self.grid, self.formattedData[i])
+                if self.marginalsOnly:
+                    self._storeMarginalDistributions(i, posterior)
+                if self.posteriorCallback is not None:
+                    self.posteriorCallback(self.formattedTimestamps[i], posterior)
 
-                # force dtype float on likelihood (in case it is of dtype object)
-                if likelihood.dtype == np.object:
-                    likelihood = likelihood.astype(np.float)
+                # re-use (or re-compute) likelihood
+                if checkpoints is None:
+                    likelihood = self._computeLikelihood(i)
+                else:
+                    likelihood = segmentLikelihoods[i - segmentStart]
 
-                # compute local evidence
-                with np.errstate(invalid='ignore'):
-                    self.localEvidence[i] = 1./(np.sum(self.posteriorSequence[i]/likelihood) *
-                                                np.prod(self.latticeConstant))  # integration, not only sum
+                if self.logSpace:
+                    # compute local evidence
+                    with np.errstate(invalid='ignore'):
+                        self.localEvidence[i] = np.exp(-logsumexp(logPosterior - likelihood)) / \
+                                                np.prod(self.latticeConstant)  # integration, not only sum
+
+                    # compute (normalized) log-beta for next iteration
+                    beta = self._computeLogPrior(beta + likelihood, self.formattedTimestamps[i], backward=True)
+                else:
+                    # compute local evidence
+                    with np.errstate(invalid='ignore'):
+                        self.localEvidence[i] = 1./(np.sum(posterior/likelihood) *
+                                                    np.prod(self.latticeConstant))  # integration, not only sum
 
-                # compute beta for next iteration
-                beta = self.transitionModel.computeBackwardPrior(beta*likelihood, self.formattedTimestamps[i])
+                    # compute beta for next iteration
+                    beta = self.transitionModel.computeBackwardPrior(beta*likelihood, self.formattedTimestamps[i])
 
-                # normalize beta (for numerical stability)
-                beta /= np.sum(beta)
+                    # normalize beta (for numerical stability)
+                    beta /= np.sum(beta)
+
+            # release likelihood values (to keep memory consumption and file size small)
+            self._releaseLikelihoodCache()
+
+            # release joint posterior distributions if only marginal distributions are stored
+            if self.marginalsOnly:
+                self.posteriorSequence = []
 
             if not silent:
                 enum.close()  # remove progressbar correctly
                 print('    + Finished backward pass.')
+        elif self.logSpace and not (evidenceOnly or self.marginalsOnly):
+            # convert filtering distributions back from log-space
+            np.exp(self.posteriorSequence, out=self.posteriorSequence)
 
         # posterior mean values do not need to be computed for evidence
         if evidenceOnly:
             self.posteriorMeanValues = []
+            self.posteriorVarianceValues = []
         else:
-            self.posteriorMeanValues = np.empty([len(self.grid), len(self.posteriorSequence)])
-
-            for i in range(len(self.grid)):
-                self.posteriorMeanValues[i] = np.array([np.sum(p*self.grid[i]) for p in self.posteriorSequence])
+            self.posteriorMeanValues, self.posteriorVarianceValues = self._computePosteriorMoments()
 
             if not silent:
                 print('    + Computed mean parameter values.')
 
+    def _getCheckpointInterval(self):
+        """
+        Returns the number of time steps between two stored forward distributions, as specified by the attribute
+        'checkpointInterval' (the square root of the number of time steps if it is set to 'auto' or None).
+
+        Returns:
+            int: Checkpoint interval
+        """
+        if self.checkpointInterval is None or self.checkpointInterval == 'auto':
+            return max(1, int(np.ceil(np.sqrt(len(self.formattedData)))))
+
+        try:
+            checkpointInterval = int(self.checkpointInterval)
+        except (TypeError, ValueError):
+            checkpointInterval = 0
+        if checkpointInterval < 1 or checkpointInterval != self.checkpointInterval:
+            raise ConfigurationError('Checkpoint interval must be a positive integer or "auto", got {}.'
+                                     .format(self.checkpointInterval))
+        return checkpointInterval
+
+    def _recomputeForwardDistributions(self, checkpoint, start, stop):
+        """
+        Re-computes the normalized forward distributions (alphas) of the time indices from start to stop-1, based on
+        the stored forward distribution at time index start. This method is used by the fit method if forward
+        distributions are only stored at checkpoints (see attribute 'checkpointInterval'). The likelihood values of
+        the segment are returned as well, so that the backward pass does not need to re-compute them.
+
+        Args:
+            checkpoint(ndarray): Forward distribution of time index start (in log-space for fits in log-space)
+            start(int): First time index
+            stop(int): Time index after the last time index
+
+        Returns:
+            ndarray, ndarray: Forward distributions and likelihood values (log-likelihood values for fits in log-space;
+                first axis enumerates time steps from start to stop-1)
+        """
+        alphas = np.empty([stop - start] + self.gridSize, dtype=self.dtype)
+        likelihoods = np.empty([stop - start] + self.gridSize, dtype=self.dtype)
+        alphas[0] = checkpoint
+        likelihoods[0] = self._computeLikelihood(start)
+        for j in range(start + 1, stop):
+            t = self.formattedTimestamps[j - 1]
+            likelihoods[j - start] = self._computeLikelihood(j)
+
+            if self.logSpace:
+                alpha = self._computeLogPrior(alphas[j - start - 1], t) + likelihoods[j - start]
+                alphas[j - start] = alpha - logsumexp(alpha)
+            else:
+                alpha = self.transitionModel.computeForwardPrior(alphas[j - start - 1], t) * likelihoods[j - start]
+                alphas[j - start] = alpha / np.sum(alpha)
+
+        return alphas, likelihoods
+
+    def _storeMarginalDistributions(self, i, posterior):
+        """
+        Reduces the joint posterior distribution of time index i to the marginal distributions of all parameters and
+        stores them in the attribute 'marginalPosteriorSequences'.
+
+        Args:
+            i(int): Time index
+            posterior(ndarray): Joint parameter distribution of time index i
+        """
+        for j in range(len(self.gridSize)):
+            axesToMarginalize = tuple(k for k in range(len(self.gridSize)) if k != j)
+            self.marginalPosteriorSequences[j][i] = np.sum(posterior, axis=axesToMarginalize)
+
+    def _computePosteriorMoments(self):
+        """
+        Computes the posterior mean values and variances of all parameters for all time steps. The joint posterior
+        distributions are reduced to marginal distributions in a single pass over blocks of time steps (so that
+        memory-mapped posterior sequences are only read once), and the moments are computed from the marginal
+        distributions. If only marginal distributions are stored (see attribute 'marginalsOnly'), these are used
+        directly.
+
+        Returns:
+            ndarray, ndarray: Posterior mean values and variances (first axis enumerates parameters, second axis
+                enumerates time steps)
+        """
+        if len(self.posteriorSequence) == 0:
+            marginals = self.marginalPosteriorSequences
+        else:
+            marginals = [np.empty([len(self.posteriorSequence), n]) for n in self.gridSize]
+            blockSize = max(1, int(2**23/np.prod(self.gridSize)))
+            for i in range(0, len(self.posteriorSequence), blockSize):
+                block = self.posteriorSequence[i:i+blockSize]
+                for j in range(len(self.gridSize)):
+                    axesToMarginalize = tuple(k + 1 for k in range(len(self.gridSize)) if k != j)  # axis 0 is time
+                    marginals[j][i:i+blockSize] = np.sum(block, axis=axesToMarginalize)
+
+        means = np.array([np.dot(marginal, x) for marginal, x in zip(marginals, self.marginalGrid)])
+        variances = np.array([np.sum(marginal*(x - mean[:, None])**2., axis=1)
+                              for marginal, x, mean in zip(marginals, self.marginalGrid, means)])
+
+        return means, variances
+
+    def _getMarginalPosteriorSequence(self, paramIndex, timeIndex=None):
+        """
+        Returns the sequence of marginal posterior distributions of a single parameter (or the marginal distribution
+        of a single time step), computed either from the joint posterior distributions or taken from the stored
+        marginal distributions (see attribute 'marginalsOnly').
+
+        Args:
+            paramIndex(int): Index of the parameter
+            timeIndex(int): Index of a single time step (optional)
+
+        Returns:
+            ndarray: Marginal probability values (first axis enumerates time steps if no time index is given)
+        """
+        if len(self.posteriorSequence) == 0:
+            if len(self.marginalPosteriorSequences) == 0:
+                raise PostProcessingError('Cannot plot posterior sequence as it has not yet been computed. '
+                                          'Run complete fit.')
+            if timeIndex is None:
+                return self.marginalPosteriorSequences[paramIndex].copy()
+            return self.marginalPosteriorSequences[paramIndex][timeIndex].copy()
+
+        axesToMarginalize = [k for k in range(len(self.gridSize)) if k != paramIndex]
+        if timeIndex is None:
+            return np.sum(self.posteriorSequence, axis=tuple(k + 1 for k in axesToMarginalize))  # axis 0 is time
+        return np.sum(self.posteriorSequence[timeIndex], axis=tuple(axesToMarginalize))
+
+    def _normalizeDistribution(self, distribution):
+        """
+        Normalizes a parameter distribution in place, or a batch of parameter distributions that carry an additional
+        leading axis (see HyperStudy._fitBatch). Distributions that contain only zeros are left unchanged.
+
+        Args:
+            distribution(ndarray): Parameter distribution(s) on the parameter grid
+
+        Returns:
+            float, ndarray: Normalization constant(s) (always in double precision)
+        """
+        axes = tuple(range(distribution.ndim - len(self.gridSize), distribution.ndim))
+        norm = np.sum(distribution, axis=axes, dtype=np.float64)
+        distribution /= np.where(norm > 0., norm, 1.)[(Ellipsis,) + (None,)*len(self.gridSize)]
+        return norm
+
+    def _warnEmptyDistribution(self, kind, count=1):
+        """
+        Prints a warning for fits that are stopped because a parameter distribution contains only zeros. Only the
+        first five warnings of a study are printed (see attribute 'fitWarningCounter').
+
+        Args:
+            kind(str): Type of the parameter distribution ('Forward pass' or 'Posterior')
+            count(int): Number of stopped fits
+        """
+        for counter in range(self.fitWarningCounter, min(self.fitWarningCounter + count, 6)):
+            if counter < 5:
+                print('    ! WARNING: {} distribution contains only zeros, check parameter boundaries!'.format(kind))
+                print('      Stopping inference process. Setting model evidence to zero.')
+            else:
+                print('    ! WARNING: Will omit further warnings about parameter boundaries.')
+        self.fitWarningCounter += count
+
+    def _computeLikelihood(self, i):
+        """
+        Returns the likelihood of the data segment at time index i, evaluated on the parameter grid. Values are taken
+        from the likelihood cache if it is available, and are computed using the observation model otherwise. For fits
+        in log-space (see attribute 'logSpace'), the log-likelihood is returned instead.
+
+        Args:
+            i(int): Time index of the data segment
+
+        Returns:
+            ndarray: Likelihood values (with same shape as grid)
+        """
+        if self.likelihoodCache is not None:
+            return self.likelihoodCache[i]
+
+        if self.logSpace:
+            likelihood = self.observationModel.processedLogPdf(self.grid, self.formattedData[i])
+        else:
+            likelihood = self.observationModel.processedPdf(self.grid, self.formattedData[i])
+
+        # force floating point type of study on likelihood (also in case it is of dtype object)
+        return likelihood.astype(self.dtype, copy=False)
+
+    def _createLikelihoodCache(self, silent=False):
+        """
+        Computes the likelihood values of all data segments once and stores them in the attribute 'likelihoodCache',
+        so that the forward and backward pass of the fit method do not need to evaluate the observation model twice.
+        If the array of likelihood values exceeds the size given by the attribute 'likelihoodCacheSize' (in megabytes),
+        no cache is created and the likelihood values are re-computed in the backward pass.
+
+        Args:
+            silent(bool): If set to True, no output is generated by this method.
+        """
+        self.likelihoodCache = None
+
+        cacheSize = len(self.formattedData)*np.prod(self.gridSize)*np.dtype(self.dtype).itemsize/2.**20
+        if cacheSize > self.likelihoodCacheSize:
+            if not silent:
+                print('    + Likelihood values ({:.1f} MB) exceed cache size ({:.1f} MB), will re-compute them in '
+                      'backward pass.'.format(cacheSize, self.likelihoodCacheSize))
+            return
+
+        # evaluate observation model for blocks of data segments (block size is chosen such that intermediate arrays
+        # of the vectorized pdf stay below ~64 MB)
+        likelihoodCache = np.empty([len(self.formattedData)] + self.gridSize, dtype=self.dtype)
+        batchSize = max(1, int(2**23/np.prod(self.gridSize)))
+        if self.logSpace:
+            pdfBatch = self.observationModel.processedLogPdfBatch
+        else:
+            pdfBatch = self.observationModel.processedPdfBatch
+        for i in range(0, len(self.formattedData), batchSize):
+            likelihoodCache[i:i+batchSize] = pdfBatch(self.grid, self.formattedData[i:i+batchSize])
+
+        self.likelihoodCache = likelihoodCache
+
+    def _releaseLikelihoodCache(self):
+        """
+        Releases the likelihood cache after a fit, to keep memory consumption and file size small. A cache that is
+        shared among multiple fits (see attribute 'likelihoodCacheShared') is kept, it is released by the owner.
+        """
+        if not self.likelihoodCacheShared:
+            self.likelihoodCache = None
+
+    def _allocateSequence(self, shape):
+        """
+        Allocates an (uninitialized) array for a sequence of parameter distributions. If the attribute
+        'storageDirectory' is set, the array is backed by a memory-mapped file in this directory. The file is removed
+        from the directory right away (on POSIX systems), so that its disk space is freed once the array is deleted.
+
+        Args:
+            shape(list): Shape of the array
+
+        Returns:
+            ndarray: Array (or memory-mapped array) of the given shape
+        """
+        if self.storageDirectory is None:
+            return np.empty(shape, dtype=self.dtype)
+
+        fileDescriptor, path = tempfile.mkstemp(prefix='bayesloop_', suffix='.dat', dir=self.storageDirectory)
+        os.close(fileDescriptor)
+        sequence = np.memmap(path, dtype=self.dtype, mode='w+', shape=tuple(shape))
+        try:
+            os.remove(path)
+        except OSError:  # open files cannot be removed on Windows
+            pass
+
+        return sequence
+
+    def _computeLogPrior(self, logPosterior, t, backward=False):
+        """
+        Applies the transition model to a parameter distribution given in log-space (used by the fit method for fits
+        in log-space). Static transition models leave the distribution untouched; all other transition models are
+        applied to the distribution in linear space. As in the linear-space fit, the backward prior is computed from
+        the unnormalized distribution (some transition models, e.g. RegimeSwitch, depend on its scale) as long as its
+        normalization constant can be represented in linear space; otherwise, the distribution is normalized first.
+
+        Args:
+            logPosterior(ndarray): Logarithm of the (unnormalized) parameter distribution
+            t: Timestamp of the current time step
+            backward(bool): If set to True, the backward prior is computed, forward prior otherwise.
+
+        Returns:
+            ndarray: Logarithm of the normalized prior distribution for the next time step
+        """
+        logNorm = logsumexp(logPosterior)
+        if str(self.transitionModel) == 'Static/constant parameter values':
+            return logPosterior - logNorm
+
+        if backward and np.abs(logNorm) < 300.:
+            posterior = np.exp(logPosterior)
+        else:
+            posterior = np.exp(logPosterior - logNorm)
+        if backward:
+            prior = self.transitionModel.computeBackwardPrior(posterior, t)
+        else:
+            prior = self.transitionModel.computeForwardPrior(posterior, t)
+
+        with np.errstate(divide='ignore'):
+            return np.log(prior) - np.log(np.sum(prior))
+
     def optimize(self, parameterList=[], forwardOnly=False, **kwargs):
         """
         Uses the COBYLA minimization algorithm from SciPy to perform a maximization of the log-evidence with respect
@@ -588,6 +1025,10 @@ class Study(object):
             raise NotImplementedError('Method "simulate" is only available for observation models with '
                                       'segment length 1.')
 
+        if self.marginalsOnly:
+            raise PostProcessingError('Method "simulate" needs the joint posterior distributions, which are not '
+                                      'stored if "marginalsOnly" is set to True.')
+
         # if no time is provided, use time-averaged posterior distribution
         if t is None:
             post = np.sum(self.posteriorSequence, axis=0) / len(self.posteriorSequence)
@@ -599,7 +1040,7 @@ class Study(object):
             post = self.posteriorSequence[timeIndex]
 
         # compute distribution of observations/data at the given points x
-        prob = np.array([np.sum(self.observationModel.pdf(self.grid, [xi]) * post) for xi in x])
+        prob = np.array([np.sum(self.observationModel.processedPdf(self.grid, np.array([xi])) * post) for xi in x])
 
         if not density:
             prob /= np.sum(prob)
@@ -866,6 +1307,44 @@ class Study(object):
 
         return self.posteriorMeanValues[paramIndex]
 
+    def getParameterVarianceValues(self, name):
+        """
+        Returns posterior variances for a parameter of the observation model.
+
+        Args:
+            name(str): Name of the parameter to display
+
+        Returns:
+            ndarray: array of posterior variances for the selected parameter
+        """
+        if len(self.posteriorVarianceValues) == 0:
+            raise PostProcessingError('Posterior variances have not yet been computed. Run complete fit.')
+
+        # get parameter index
+        paramIndex = -1
+        for i, n in enumerate(self.observationModel.parameterNames):
+            if n == name:
+                paramIndex = i
+
+        # check if match was found
+        if paramIndex == -1:
+            raise PostProcessingError('Wrong parameter name. Available options: {0}'
+                                      .format(self.observationModel.parameterNames))
+
+        return self.posteriorVarianceValues[paramIndex]
+
+    def getParameterStdValues(self, name):
+        """
+        Returns posterior standard deviations for a parameter of the observation model.
+
+        Args:
+            name(str): Name of the parameter to display
+
+        Returns:
+            ndarray: array of posterior standard deviations for the selected parameter
+        """
+        return np.sqrt(self.getParameterVarianceValues(name))
+
     def getParameterDistribution(self, t, name, plot=False, density=True, **kwargs):
         """
         Compute the marginal parameter distribution at a given time step.
@@ -882,22 +1361,6 @@ class Study(object):
             ndarray, ndarray: The first array contains the parameter values, the second one the corresponding
                 probability (density) values
         """
-        if self.posteriorSequence == []:
-            raise PostProcessingError('Cannot plot posterior sequence as it has not yet been computed. '
-                                      'Run complete fit.')
-
-        if t == 'avg':
-            # compute time-averaged posterior distribution
-            dist = np.sum(self.posteriorSequence, axis=0)/len(self.posteriorSequence)
-        else:
-            # check if supplied time stamp exists
-            if t not in self.formattedTimestamps:
-                raise PostProcessingError('Supplied time ({}) does not exist in data or is out of range.'.format(t))
-            timeIndex = list(self.formattedTimestamps).index(t)  # to select corresponding posterior distribution
-
-            # select posterior distribution of speciifed time step
-            dist = self.posteriorSequence[timeIndex]
-
         # get parameter index
         paramIndex = -1
         for i, n in enumerate(self.observationModel.parameterNames):
@@ -909,15 +1372,21 @@ class Study(object):
             raise PostProcessingError('Wrong parameter name. Available options: {0}'
                                       .format(self.observationModel.parameterNames))
 
-        axesToMarginalize = list(range(len(self.observationModel.parameterNames)))
-        try:
-            axesToMarginalize.remove(paramIndex)
-        except ValueError:
-            raise PostProcessingError('Wrong parameter index. Available indices: {}'.format(axesToMarginalize))
+        if t == 'avg':
+            # compute time-averaged posterior distribution
+            marginalPosteriorSequence = self._getMarginalPosteriorSequence(paramIndex)
+            marginalDistribution = np.sum(marginalPosteriorSequence, axis=0)/len(marginalPosteriorSequence)
+        else:
+            # check if supplied time stamp exists
+            if t not in self.formattedTimestamps:
+                raise PostProcessingError('Supplied time ({}) does not exist in data or is out of range.'.format(t))
+            timeIndex = list(self.formattedTimestamps).index(t)  # to select corresponding posterior distribution
+
+            # select posterior distribution of specified time step
+            marginalDistribution = self._getMarginalPosteriorSequence(paramIndex, timeIndex=timeIndex)
 
         x = self.marginalGrid[paramIndex]
         dx = self.latticeConstant[paramIndex]
-        marginalDistribution = np.squeeze(np.apply_over_axes(np.sum, dist, axesToMarginalize)).copy()
 
         if density:
             marginalDistribution /= dx
@@ -952,10 +1421,6 @@ class Study(object):
             ndarray, ndarray: The first array contains the parameter values, the second one the sequence of
             corresponding posterior distributions.
         """
-        if self.posteriorSequence == []:
-            raise PostProcessingError('Cannot plot posterior sequence as it has not yet been computed. '
-                                      'Run complete fit.')
-
         dt = self.formattedTimestamps[1:] - self.formattedTimestamps[:-1]
         if not np.all(dt == dt[0]):
             print('! WARNING: Time stamps are not equally spaced. This may result in false plotting of parameter '
@@ -972,17 +1437,9 @@ class Study(object):
             raise PostProcessingError('Wrong parameter name. Available options: {0}'
                                       .format(self.observationModel.parameterNames))
 
-        axesToMarginalize = list(range(1, len(self.observationModel.parameterNames) + 1))  # axis 0 is time
-        try:
-            axesToMarginalize.remove(paramIndex + 1)
-        except ValueError:
-            raise PostProcessingError('Wrong parameter index. Available indices: {}'
-                                      .format(np.array(axesToMarginalize) - 1))
-
         x = self.marginalGrid[paramIndex]
         dx = self.latticeConstant[paramIndex]
-        marginalPosteriorSequence = np.squeeze(
-            np.apply_over_axes(np.sum, self.posteriorSequence, axesToMarginalize)).copy()
+        marginalPosteriorSequence = self._getMarginalPosteriorSequence(paramIndex)
 
         if density:
             marginalPosteriorSequence /= dx
@@ -1009,6 +1466,100 @@ class Study(object):
         """
         return self.getParameterDistributions(name, plot=plot, density=density, **kwargs)
 
+    def getParameterQuantiles(self, name, q=(0.05, 0.5, 0.95)):
+        """
+        Computes quantiles of the marginal posterior distribution of a parameter for all time steps at once. Quantiles
+        are given by the smallest parameter value for which the cumulative distribution reaches the specified
+        probability, i.e. they are limited by the resolution of the parameter grid.
+
+        Args:
+            name(str): Name of the parameter
+            q(float, list, tuple, ndarray): Probability value(s) between 0 and 1
+
+        Returns:
+            ndarray: Quantile values (first axis enumerates probability values if more than one is specified, second
+                axis enumerates time steps)
+        """
+        # get parameter index
+        paramIndex = -1
+        for i, n in enumerate(self.observationModel.parameterNames):
+            if n == name:
+                paramIndex = i
+
+        # check if match was found
+        if paramIndex == -1:
+            raise PostProcessingError('Wrong parameter name. Available options: {0}'
+                                      .format(self.observationModel.parameterNames))
+
+        q = np.array(q, dtype=np.float)
+        if np.any(q < 0.) or np.any(q > 1.):
+            raise PostProcessingError('Quantiles must be specified by probability values between 0 and 1.')
+
+        # cumulative distribution for all time steps
+        cdf = np.cumsum(self._getMarginalPosteriorSequence(paramIndex), axis=1)
+        cdf /= cdf[:, -1:]
+
+        # index of first parameter value with cumulative probability >= q
+        indices = np.sum(cdf[None, :, :] < np.atleast_1d(q)[:, None, None], axis=2)
+        indices = np.minimum(indices, cdf.shape[1] - 1)  # guard against rounding errors for q = 1
+        quantiles = self.marginalGrid[paramIndex][indices]
+
+        return quantiles[0] if q.ndim == 0 else quantiles
+
+    def getParameterCredibleIntervals(self, name, mass=0.9, method='hdi'):
+        """
+        Computes credible intervals of the marginal posterior distribution of a parameter for all time steps at once.
+        Either highest-density intervals (the smallest set of parameter values that contains the specified probability
+        mass; bounds are returned) or equal-tailed intervals (based on quantiles) are computed.
+
+        Args:
+            name(str): Name of the parameter
+            mass(float): Probability mass contained in the credible interval
+            method(str): Either 'hdi' for highest-density intervals or 'equal-tailed' for equal-tailed intervals
+
+        Returns:
+            ndarray, ndarray: The first array contains the lower bounds, the second one the upper bounds of the
+                credible interval for all time steps
+        """
+        if not 0. < mass <= 1.:
+            raise PostProcessingError('Probability mass of credible interval must be larger than 0 and at most 1.')
+
+        if method == 'equal-tailed':
+            lower, upper = self.getParameterQuantiles(name, q=[(1. - mass)/2., 1. - (1. - mass)/2.])
+            return lower, upper
+        elif method != 'hdi':
+            raise PostProcessingError('Unknown method "{}". Available options: "hdi", "equal-tailed"'.format(method))
+
+        # get parameter index
+        paramIndex = -1
+        for i, n in enumerate(self.observationModel.parameterNames):
+            if n == name:
+                paramIndex = i
+
+        # check if match was found
+        if paramIndex == -1:
+            raise PostProcessingError('Wrong parameter name. Available options: {0}'
+                                      .format(self.observationModel.parameterNames))
+
+        marginalPosteriorSequence = self._getMarginalPosteriorSequence(paramIndex)
+        marginalPosteriorSequence /= np.sum(marginalPosteriorSequence, axis=1)[:, None]
+        rows = np.arange(len(marginalPosteriorSequence))[:, None]
+
+        # sort probability values in descending order and include values until the probability mass is reached
+        order = np.argsort(-marginalPosteriorSequence, axis=1)
+        sortedProbabilities = marginalPosteriorSequence[rows, order]
+        included = (np.cumsum(sortedProbabilities, axis=1) - sortedProbabilities) < mass
+
+        # transform selection back to order of parameter values
+        mask = np.zeros(marginalPosteriorSequence.shape, dtype=bool)
+        mask[rows, order] = included
+
+        x = self.marginalGrid[paramIndex]
+        lower = x[np.argmax(mask, axis=1)]
+        upper = x[len(x) - 1 - np.argmax(mask[:, ::-1], axis=1)]
+
+        return lower, upper
+
     def plotParameterEvolution(self, name, color='b', gamma=0.5, **kwargs):
         """
         Extended plot method to display a series of marginal posterior distributions corresponding to a single model
@@ -1021,10 +1572,6 @@ class Study(object):
             gamma(float): exponent for gamma correction of the displayed marginal distribution; default: 0.5
             kwargs: all further keyword-arguments are passed to the plot of the posterior mean values
         """
-        if self.posteriorSequence == []:
-            raise PostProcessingError('Cannot plot posterior sequence as it has not yet been computed. '
-                                      'Run complete fit.')
-
         dt = self.formattedTimestamps[1:] - self.formattedTimestamps[:-1]
         if not np.all(dt == dt[0]):
             print('! WARNING: Time stamps are not equally spaced. This may result in false plotting of parameter '
@@ -1041,13 +1588,7 @@ class Study(object):
             raise PostProcessingError('Wrong parameter name. Available options: {0}'
                                       .format(self.observationModel.parameterNames))
 
-        axesToMarginalize = list(range(1, len(self.observationModel.parameterNames) + 1))  # axis 0 is time
-        try:
-            axesToMarginalize.remove(paramIndex + 1)
-        except ValueError:
-            raise PostProcessingError('Wrong parameter index to plot. Available indices: {}'
-                                      .format(np.array(axesToMarginalize)-1))
-        marginalPosteriorSequence = np.squeeze(np.apply_over_axes(np.sum, self.posteriorSequence, axesToMarginalize))
+        marginalPosteriorSequence = self._getMarginalPosteriorSequence(paramIndex)
 
         # clean up very small probability values, as they may create image artefacts
         pmax = np.amax(marginalPosteriorSequence)
@@ -1119,15 +1660,28 @@ class Study(object):
         if len(duplicates) > 0:
             raise ConfigurationError('Detected duplicate hyper-parameter names: {}.'.format(duplicates))
 
+        # joint distributions of all time steps are stored anyway if marginal distributions are not requested
+        if self.checkpointInterval is not None and not self.marginalsOnly:
+            raise ConfigurationError('A checkpoint interval can only be set if only marginal distributions are stored '
+                                     '(see argument "marginalsOnly").')
+
 
 class HyperStudy(Study):
     """
     Infers hyper-parameter distributions. This class serves as an extension to the basic Study class and allows to
     compute the distribution of hyper-parameters of a given transition model. For further information, see the
     documentation of the fit-method of this class.
+
+    Args:
+        silent(bool): If set to True, no output is generated on creation of the study.
+        segmentCacheSize(float): Maximal size (in megabytes) of the cache of forward passes over data segments between
+            change-points (see SegmentCache). If only the evidence is computed (see argument evidenceOnly of fit), the
+            segments are shared among all combinations of change-point times that contain them. Set to zero to fit
+            each combination end to end.
+        **kwargs: All further keyword-arguments are passed to the Study class.
     """
-    def __init__(self, silent=False):
-        super(HyperStudy, self).__init__(silent=silent)
+    def __init__(self, silent=False, segmentCacheSize=100., **kwargs):
+        super(HyperStudy, self).__init__(silent=silent, **kwargs)
 
         self.hyperGrid = []
         self.hyperGridValues = []
@@ -1136,10 +1690,23 @@ class HyperStudy(Study):
         self.flatHyperParameterNames = []
         self.flatHyperPriors = []
         self.flatHyperPriorValues = []
+        self.hyperPriorScale = 1.
         self.hyperParameterDistribution = None
         self.averagePosteriorSequence = None
+        self.averageMarginalPosteriorSequences = []
+        self.averageLogWeight = -np.inf
         self.logEvidenceList = []
         self.localEvidenceList = []
+        self.prunedList = []
+        self.pruningMargin = None
+        self.pruningReference = None
+        self.prunedIndices = np.array([], dtype=int)
+        self.prunedMass = 0.
+        self.evaluatedIndices = np.array([], dtype=int)
+        self.fitDeadline = None
+        self.segmentCacheSize = segmentCacheSize
+        self.segmentCache = None
+        self.segmentChangepointIndices = []
 
         if not silent:
             print('  --> Hyper-study')
@@ -1147,7 +1714,8 @@ class HyperStudy(Study):
     def _createHyperGrid(self, silent=False):
         """
         Creates an array of hyper-parameter values that are fitted. Also determines grid constants for proper
-        normalisation and computes prior probability (density) values
+        normalisation and computes prior probability (density) values of the individual hyper-parameters. Joint prior
+        values are only computed for the hyper-grid values that are fitted (see fit).
 
         Args:
             silent(bool): If true, no output is produced by this method
@@ -1162,13 +1730,6 @@ class HyperStudy(Study):
             if isinstance(v, str) and v == 'all':
                 self.flatHyperParameters[i] = self.formattedTimestamps[:-1]
 
-        # create hyper-parameter grid
-        temp = np.meshgrid(*self.flatHyperParameters, indexing='ij')
-        if len(self.flatHyperParameterNames) > 0:
-            self.hyperGridValues = np.array([t.ravel() for t in temp]).T
-        else:
-            self.hyperGridValues = np.array([])
-
         # find lattice constants for equally spaced hyper-parameter values
         self.hyperGridConstant = []
         for values in self.flatHyperParameters:
@@ -1238,18 +1799,24 @@ class HyperStudy(Study):
 
             priorValuesList.append(priorValues)
 
-        # create hyper-prior grid
+        # create hyper-parameter grid (combinations of hyper-parameter values and joint hyper-prior values are computed
+        # on demand)
+        self.hyperPriorScale = 1.
         if len(self.flatHyperParameterNames) > 0:
-            temp = np.meshgrid(*priorValuesList, indexing='ij')
-            self.flatHyperPriorValues = np.array([t.ravel() for t in temp]).T
-            self.flatHyperPriorValues = np.prod(self.flatHyperPriorValues, axis=1)  # joint prob. density
+            self.hyperGridValues = HyperGrid(self.flatHyperParameters, priors=priorValuesList)
+            self.flatHyperPriorValues = []
             if not silent and len(self.hyperGridValues) > 1:
                 print('+ Set hyper-prior(s): {}'.format(priorNamesList))
         else:
+            self.hyperGridValues = np.array([])
+
             # we need a dummy value for transition models without hyper-parameters
             self.flatHyperPriorValues = np.array([1])
 
-    def fit(self, forwardOnly=False, evidenceOnly=False, silent=False, nJobs=1, customHyperGrid=False):
+    def fit(self, forwardOnly=False, evidenceOnly=False, silent=False, nJobs=1, customHyperGrid=False,
+            vectorized=False, memoryBudget=1000., backend='auto', pool=None, adaptive=False, coarseStep=4,
+            refinementMass=0.95, pruningMargin=None, timeBudget=None, checkpointDirectory=None,
+            checkpointPeriod=600., resume=False, engine='auto'):
         """
         This method over-rides the according method of the Study-class. It runs the algorithm for equally spaced hyper-
         parameter values as defined by the variable 'hyperGrid'. The posterior sequence represents the average
@@ -1263,11 +1830,91 @@ class HyperStudy(Study):
             evidenceOnly(bool): If set to True, only forward pass is run and evidence is calculated. In contrast to the
                 forwardOnly option, no posterior mean values are computed and no posterior distributions are stored.
             silent(bool): If set to true, reduced output is created by this method.
-            nJobs(int): Number of processes to employ. Multiprocessing is based on the 'pathos' module.
+            nJobs(int): Number of processes to employ (see argument backend). Specialized engines run in a single
+                process (see argument engine).
             customHyperGrid(bool): If set to true, the method "_createHyperGrid" is not called before starting the fit.
                 This is used by the class "ChangepointStudy", which employs a custom version of "_createHyperGrid".
+            vectorized(bool): If set to True, the parameter distributions of multiple hyper-grid values are stacked and
+                processed in a single loop over time steps. This requires a transition model that supports batch
+                transformations (see transitionModels.py) and a fit in linear space. Otherwise, the hyper-grid values
+                are fitted one by one. Not used by specialized engines (see argument engine).
+            memoryBudget(float): Maximal size (in megabytes) of the stacked parameter distributions of a vectorized
+                fit. The number of hyper-grid values that are processed at once is chosen accordingly.
+            backend(str): Multiprocessing backend for nJobs > 1. The 'multiprocessing' backend forks the worker
+                processes from the main process (only available on POSIX systems), so that data, parameter grid and
+                likelihood values are shared instead of copied, and workers only return their evidence values and
+                their partial average posterior sequence. The 'pathos' backend pickles the study and sends it to each
+                worker. 'auto' chooses 'multiprocessing' if available, and 'pathos' otherwise.
+            pool(WorkerPool): Long-lived pool of worker processes (see parallel.py) that is used instead of creating new
+                processes. The study is serialized and sent to the workers of the pool. If nJobs is not set, the
+                hyper-grid values are split among all workers of the pool. Not used by specialized engines (see
+                argument engine).
+            adaptive(bool): If set to True, only every k-th value of each hyper-parameter (k = coarseStep) is fitted
+                first. Subsequently, only the neighborhoods of the coarse hyper-grid values that hold the largest part
+                of the hyper-parameter distribution (see refinementMass) are fitted on the full hyper-grid. All other
+                hyper-grid values are assigned a probability of zero. Accordingly, the log-evidence and the local
+                evidence of the average model only contain the fitted values (the hyper-prior is not re-normalized),
+                i.e. they are lower bounds of the values of a standard fit. Not available for change-point studies.
+            coarseStep(int): Step size of the coarse hyper-grid of an adaptive fit (in units of hyper-grid values).
+            refinementMass(float): Fraction of the probability mass of the coarse hyper-parameter distribution that
+                is refined in an adaptive fit.
+            pruningMargin(float): If set, the forward pass of a hyper-grid value is abandoned as soon as its running
+                log-evidence (plus log-prior) falls more than the given margin (in nats) below the running
+                log-evidence of the most probable hyper-grid value that has been fitted so far (at the same time step).
+                Pruned values are assigned the final log-evidence of this reference value, reduced by their deficit at
+                the time of pruning, so that their weight is at most exp(-pruningMargin) times the weight of the
+                reference value. Pruned values do not contribute to the average posterior sequence and the local
+                evidence. Their indices and their share of the hyper-parameter distribution are stored in the
+                attributes 'prunedIndices' and 'prunedMass'. Not available for vectorized fits.
+            timeBudget(float): If set, the fit is stopped after the given wall-clock time (in seconds). Hyper-grid
+                values are fitted in a space-filling order (coarse lattice first, then refined by bisection, see
+                HyperGrid.spaceFillingOrder), so that a partial fit covers the complete hyper-grid evenly. Values that
+                have not been fitted before the deadline are assigned a probability of zero, the average posterior
+                sequence only contains fitted values. In contrast to an adaptive fit, the hyper-prior is re-normalized
+                among the fitted values to compute the log-evidence and the local evidence of the average model, i.e.
+                both are estimates of the values of a standard fit based on the fitted part of the hyper-grid (and
+                identical to them if all values have been fitted). The deadline is checked before each hyper-grid value
+                (before each batch for vectorized fits), at least one value is fitted per process. Cannot be combined
+                with an adaptive fit.
+            checkpointDirectory(str): If set, the hyper-grid values are fitted in blocks, and after each block a
+                checkpoint is written to this directory. A checkpoint contains the indices, log-evidence values, local
+                evidence values and pruning flags of all fitted hyper-grid values as well as the pruning reference (see
+                pruningMargin) (NumPy .npz file) and the running average posterior sequence (NumPy .npy file). Cannot be
+                combined with an adaptive fit or a time budget.
+            checkpointPeriod(float): Approximate wall-clock time (in seconds) between two checkpoints. The number of
+                hyper-grid values per block is adjusted accordingly.
+            resume(bool): If set to True, the fit is continued from the last checkpoint in the checkpoint directory
+                (if it exists), i.e. only hyper-grid values that have not been fitted yet are fitted. The data, the
+                parameter grid, the hyper-grid and the fit options (including the pruning margin) have to match the ones
+                of the interrupted fit.
+            engine(str): If set to 'auto', specialized engines (that run in a single process) are used where possible.
+                Hyper-grids that only consist of the times of change-points between static segments are evaluated
+                without fitting each combination of change-point times separately: a single change-point by one forward
+                and one backward pass (see _changepointScan), multiple change-points by exact segmentation (see
+                _segmentationFit). Both require consecutive integer time stamps, a fit in linear space that stores joint
+                distributions, no posterior callback and no pruning. Otherwise, serial transition models with at least
+                one break-point are fitted by forward passes that share common prefixes (see _prefixSharingFit), if the
+                fit is evidence-only or forward-only (storing joint distributions), in linear space and without pruning.
+                In all other cases, or if set to 'grid', all hyper-grid values are fitted one by one. The results are
+                identical. Note that the local evidence of full fits (without forwardOnly or evidenceOnly) by exact
+                segmentation takes O(T^3*G) operations (T: number of time steps, G: number of parameter grid points).
+
+        The indices of all fitted hyper-grid values (in the order of evaluation) are stored in the attribute
+        'evaluatedIndices'. The hyper-parameter distribution (attribute 'hyperParameterDistribution'), the joint
+        hyper-prior values (attribute 'flatHyperPriorValues') and the log-evidence values (attribute 'logEvidenceList')
+        are only stored for these hyper-grid values (in the same order), and are expanded to the values of individual
+        hyper-parameters on demand (see getHyperParameterDistribution).
         """
         self.fitWarningCounter = 0
+        if adaptive and timeBudget is not None:
+            raise ConfigurationError('Adaptive fits cannot be combined with a time budget.')
+        if checkpointDirectory is not None and (adaptive or timeBudget is not None):
+            raise ConfigurationError('Checkpoints are not available for adaptive fits or fits with a time budget.')
+        if resume and checkpointDirectory is None:
+            raise ConfigurationError('A checkpoint directory is needed to resume a fit.')
+        if engine not in ('auto', 'grid'):
+            raise ConfigurationError('Unknown fit engine "{}". Choose "auto" or "grid".'.format(engine))
+        self.fitDeadline = None if timeBudget is None else time.time() + timeBudget
 
         # format data/timestamps once, so number of data segments is known and _createGrid() works properly
         self.formattedData = movingWindow(self.rawData, self.observationModel.segmentLength)
@@ -1283,10 +1930,10 @@ class HyperStudy(Study):
                     list(flatten(self._unpackBreakpointNames(self.transitionModel)))
             if len(names) > 1:
                 indices = [self.flatHyperParameterNames.index(name) for name in names]
-                values = self.hyperGridValues[:, indices]
 
-                for v in values:
-                    if np.unique(v).size < v.size:
+                for chunk in self.hyperGridValues.chunks():
+                    values = np.sort(chunk[:, indices], axis=1)
+                    if np.any(values[:, 1:] == values[:, :-1]):
                         raise ConfigurationError('Detected multiple change-/break-points with identical values and/or '
                                                  'overlapping value intervals. Use "ChangepointStudy" instead of '
                                                  '"HyperStudy" for such cases.')
@@ -1294,13 +1941,20 @@ class HyperStudy(Study):
         self._checkConsistency()
 
         if not evidenceOnly:
-            # The average posterior distribution is stored in log-space for numerical stability. This way, it can be
-            # updated iteratively without storing all individual posterior distributions (after the iteration over all
-            # hyper-parameter values is done, it is transformed back to linear space)
-            self.averagePosteriorSequence = np.zeros([len(self.formattedData)]+self.gridSize) - np.inf
+            self._initAveragePosteriorSequence()
 
         self.logEvidenceList = []
         self.localEvidenceList = []
+        self.prunedList = []
+
+        # all fits (including the ones of other processes) start without a pruning reference
+        self.pruningMargin = pruningMargin
+        self.pruningReference = None
+
+        # a cache left over from an aborted fit is not re-used
+        self.likelihoodCacheShared = False
+        self.likelihoodCache = None
+        self.segmentCache = None
 
         # hyper-study fit is only necessary for more than one combination of hyper-parameter values
         if len(self.hyperGridValues) > 1:
@@ -1308,83 +1962,77 @@ class HyperStudy(Study):
                 print('+ Started new fit.')
                 print('    + {} analyses to run.'.format(len(self.hyperGridValues)))
 
-            # check if multiprocessing is available
-            if nJobs > 1:
-                try:
-                    from pathos.multiprocessing import ProcessPool
-                except ImportError:
-                    raise ImportError('No module named pathos.multiprocessing. This module represents an optional '
-                                      'dependency of bayesloop and is therefore not installed alongside bayesloop.')
-
-                # prepare parallel execution
-                if not silent:
-                    print('    + Creating {} processes.'.format(nJobs))
-                pool = ProcessPool(nodes=nJobs)
-
-                # use parallelFit method to create copies of this HyperStudy instance with only partial
-                # hyper-grid values
-                subStudies = pool.map(self._parallelFit,
-                                      range(nJobs),
-                                      [nJobs]*nJobs,
-                                      [forwardOnly]*nJobs,
-                                      [evidenceOnly]*nJobs,
-                                      [silent]*nJobs)
-
-                # prevent memory pile-up in main process
-                pool.close()
-                pool.join()
-                pool.terminate()
-                pool.restart()
-
-                # merge all sub-studies
-                for S in subStudies:
-                    self.logEvidenceList += S.logEvidenceList
-                    self.localEvidenceList += S.localEvidenceList
-                    if not evidenceOnly:
-                        self.averagePosteriorSequence = np.logaddexp(self.averagePosteriorSequence,
-                                                                     S.averagePosteriorSequence)
-            # single process fit
-            else:
-                # show progressbar if silent=False
-                if not silent:
-                    # first assume jupyter notebook and tray to use tqdm-widget,
-                    # if it fails, use normal tqdm-progressbar
-                    try:
-                        enum = tqdm_notebook(enumerate(self.hyperGridValues), total=len(self.hyperGridValues))
-                    except:
-                        enum = tqdm(enumerate(self.hyperGridValues), total=len(self.hyperGridValues))
+            # likelihood values do not depend on hyper-parameters, compute them only once for all hyper-grid values
+            # (if memory permits) and share them among the fits of all hyper-grid values (and all processes)
+            self._createLikelihoodCache(silent=silent)
+            self.likelihoodCacheShared = True
+            if not silent and self.likelihoodCache is not None:
+                print('    + Computed likelihood values.')
+
+            # if only the evidence is computed, forward passes over data segments between change-points are shared
+            # among all combinations of change-point times (see _fitSegments)
+            self.segmentChangepointIndices = self._getSegmentChangepointIndices()
+            if evidenceOnly and self.segmentCacheSize > 0 and self.segmentChangepointIndices is not None and \
+                    not self.logSpace and pruningMargin is None:
+                self.segmentCache = SegmentCache(self.segmentCacheSize)
+
+            # fit all hyper-grid values (or only the most probable ones, see argument 'adaptive', or as many as
+            # possible within the time budget)
+            fittedIndices = None
+            averageLocalEvidence = None
+            try:
+                if adaptive:
+                    fittedIndices = self._adaptiveFit(coarseStep, refinementMass, forwardOnly, evidenceOnly, silent,
+                                                      nJobs, vectorized, memoryBudget, backend, pool)
+                elif timeBudget is not None:
+                    fittedIndices = self._budgetedFit(forwardOnly, evidenceOnly, silent, nJobs, vectorized,
+                                                      memoryBudget, backend, pool)
+                elif checkpointDirectory is not None:
+                    fittedIndices = self._checkpointedFit(checkpointDirectory, checkpointPeriod, resume, forwardOnly,
+                                                          evidenceOnly, silent, nJobs, vectorized, memoryBudget,
+                                                          backend, pool)
                 else:
-                    enum = enumerate(self.hyperGridValues)
-
-                for i, hyperParamValues in enum:
-                    self._setSelectedHyperParameters(hyperParamValues)
-
-                    # call fit method from parent class
-                    Study.fit(self, forwardOnly=forwardOnly, evidenceOnly=evidenceOnly, silent=True)
-
-                    self.logEvidenceList.append(self.logEvidence)
-                    self.localEvidenceList.append(self.localEvidence)
-
-                    if (not evidenceOnly) and np.isfinite(self.logEvidence):
-                        # For numerical stability, zeros in posterior distribution are replaced with small constant.
-                        # Note that this is typically only the case for hyper-parameter values with low likelihood. The
-                        # procedure therefore has no (measurable) effect on the average posterior sequence.
-                        self.posteriorSequence[self.posteriorSequence < 10.**-300] = 10.**-300
-                        self.averagePosteriorSequence = np.logaddexp(self.averagePosteriorSequence,
-                                                                     np.log(self.posteriorSequence) +
-                                                                     self.logEvidence +
-                                                                     np.log(self.flatHyperPriorValues[i]))
+                    # joint hyper-prior values are only computed if all hyper-grid values are fitted at once
+                    self.flatHyperPriorValues = self.hyperGridValues.priorValues()*self.hyperPriorScale
+
+                    if engine == 'auto' and self._supportsChangepointScan():
+                        self._warnSingleProcessEngine('a change-point scan', nJobs, vectorized, pool, silent)
+                        self._changepointScan(forwardOnly, evidenceOnly, silent)
+                    elif engine == 'auto' and self._supportsSegmentation():
+                        self._warnSingleProcessEngine('exact segmentation', nJobs, vectorized, pool, silent)
+                        averageLocalEvidence = self._segmentationFit(forwardOnly, evidenceOnly, silent)
+                    elif engine == 'auto' and self._supportsPrefixSharing(forwardOnly, evidenceOnly):
+                        self._warnSingleProcessEngine('prefix sharing', nJobs, vectorized, pool, silent)
+                        self._prefixSharingFit(forwardOnly, evidenceOnly, silent)
+                    else:
+                        self._fitHyperGridValues(forwardOnly, evidenceOnly, silent, nJobs, vectorized, memoryBudget,
+                                                 backend, pool)
+            finally:
+                # restore hyper-parameter values (individual values have been set during fitting), also if the fit
+                # has been interrupted (so that it can be resumed, see argument 'resume')
+                self._setAllHyperParameters(self.flatHyperParameters)
+
+            # hyper-grid values that have not been fitted are assigned zero probability; the hyper-parameter
+            # distribution is only stored for the fitted values
+            if fittedIndices is None:
+                self.evaluatedIndices = np.arange(len(self.hyperGridValues))
+            else:
+                self.evaluatedIndices = fittedIndices
+                self.flatHyperPriorValues = self.hyperGridValues.priorValues(fittedIndices)*self.hyperPriorScale
 
-                # remove progressbar correctly
                 if not silent:
-                    enum.close()
-
-            if not evidenceOnly:
-                # transform average posterior distribution into linear space
-                # (we prefer underflows rather than overflows)
-                self.averagePosteriorSequence -= np.amax(self.averagePosteriorSequence)
-                self.averagePosteriorSequence = np.exp(self.averagePosteriorSequence)
-
+                    print('    + Fitted {} of {} hyper-grid values.'.format(len(fittedIndices),
+                                                                          len(self.hyperGridValues)))
+
+            if not evidenceOnly and self.marginalsOnly:
+                # normalize average marginal distributions
+                for average in self.averageMarginalPosteriorSequences:
+                    average /= np.sum(average, axis=1)[:, None]
+
+                # set self.marginalPosteriorSequences to average marginal distributions for plotting reasons
+                self.marginalPosteriorSequences = self.averageMarginalPosteriorSequences
+                self.posteriorSequence = []
+            elif not evidenceOnly:
                 # compute average posterior distribution
                 normalization = np.array([np.sum(posterior) for posterior in self.averagePosteriorSequence])
                 for i in range(len(self.grid)):
@@ -1394,8 +2042,8 @@ class HyperStudy(Study):
                 # set self.posteriorSequence to average posterior sequence for plotting reasons
                 self.posteriorSequence = self.averagePosteriorSequence
 
-                if not silent:
-                    print('    + Computed average posterior sequence')
+            if not (evidenceOnly or silent):
+                print('    + Computed average posterior sequence')
 
             # compute hyper-parameter distribution
             logHyperParameterDistribution = self.logEvidenceList + np.log(self.flatHyperPriorValues) + \
@@ -1411,31 +2059,65 @@ class HyperStudy(Study):
             if not silent:
                 print('    + Computed hyper-parameter distribution')
 
-            # compute log-evidence of average model
+            # report hyper-grid values that have been abandoned during the forward pass
+            prunedList = np.array(self.prunedList, dtype=bool)
+            self.prunedIndices = self.evaluatedIndices[prunedList]
+            self.prunedMass = np.sum(self.hyperParameterDistribution[prunedList])*np.prod(self.hyperGridConstant)
+            if pruningMargin is not None and not silent:
+                print('    + Pruned {} of {} hyper-grid values ({:.2e} of the probability mass).'
+                      .format(len(self.prunedIndices), len(self.hyperGridValues), self.prunedMass))
+
+            # compute log-evidence of average model; a fit with a time budget covers the hyper-grid evenly, so that the
+            # hyper-prior is re-normalized among the fitted values to estimate the evidence of the full hyper-grid
             self.logEvidence = logsumexp(logHyperParameterDistribution)
+            priorRenormalization = 1.
+            if timeBudget is not None:
+                priorRenormalization = self.hyperGridValues.priorSum()*self.hyperPriorScale / \
+                    np.sum(self.flatHyperPriorValues)
+                self.logEvidence += np.log(priorRenormalization)
             if not silent:
-                print('    + Log10-evidence of average model: {:.5f}'.format(self.logEvidence / np.log(10)))
+                if timeBudget is not None and len(self.evaluatedIndices) < len(self.hyperGridValues):
+                    print('    + Log10-evidence of average model: {:.5f} (estimated from {} fitted hyper-grid values)'
+                          .format(self.logEvidence / np.log(10), len(self.evaluatedIndices)))
+                else:
+                    print('    + Log10-evidence of average model: {:.5f}'.format(self.logEvidence / np.log(10)))
 
             # compute local evidence of average model
-            self.localEvidence = np.sum((np.array(self.localEvidenceList).T*self.flatHyperPriorValues).T, axis=0)
+            if averageLocalEvidence is not None:
+                self.localEvidence = averageLocalEvidence
+            elif not np.any(prunedList):
+                self.localEvidence = np.sum((np.array(self.localEvidenceList).T*self.flatHyperPriorValues).T,
+                                            axis=0)*priorRenormalization
+            else:
+                # pruned hyper-grid values do not contribute, hyper-prior values are re-normalized among the fitted
+                # values accordingly (like the log-evidence, the local evidence only contains fitted values)
+                fittedPriorValues = self.flatHyperPriorValues[~prunedList]
+                localEvidenceList = [e for e, pruned in zip(self.localEvidenceList, prunedList) if not pruned]
+                self.localEvidence = np.sum((np.array(localEvidenceList).T*fittedPriorValues).T, axis=0) * \
+                    np.sum(self.flatHyperPriorValues)/np.sum(fittedPriorValues)*priorRenormalization
 
             if not silent:
                 print('    + Computed local evidence of average model')
 
             # compute posterior mean values
             if not evidenceOnly:
-                self.posteriorMeanValues = np.empty([len(self.grid), len(self.posteriorSequence)])
-                for i in range(len(self.grid)):
-                    self.posteriorMeanValues[i] = np.array([np.sum(p*self.grid[i]) for p in self.posteriorSequence])
+                self.posteriorMeanValues, self.posteriorVarianceValues = self._computePosteriorMoments()
 
                 if not silent:
                     print('    + Computed mean parameter values.')
 
             # clear localEvidenceList (to keep file size small for stored studies)
             self.localEvidenceList = []
+            self.pruningReference = None
+            self.fitDeadline = None
 
-            # restore hyper-parameter values (individual values have been set during fitting)
-            self._setAllHyperParameters(self.flatHyperParameters)
+            # release shared likelihood values and cached segments
+            self.likelihoodCacheShared = False
+            self.likelihoodCache = None
+            if self.segmentCache is not None and not silent:
+                print('    + Segment cache: {} hits, {} misses.'.format(self.segmentCache.hits,
+                                                                           self.segmentCache.misses))
+            self.segmentCache = None
 
             if not silent:
                 print('+ Finished fit.')
@@ -1447,10 +2129,1313 @@ class HyperStudy(Study):
                     print('+ Only one combination of hyper-parameter values, switching to standard fit method.')
                 if len(self.hyperGridValues) == 0:
                     print('+ Transition model contains no hyper-parameters, switching to standard fit method.')
+            self.evaluatedIndices = np.arange(len(self.hyperGridValues))
+            self.fitDeadline = None
 
             Study.fit(self, forwardOnly=forwardOnly, evidenceOnly=evidenceOnly, silent=silent)
 
-    def _parallelFit(self, idx, nJobs, forwardOnly, evidenceOnly, silent):
+    def _fitHyperGridValues(self, forwardOnly, evidenceOnly, silent, nJobs, vectorized, memoryBudget, backend, pool):
+        """
+        Fits all values of the current hyper-grid (attribute 'hyperGridValues'), either one by one, in batches (see
+        _vectorizedFit) or distributed among multiple processes (see _runParallelFit). Evidence values are appended to
+        the attributes 'logEvidenceList' and 'localEvidenceList', posterior distributions are added to the average
+        posterior sequence. If a deadline is set (attribute 'fitDeadline', see argument 'timeBudget' of fit), the
+        iteration over hyper-grid values is stopped once it has passed. See fit for a description of the arguments.
+
+        Returns:
+            ndarray: Indices of the fitted hyper-grid values (in the order of the attribute 'logEvidenceList')
+        """
+        nFitted = len(self.logEvidenceList)
+
+        # multi-process fit
+        if pool is not None and nJobs == 1:
+            nJobs = pool.nJobs
+        if nJobs > 1:
+            if backend == 'auto':
+                backend = 'multiprocessing' if hasattr(os, 'fork') else 'pathos'
+
+            reductions = self._runParallelFit(nJobs, backend, forwardOnly, evidenceOnly, silent, vectorized,
+                                              memoryBudget, pool=pool)
+
+            # merge results of all processes (a process may stop before its last hyper-grid value if a deadline is set)
+            fittedIndices = []
+            bounds = np.cumsum([0] + [len(part) for part in self.hyperGridValues.split(nJobs)])
+            for start, (logEvidenceList, localEvidenceList, prunedList, average, averageLogWeight) in \
+                    zip(bounds, reductions):
+                fittedIndices.append(start + np.arange(len(logEvidenceList)))
+                self.logEvidenceList += logEvidenceList
+                self.localEvidenceList += localEvidenceList
+                self.prunedList += prunedList
+                if not evidenceOnly and np.isfinite(averageLogWeight):
+                    self._addToAveragePosteriorSequence(averageLogWeight, sequence=average)
+            return np.concatenate(fittedIndices)
+        # single process fit, all hyper-grid values are processed at once (in batches)
+        elif vectorized and self._supportsVectorizedFit(silent=silent):
+            self._vectorizedFit(forwardOnly, evidenceOnly, silent, memoryBudget)
+        # single process fit
+        else:
+            # show progressbar if silent=False
+            if not silent:
+                # first assume jupyter notebook and tray to use tqdm-widget,
+                # if it fails, use normal tqdm-progressbar
+                try:
+                    enum = tqdm_notebook(enumerate(self.hyperGridValues), total=len(self.hyperGridValues))
+                except:
+                    enum = tqdm(enumerate(self.hyperGridValues), total=len(self.hyperGridValues))
+            else:
+                enum = enumerate(self.hyperGridValues)
+
+            for i, hyperParamValues in enum:
+                if i > 0 and self._deadlinePassed():
+                    break
+                self._fitHyperGridValue(i, hyperParamValues, forwardOnly, evidenceOnly)
+
+            # remove progressbar correctly
+            if not silent:
+                enum.close()
+
+        return np.arange(len(self.logEvidenceList) - nFitted)
+
+    def _deadlinePassed(self):
+        """
+        Checks whether the deadline of a fit with a time budget has passed (see fit).
+
+        Returns:
+            bool: True if a deadline is set and has passed, False otherwise
+        """
+        return self.fitDeadline is not None and time.time() > self.fitDeadline
+
+    def _fitHyperGridValue(self, i, hyperParamValues, forwardOnly, evidenceOnly):
+        """
+        Fits a single hyper-grid value and appends the results to the attributes 'logEvidenceList',
+        'localEvidenceList' and 'prunedList'. The posterior sequence is added to the average posterior sequence. If a
+        pruning margin is set (see fit), the forward pass is abandoned once the running log-evidence falls too far
+        below the running log-evidence of the most probable hyper-grid value fitted so far (attribute
+        'pruningReference', which includes the log-prior).
+
+        Args:
+            i(int): Index of the hyper-grid value (in the attribute 'hyperGridValues')
+            hyperParamValues: Values of the selected hyper-parameters
+            forwardOnly(bool): see fit
+            evidenceOnly(bool): see fit
+        """
+        self._setSelectedHyperParameters(hyperParamValues)
+        logPrior = np.log(self.flatHyperPriorValues[i])
+
+        if self.pruningMargin is not None:
+            if self.pruningReference is None:
+                self.pruningReference = np.zeros(len(self.formattedData)) - np.inf
+            self.pruningThreshold = self.pruningReference - self.pruningMargin - logPrior
+
+        # call fit method from parent class (or combine cached data segments, see _fitSegments)
+        try:
+            if self.segmentCache is not None:
+                self._fitSegments(hyperParamValues)
+            else:
+                Study.fit(self, forwardOnly=forwardOnly, evidenceOnly=evidenceOnly, silent=True)
+        finally:
+            self.pruningThreshold = None
+
+        pruned = self.prunedTimeStep is not None
+        if pruned:
+            # the deficit with respect to the reference value at the time of pruning is carried over to the end
+            t = self.prunedTimeStep
+            self.logEvidence += self.pruningReference[-1] - self.pruningReference[t] + \
+                np.log(np.prod(self.latticeConstant))
+        elif self.pruningMargin is not None and np.isfinite(self.logEvidence) and \
+                self.logEvidenceTrajectory[-1] + logPrior > self.pruningReference[-1]:
+            self.pruningReference = self.logEvidenceTrajectory + logPrior
+
+        self.logEvidenceList.append(self.logEvidence)
+        self.localEvidenceList.append(self.localEvidence)
+        self.prunedList.append(pruned)
+
+        if (not evidenceOnly) and (not pruned) and np.isfinite(self.logEvidence):
+            self._addToAveragePosteriorSequence(self.logEvidence + logPrior)
+
+    def _adaptiveFit(self, coarseStep, refinementMass, forwardOnly, evidenceOnly, silent, nJobs, vectorized,
+                     memoryBudget, backend, pool):
+        """
+        Fits a coarse version of the hyper-grid first, and subsequently refines the neighborhoods of those coarse
+        hyper-grid values that hold most of the probability mass of the hyper-parameter distribution (see fit). The
+        hyper-grid and the hyper-prior values are created by _createHyperGrid as for a standard fit, so that the
+        resulting hyper-parameter distribution is defined on the full hyper-grid. See fit for a description of the
+        arguments.
+
+        Returns:
+            ndarray: Indices of all fitted hyper-grid values (in the order of the attribute 'logEvidenceList')
+        """
+        if not isinstance(self.hyperGridValues, HyperGrid) or self.hyperGridValues.indices is not None:
+            raise ConfigurationError('Adaptive fits are only available for complete hyper-grids.')
+
+        hyperGrid = self.hyperGridValues
+        steps = hyperGrid.steps
+
+        # coarse hyper-grid contains every k-th value (and the last value) of each hyper-parameter
+        coarseAxes = [np.unique(np.append(np.arange(0, n, coarseStep), n - 1)) for n in steps]
+        coarseIndices = np.ravel_multi_index([a.ravel() for a in np.meshgrid(*coarseAxes, indexing='ij')], steps)
+
+        if not silent:
+            print('    + Fitting {} values of coarse hyper-grid.'.format(len(coarseIndices)))
+        self.hyperGridValues = hyperGrid.subset(coarseIndices)
+        self.flatHyperPriorValues = hyperGrid.priorValues(coarseIndices)*self.hyperPriorScale
+        self._fitHyperGridValues(forwardOnly, evidenceOnly, silent, nJobs, vectorized, memoryBudget, backend, pool)
+
+        # select coarse hyper-grid values that hold the given fraction of the probability mass
+        logProbabilities = np.array(self.logEvidenceList) + np.log(self.flatHyperPriorValues)
+        probabilities = np.exp(logProbabilities - np.amax(logProbabilities))
+        probabilities /= np.sum(probabilities)
+        order = np.argsort(-probabilities)
+        nSelected = min(np.searchsorted(np.cumsum(probabilities[order]), refinementMass) + 1, len(order))
+        selected = [i for i in order[:nSelected] if probabilities[i] > 0.]
+
+        # neighborhood of a coarse hyper-grid value extends up to the neighboring coarse values
+        refinedIndices = []
+        for multiIndex in np.array(np.unravel_index(coarseIndices[selected], steps)).T:
+            ranges = [np.arange(max(0, i - coarseStep + 1), min(n, i + coarseStep)) for i, n in zip(multiIndex, steps)]
+            refinedIndices.append(np.ravel_multi_index([a.ravel() for a in np.meshgrid(*ranges, indexing='ij')],
+                                                       steps))
+        refinedIndices = np.setdiff1d(np.concatenate(refinedIndices), coarseIndices) if refinedIndices else \
+            np.array([], dtype=int)
+
+        if len(refinedIndices) > 0:
+            if not silent:
+                print('    + Refining {} coarse hyper-grid values: fitting {} additional values.'
+                      .format(len(selected), len(refinedIndices)))
+            self.hyperGridValues = hyperGrid.subset(refinedIndices)
+            self.flatHyperPriorValues = hyperGrid.priorValues(refinedIndices)*self.hyperPriorScale
+            self._fitHyperGridValues(forwardOnly, evidenceOnly, silent, nJobs, vectorized, memoryBudget, backend,
+                                     pool)
+
+        # restore full hyper-grid
+        self.hyperGridValues = hyperGrid
+
+        return np.concatenate([coarseIndices, refinedIndices]).astype(int)
+
+    def _budgetedFit(self, forwardOnly, evidenceOnly, silent, nJobs, vectorized, memoryBudget, backend, pool):
+        """
+        Fits the hyper-grid values in a space-filling order (see HyperGrid.spaceFillingOrder) until the deadline of
+        the fit has passed (see argument 'timeBudget' of fit). For multi-process fits, the order is distributed among
+        the processes in an interleaved way, so that each process fits the coarse values first. See fit for a
+        description of the arguments.
+
+        Returns:
+            ndarray: Indices of all fitted hyper-grid values (in the order of the attribute 'logEvidenceList')
+        """
+        hyperGrid = self.hyperGridValues
+
+        order = hyperGrid.spaceFillingOrder()
+        if pool is not None and nJobs == 1:
+            nJobs = pool.nJobs
+        if nJobs > 1:
+            order = np.concatenate([order[k::nJobs] for k in range(nJobs)])
+
+        self.hyperGridValues = hyperGrid.subset(order)
+        self.flatHyperPriorValues = hyperGrid.priorValues(order)*self.hyperPriorScale
+        try:
+            fitted = self._fitHyperGridValues(forwardOnly, evidenceOnly, silent, nJobs, vectorized, memoryBudget,
+                                              backend, pool)
+        finally:
+            # restore full hyper-grid
+            self.hyperGridValues = hyperGrid
+
+        if not silent and len(fitted) < len(order):
+            print('    + Time budget exhausted.')
+
+        return order[fitted]
+
+    def _checkpointedFit(self, checkpointDirectory, checkpointPeriod, resume, forwardOnly, evidenceOnly, silent, nJobs,
+                         vectorized, memoryBudget, backend, pool):
+        """
+        Fits the hyper-grid values in blocks and writes a checkpoint after each block (see _saveFitCheckpoint). The
+        first block contains one hyper-grid value per process, subsequent blocks are sized such that checkpoints are
+        written about once per checkpoint period. If resume is set to True, hyper-grid values that are contained in
+        the last checkpoint are not fitted again (see _loadFitCheckpoint). See fit for a description of the arguments.
+
+        Returns:
+            ndarray: Indices of all fitted hyper-grid values (in the order of the attribute 'logEvidenceList')
+        """
+        hyperGrid = self.hyperGridValues
+        fingerprint = {'nValues': len(hyperGrid),
+                       'nSteps': len(self.formattedData),
+                       'gridSize': np.array(self.gridSize),
+                       'names': np.array(self.flatHyperParameterNames),
+                       'firstValues': hyperGrid[0],
+                       'lastValues': hyperGrid[-1],
+                       'forwardOnly': forwardOnly,
+                       'evidenceOnly': evidenceOnly,
+                       'marginalsOnly': self.marginalsOnly,
+                       'pruningMargin': np.inf if self.pruningMargin is None else self.pruningMargin}
+
+        fittedIndices = np.array([], dtype=int)
+        if resume:
+            fittedIndices = self._loadFitCheckpoint(checkpointDirectory, fingerprint)
+            if not silent:
+                print('    + Resumed fit from checkpoint ({} of {} hyper-grid values already fitted).'
+                      .format(len(fittedIndices), len(hyperGrid)))
+        remaining = np.setdiff1d(np.arange(len(hyperGrid)), fittedIndices)
+
+        nProcesses = pool.nJobs if (pool is not None and nJobs == 1) else nJobs
+        blockSize = nProcesses
+        start = 0
+        try:
+            while start < len(remaining):
+                block = remaining[start:start+blockSize]
+                self.hyperGridValues = hyperGrid.subset(block)
+                self.flatHyperPriorValues = hyperGrid.priorValues(block)*self.hyperPriorScale
+
+                startTime = time.time()
+                fitted = self._fitHyperGridValues(forwardOnly, evidenceOnly, True, nJobs, vectorized, memoryBudget,
+                                                  backend, pool)
+                fittedIndices = np.concatenate([fittedIndices, block[fitted]]).astype(int)
+                start += len(block)
+
+                self._saveFitCheckpoint(checkpointDirectory, fittedIndices, fingerprint)
+                if not silent:
+                    print('    + Wrote checkpoint ({} of {} hyper-grid values fitted).'
+                          .format(len(fittedIndices), len(hyperGrid)))
+
+                # adjust number of hyper-grid values per block, so that checkpoints are written once per period
+                elapsed = max(time.time() - startTime, 1e-3)
+                blockSize = max(nProcesses, int(len(block)*checkpointPeriod/elapsed))
+        finally:
+            # restore full hyper-grid
+            self.hyperGridValues = hyperGrid
+
+        return fittedIndices
+
+    def _saveFitCheckpoint(self, checkpointDirectory, fittedIndices, fingerprint):
+        """
+        Writes the results of all hyper-grid values that have been fitted so far to the checkpoint directory. In
+        contrast to bayesloop.save, the study itself is not serialized. Only evidence values, the pruning reference and
+        the running average posterior sequence (as raw NumPy file) are stored.
+
+        Args:
+            checkpointDirectory(str): Checkpoint directory
+            fittedIndices(ndarray): Indices of all fitted hyper-grid values (in the order of 'logEvidenceList')
+            fingerprint(dict): Properties of the fit that are checked when the fit is resumed
+        """
+        state = dict(fingerprint,
+                     indices=fittedIndices,
+                     logEvidence=np.array(self.logEvidenceList),
+                     localEvidence=np.array(self.localEvidenceList),
+                     pruned=np.array(self.prunedList, dtype=bool),
+                     pruningReference=np.zeros(0) if self.pruningReference is None else self.pruningReference,
+                     averageLogWeight=self.averageLogWeight)
+
+        if fingerprint['evidenceOnly']:
+            averages = []
+        elif self.marginalsOnly:
+            averages = self.averageMarginalPosteriorSequences
+        else:
+            averages = [self.averagePosteriorSequence]
+
+        _writeCheckpoint(checkpointDirectory, state, averages)
+
+    def _loadFitCheckpoint(self, checkpointDirectory, fingerprint):
+        """
+        Restores the results of all hyper-grid values that are contained in the last checkpoint of the checkpoint
+        directory (see _saveFitCheckpoint), including the running average posterior sequence.
+
+        Args:
+            checkpointDirectory(str): Checkpoint directory
+            fingerprint(dict): Properties of the current fit that have to match the ones of the checkpoint
+
+        Returns:
+            ndarray: Indices of the hyper-grid values that have already been fitted (empty if there is no checkpoint)
+        """
+        state, averages = _readCheckpoint(checkpointDirectory)
+        if state is None:
+            return np.array([], dtype=int)
+
+        for key, value in fingerprint.items():
+            if not np.array_equal(state[key], value):
+                raise ConfigurationError('Checkpoint in "{}" does not match the current fit (differs in "{}").'
+                                         .format(checkpointDirectory, key))
+
+        self.logEvidenceList = list(state['logEvidence'])
+        self.localEvidenceList = list(state['localEvidence'])
+        self.prunedList = list(state['pruned'])
+
+        # later hyper-grid values are pruned with respect to the same reference as in the interrupted fit
+        if len(state['pruningReference']) > 0:
+            self.pruningReference = state['pruningReference']
+
+        if not fingerprint['evidenceOnly']:
+            if self.marginalsOnly:
+                for average, stored in zip(self.averageMarginalPosteriorSequences, averages):
+                    average[:] = stored
+            else:
+                # copy block-wise, as the stored average posterior sequence is memory-mapped
+                blockSize = max(1, int(2**23/np.prod(self.gridSize)))
+                for i in range(0, len(averages[0]), blockSize):
+                    self.averagePosteriorSequence[i:i+blockSize] = averages[0][i:i+blockSize]
+            self.averageLogWeight = float(state['averageLogWeight'])
+
+        return state['indices'].astype(int)
+
+    def _warnSingleProcessEngine(self, engineName, nJobs, vectorized, pool, silent):
+        """
+        Prints a warning if multiple processes, a worker pool or a vectorized fit are requested, but the hyper-grid
+        values are evaluated by a specialized engine that runs in a single process (see argument engine of fit).
+
+        Args:
+            engineName(str): Name of the specialized engine
+            nJobs(int): see fit
+            vectorized(bool): see fit
+            pool(WorkerPool): see fit
+            silent(bool): If set to True, no output is generated by this method.
+        """
+        if not silent and (nJobs > 1 or vectorized or pool is not None):
+            print('    ! WARNING: Hyper-grid values are evaluated by {} in a single process, ignoring arguments '
+                  '"nJobs", "vectorized" and "pool" (set engine="grid" to fit them one by one).'.format(engineName))
+
+    def _supportsChangepointScan(self):
+        """
+        Checks whether the evidence of all hyper-grid values can be computed by a change-point scan (see
+        _changepointScan). This requires a transition model with a single change-point and no other hyper-parameters,
+        i.e. either a change-point model on its own, or a serial transition model that couples two static sub-models
+        by a change-point. Furthermore, the time stamps have to be consecutive integers that contain all change-point
+        values, and the fit has to be carried out in linear space, storing joint distributions, without a posterior
+        callback and without pruning.
+
+        Returns:
+            bool: True if a change-point scan is possible, False otherwise
+        """
+        transitionModel = self.transitionModel
+        if str(transitionModel) == 'Serial transition model':
+            if not (len(transitionModel.changePointMask) == 1 and np.all(transitionModel.changePointMask) and
+                    all(str(m) == 'Static/constant parameter values' for m in transitionModel.models)):
+                return False
+        elif str(transitionModel) != 'Change-point':
+            return False
+
+        if len(self.flatHyperParameterNames) != 1 or \
+                self.logSpace or self.marginalsOnly or self.posteriorCallback is not None or \
+                self.pruningMargin is not None:
+            return False
+
+        timestamps = self.formattedTimestamps
+        if not np.all(np.diff(timestamps) == 1):
+            return False
+        return bool(np.all(np.in1d(self.hyperGridValues[:, 0], timestamps)))
+
+    def _changepointScan(self, forwardOnly, evidenceOnly, silent):
+        """
+        Computes the evidence (and the average posterior sequence) of all change-point times of a transition model with
+        a single change-point (see _supportsChangepointScan) without fitting each change-point time separately. As the
+        parameter distribution is re-set to the prior distribution at the change-point, the evidence of a change-point
+        right after time step k factorizes into the evidence of the data up to time step k and the evidence of the
+        remaining data, starting from the prior distribution. The former is obtained from a single forward pass, the
+        latter from a single backward pass over the data. With static parameters before and after the change-point, the
+        posterior distribution of each change-point time is constant within both segments, so that the average
+        posterior sequence follows from cumulative sums of the segment distributions. Local evidence values depend on
+        both the change-point time and the time step and are computed by matrix products. The results are identical to
+        the ones of fitting all change-point times one by one. See fit for a description of the arguments.
+        """
+        nSteps = len(self.formattedData)
+        latticeVolume = np.prod(self.latticeConstant)
+        blockSize = max(1, int(2**23/np.prod(self.gridSize)))
+
+        # index of the time step after which the parameter distribution is re-set
+        values = self.hyperGridValues[:, 0]
+        steps = np.searchsorted(self.formattedTimestamps, values)
+
+        if not silent:
+            print('    + Computing evidence of {} change-point times from a single forward and backward pass.'
+                  .format(len(values)))
+
+        # parameter distributions right after the change-point and at the end of the backward pass
+        resetPrior, finalPrior = self._computeSegmentPriors()
+
+        # forward pass: evidence of all data segments that start at the first time step; the posterior distribution of
+        # the first segment is stored for each change-point time (filtering distributions if forwardOnly is True)
+        prefixLogEvidence = np.zeros(nSteps) - np.inf
+        prefixLocalEvidence = np.zeros(nSteps) + np.nan
+        prefixSequence = None
+        if forwardOnly and not evidenceOnly:
+            prefixSequence = self.averagePosteriorSequence
+        elif not evidenceOnly:
+            prefixSequence = self._allocateSequence([nSteps] + self.gridSize)
+            prefixSequence.fill(np.nan)
+
+        alpha = self._computePrior(silent=True)
+        logEvidence = 0.
+        for i in range(nSteps):
+            alpha = alpha*self._computeLikelihood(i)
+            norm = np.sum(alpha, dtype=np.float64)
+            if not norm > 0.:
+                break
+            alpha /= norm
+            logEvidence += np.log(norm)
+            prefixLogEvidence[i] = logEvidence
+            prefixLocalEvidence[i] = norm*latticeVolume
+
+            if forwardOnly and not evidenceOnly:
+                prefixSequence[i] = alpha
+            elif not evidenceOnly:
+                posterior = alpha*(resetPrior if i < nSteps - 1 else finalPrior)
+                prefixSequence[i] = posterior/np.sum(posterior)
+
+        # backward pass: evidence of all data segments that end at the last time step, starting from the prior
+        # distribution; the posterior distribution of the second segment is stored for each change-point time
+        suffixLogEvidence = np.zeros(nSteps + 1) - np.inf
+        suffixLogEvidence[nSteps] = 0.  # change-point after last time step
+        suffixSequence = None
+        if not (forwardOnly or evidenceOnly):
+            suffixSequence = self.averagePosteriorSequence
+            suffixSequence.fill(np.nan)
+
+        beta = np.ones(self.gridSize, dtype=self.dtype)
+        logScale = 0.
+        for j in range(nSteps - 1, 0, -1):
+            beta *= self._computeLikelihood(j)
+            norm = np.sum(beta, dtype=np.float64)
+            if not norm > 0.:
+                break
+            beta /= norm
+            logScale += np.log(norm)
+            with np.errstate(divide='ignore'):
+                suffixLogEvidence[j] = logScale + np.log(np.sum(resetPrior*beta, dtype=np.float64))
+
+            if suffixSequence is not None:
+                posterior = resetPrior*beta*finalPrior
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    suffixSequence[j] = posterior/np.sum(posterior)
+
+        # log-evidence of all change-point times (integration yields evidence, not only sum)
+        logEvidenceValues = prefixLogEvidence[steps] + suffixLogEvidence[steps + 1] + np.log(latticeVolume)
+        self._warnEmptyDistribution('Forward pass', count=np.sum(~np.isfinite(logEvidenceValues)))
+
+        # weights of all change-point times relative to the largest one (see _addToAveragePosteriorSequence)
+        logWeights = logEvidenceValues + np.log(self.flatHyperPriorValues)
+        valid = np.isfinite(logWeights)
+        maxLogWeight = np.amax(logWeights[valid]) if np.any(valid) else -np.inf
+        weights = np.zeros(len(values))
+        weights[valid] = np.exp(logWeights[valid] - maxLogWeight)
+
+        # weights of prefix and suffix distributions, enumerated by time step of the change-point
+        stepWeights = np.zeros(nSteps)
+        np.add.at(stepWeights, steps, weights)
+
+        localEvidence = np.empty((len(values), nSteps))
+        if forwardOnly or evidenceOnly:
+            # local evidence of a forward pass is given by the normalization constants, which coincide for all
+            # change-point times up to the change-point
+            localEvidence[:] = prefixLocalEvidence
+
+            if not evidenceOnly:
+                # filtering distributions up to the change-point are weighted by all later change-point times
+                prefixWeights = np.cumsum(stepWeights[::-1])[::-1]
+                for i in range(nSteps):
+                    self.averagePosteriorSequence[i] *= prefixWeights[i]
+
+            self._changepointScanFilter(steps, resetPrior, weights, localEvidence, not evidenceOnly)
+        else:
+            # local evidence of a full fit: 1/(sum of posterior/likelihood); the posterior of each change-point time
+            # only takes two different values (before and after the change-point)
+            flatPrefix = prefixSequence.reshape(nSteps, -1)
+            flatSuffix = suffixSequence.reshape(nSteps, -1)
+            suffixRows = np.minimum(steps + 1, nSteps - 1)
+            for start in range(0, nSteps, blockSize):
+                stop = min(start + blockSize, nSteps)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    inverseLikelihood = np.array([1./self._computeLikelihood(i).ravel() for i in range(start, stop)])
+                    inverseLikelihood = inverseLikelihood.astype(self.dtype)
+                    prefixSums = flatPrefix[steps].dot(inverseLikelihood.T)
+                    suffixSums = flatSuffix[suffixRows].dot(inverseLikelihood.T)
+                    beforeChangepoint = np.arange(start, stop)[None, :] <= steps[:, None]
+                    localEvidence[:, start:stop] = 1./(np.where(beforeChangepoint, prefixSums, suffixSums) *
+                                                       latticeVolume)
+
+            # average posterior sequence: prefix distributions contribute to all earlier time steps (reverse
+            # cumulative sum), suffix distributions contribute to all later time steps (cumulative sum)
+            suffixWeights = np.append(0., stepWeights[:-1])
+            for i in range(nSteps):
+                prefixSequence[i] = prefixSequence[i]*stepWeights[i] if stepWeights[i] > 0. else 0.
+                suffixSequence[i] = suffixSequence[i]*suffixWeights[i] if suffixWeights[i] > 0. else 0.
+            for i in range(nSteps - 2, -1, -1):
+                prefixSequence[i] += prefixSequence[i+1]
+            for i in range(1, nSteps):
+                suffixSequence[i] += suffixSequence[i-1]
+            for i in range(0, nSteps, blockSize):
+                self.averagePosteriorSequence[i:i+blockSize] += prefixSequence[i:i+blockSize]
+            del prefixSequence
+
+        self.logEvidenceList += list(logEvidenceValues)
+        self.localEvidenceList += list(localEvidence)
+        self.prunedList += [False]*len(values)
+        if not evidenceOnly:
+            self.averageLogWeight = maxLogWeight
+
+    def _changepointScanFilter(self, steps, resetPrior, weights, localEvidence, average):
+        """
+        Runs the forward pass after the change-point for all change-point times of a change-point scan (see
+        _changepointScan), in blocks of change-point times. The parameter distributions of all change-point times in a
+        block are stacked and updated at once. Local evidence values (normalization constants) are written to the given
+        array, filtering distributions are added to the average posterior sequence (if average is set to True).
+
+        Args:
+            steps(ndarray): Time steps after which the parameter distribution is re-set (one per change-point time)
+            resetPrior(ndarray): Parameter distribution right after the change-point
+            weights(ndarray): Weights of the change-point times (relative to the largest weight)
+            localEvidence(ndarray): Local evidence values (first axis enumerates change-point times)
+            average(bool): If set to True, filtering distributions are added to the average posterior sequence
+        """
+        nSteps = len(self.formattedData)
+        latticeVolume = np.prod(self.latticeConstant)
+        axes = tuple(range(1, len(self.gridSize) + 1))
+        expand = (slice(None),) + (None,)*len(self.gridSize)
+        blockSize = max(1, int(2**23/np.prod(self.gridSize)))
+
+        # process change-point times in chronological order, so that active distributions form a leading block
+        order = np.argsort(steps, kind='mergesort')
+        for start in range(0, len(order), blockSize):
+            block = order[start:start+blockSize]
+            blockSteps = steps[block]
+            distributions = np.empty([len(block)] + self.gridSize, dtype=self.dtype)
+
+            nActive = 0
+            for i in range(blockSteps[0] + 1, nSteps):
+                # distributions of change-points right before time step i are re-set to the prior distribution
+                nStarted = np.searchsorted(blockSteps, i - 1, side='right')
+                distributions[nActive:nStarted] = resetPrior
+                nActive = nStarted
+
+                active = distributions[:nActive]
+                active *= self._computeLikelihood(i)
+                norm = np.sum(active, axis=axes, dtype=np.float64)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    active /= norm[expand]
+
+                localEvidence[block[:nActive], i] = norm*latticeVolume
+                if average:
+                    blockWeights = weights[block[:nActive]]
+                    used = blockWeights > 0.
+                    self.averagePosteriorSequence[i] += np.tensordot(blockWeights[used], active[used], axes=1)
+
+    def _computeSegmentPriors(self):
+        """
+        Computes the parameter distributions that enclose the data segments between change-points in a standard fit:
+        the distribution right after a change-point (computed by the transition model) and the distribution that the
+        backward pass starts with at the last time step.
+
+        Returns:
+            ndarray, ndarray: Parameter distribution after a change-point, parameter distribution at the last time step
+        """
+        self._setSelectedHyperParameters(self.hyperGridValues[0])
+        resetPrior = self.transitionModel.computeForwardPrior(np.ones(self.gridSize, dtype=self.dtype),
+                                                              self.hyperGridValues[0][0])
+
+        if self.observationModel.prior is not None:
+            finalPrior = self._computePrior(silent=True)
+        else:
+            finalPrior = np.ones(self.gridSize, dtype=self.dtype)
+        return resetPrior, finalPrior/np.sum(finalPrior)
+
+    def _getSegmentBoundaries(self):
+        """
+        Translates the values of all change-points into segment boundaries, i.e. into the index of the first time step
+        after the change-point.
+
+        Returns:
+            ndarray, ndarray: Boolean array that marks the possible boundaries of each change-point, and the
+                corresponding hyper-prior values (first axis enumerates change-points, second axis boundaries)
+        """
+        nSteps = len(self.formattedData)
+        nPoints = len(self.hyperGridValues.values)
+
+        candidates = np.zeros((nPoints, nSteps + 1), dtype=bool)
+        priors = np.zeros((nPoints, nSteps + 1))
+        for m, (values, prior) in enumerate(zip(self.hyperGridValues.values, self.hyperGridValues.priors)):
+            boundaries = np.searchsorted(self.formattedTimestamps, values) + 1
+            candidates[m, boundaries] = True
+            priors[m, boundaries] = prior
+        return candidates, priors
+
+    def _supportsSegmentation(self):
+        """
+        Checks whether the evidence of all hyper-grid values can be computed by exact segmentation (see
+        _segmentationFit). This requires a transition model that only consists of change-points between static
+        segments, i.e. a change-point model, a combined transition model of change-point models, or a serial transition
+        model that couples static sub-models by change-points. The hyper-grid has to contain exactly the ordered
+        combinations of the change-point values, the time stamps have to be consecutive integers that contain all
+        change-point values (but the last time stamp), and the fit has to be carried out in linear space, storing joint
+        distributions, without a posterior callback and without pruning.
+
+        Returns:
+            bool: True if exact segmentation is possible, False otherwise
+        """
+        transitionModel = self.transitionModel
+        if str(transitionModel) == 'Serial transition model':
+            if not (np.all(transitionModel.changePointMask) and
+                    all(str(m) == 'Static/constant parameter values' for m in transitionModel.models)):
+                return False
+        elif str(transitionModel) == 'Combined transition model':
+            if not all(str(m) == 'Change-point' for m in transitionModel.models):
+                return False
+        elif str(transitionModel) != 'Change-point':
+            return False
+
+        if not isinstance(self.hyperGridValues, HyperGrid) or \
+                self.logSpace or self.marginalsOnly or self.posteriorCallback is not None or \
+                self.pruningMargin is not None:
+            return False
+
+        timestamps = self.formattedTimestamps
+        if not np.all(np.diff(timestamps) == 1):
+            return False
+        if not all(np.all(np.in1d(values, timestamps[:-1])) for values in self.hyperGridValues.values):
+            return False
+
+        # count ordered combinations of change-point values (boundaries are counted by the number of ordered
+        # combinations of the preceding change-points that end before them)
+        candidates, _ = self._getSegmentBoundaries()
+        counts = np.zeros(len(timestamps) + 1, dtype=np.int64)
+        counts[0] = 1
+        for isCandidate in candidates:
+            counts = np.where(isCandidate, np.cumsum(counts) - counts, 0)
+        return int(np.sum(counts)) == len(self.hyperGridValues)
+
+    def _segmentationFit(self, forwardOnly, evidenceOnly, silent):
+        """
+        Computes the evidence (and the average posterior sequence) of all combinations of change-point times of a
+        transition model that only consists of change-points between static segments (see _supportsSegmentation)
+        without fitting each combination separately. As the parameter distribution is re-set to the prior distribution
+        at each change-point, the data segments between change-points are conditionally independent: the evidence of a
+        combination of change-point times is the product of the evidence values of its segments. The log-evidence of
+        all data segments [a, b) is computed once by forward passes that start at all possible segment starts a (in
+        blocks, see _segmentFilter). Forward and backward recursions over the change-points (see _segmentationWeights)
+        then yield the summed weight of all combinations that contain a given segment, as in exact Bayesian
+        segmentation. As the posterior distribution of a combination is constant within each segment, the average
+        posterior sequence is a weighted sum of segment distributions, and the local evidence of the average model is
+        a weighted sum of the local evidence values of all segments. Forward passes take O(T^2) time steps (instead of
+        O(T) time steps for each combination), all tables of segments need O(T^2) memory. For forward-only and
+        evidence-only fits, the local evidence is accumulated during the forward passes in O(T^2*G) operations (G:
+        number of parameter grid points). For full fits, the local evidence of a segment at a given time step depends
+        on the posterior distribution of the complete segment (via 1/sum(posterior/likelihood)), which does not
+        factorize into prefix and suffix sums. It is therefore evaluated for all segments [a, b) and all time steps
+        within them, which takes O(T^3*G) operations and dominates the run time of full fits on long data sets. The
+        results are identical to the ones of fitting all combinations one by one. See fit for a description of the
+        arguments.
+
+        Returns:
+            ndarray: Local evidence of the average model (sum of the local evidence values of all combinations,
+                weighted by their hyper-prior values)
+        """
+        nSteps = len(self.formattedData)
+        latticeVolume = np.prod(self.latticeConstant)
+        gridVolume = int(np.prod(self.gridSize))
+        axes = tuple(range(1, len(self.gridSize) + 1))
+        expand = (slice(None),) + (None,)*len(self.gridSize)
+
+        # possible segment boundaries and log-hyper-prior values of all change-points
+        candidates, priors = self._getSegmentBoundaries()
+        with np.errstate(divide='ignore'):
+            logPriors = np.log(priors)
+        starts = np.union1d([0], np.flatnonzero(np.any(candidates, axis=0)))
+
+        if not silent:
+            print('    + Computing evidence of {} change-point combinations from {} segment starts.'
+                  .format(len(self.hyperGridValues), len(starts)))
+
+        startPrior = self._computePrior(silent=True)
+        resetPrior, finalPrior = self._computeSegmentPriors()
+
+        # summed hyper-prior values of all combinations that contain a given segment (re-scaled in the same way as the
+        # hyper-prior values of the hyper-grid, see ChangepointStudy.fit)
+        logSegments = np.zeros((nSteps + 1, nSteps + 1))
+        logSegments[np.tril_indices(nSteps + 1)] = -np.inf
+        logPriorWeights, logPriorNorm = self._segmentationWeights(logSegments, logPriors)
+        logPriorWeights += np.log(np.sum(self.flatHyperPriorValues)) - logPriorNorm
+
+        # forward passes from all segment starts: log-evidence of all segments [a, b); the local evidence of a forward
+        # pass is the normalization constant, and only depends on the start of the segment
+        localEvidence = np.zeros(nSteps)
+        logSegmentEvidence = np.zeros((nSteps + 1, nSteps + 1)) - np.inf
+        for block in np.array_split(starts, int(np.ceil(len(starts)*gridVolume/2.**23))):
+            if forwardOnly or evidenceOnly:
+                priorTails = self._segmentTails(logPriorWeights[block])
+            logEvidence = np.zeros(len(block))
+            for i, nActive, active, norm in self._segmentFilter(block, startPrior, resetPrior):
+                with np.errstate(divide='ignore'):
+                    logEvidence[:nActive] += np.log(norm)
+                logSegmentEvidence[block[:nActive], i + 1] = logEvidence[:nActive]
+                if forwardOnly or evidenceOnly:
+                    localEvidence[i] += np.dot(priorTails[:nActive, i], norm)*latticeVolume
+
+        # log-evidence of all combinations (integration yields evidence, not only sum)
+        logEvidenceValues = []
+        for chunk in self.hyperGridValues.chunks():
+            boundaries = np.searchsorted(self.formattedTimestamps, chunk) + 1
+            boundaries = np.column_stack([np.zeros(len(chunk), dtype=int), boundaries,
+                                          np.zeros(len(chunk), dtype=int) + nSteps])
+            logEvidenceValues.append(np.sum(logSegmentEvidence[boundaries[:, :-1], boundaries[:, 1:]], axis=1) +
+                                     np.log(latticeVolume))
+        logEvidenceValues = np.concatenate(logEvidenceValues)
+
+        self._warnEmptyDistribution('Forward pass', count=np.sum(~np.isfinite(logEvidenceValues)))
+
+        self.logEvidenceList += list(logEvidenceValues)
+        self.prunedList += [False]*len(logEvidenceValues)
+        if evidenceOnly:
+            return localEvidence
+
+        # summed weights (evidence times hyper-prior value) of all combinations that contain a given segment, relative
+        # to the largest one (see _addToAveragePosteriorSequence)
+        logWeights, _ = self._segmentationWeights(logSegmentEvidence, logPriors)
+        logWeights += np.log(np.sum(self.flatHyperPriorValues)) - logPriorNorm + np.log(latticeVolume)
+        valid = np.isfinite(logWeights)
+        self.averageLogWeight = np.amax(logWeights[valid]) if np.any(valid) else -np.inf
+        logWeights -= self.averageLogWeight
+        del logSegmentEvidence
+
+        # forward pass: filtering distributions of all segments that contain a time step are weighted by all
+        # combinations in which the segment ends after this time step
+        if forwardOnly:
+            for block in np.array_split(starts, int(np.ceil(len(starts)*gridVolume/2.**23))):
+                weightTails = self._segmentTails(logWeights[block])
+                for i, nActive, active, norm in self._segmentFilter(block, startPrior, resetPrior):
+                    self.averagePosteriorSequence[i] += np.tensordot(weightTails[:nActive, i], active, axes=1)
+            return localEvidence
+
+        # full fit: the posterior distribution of a segment is constant within the segment; segment distributions are
+        # stored for blocks of segment starts, local evidence values are obtained by matrix products
+        blockSize = max(1, int(2**23/(nSteps*gridVolume)))
+        stepBlockSize = max(1, int(2**23/max(nSteps, gridVolume)))
+        for block in np.array_split(starts, int(np.ceil(len(starts)/blockSize))):
+            first = block[0]
+            segments = self._allocateSequence([len(block), nSteps - first] + self.gridSize)
+            for i, nActive, active, norm in self._segmentFilter(block, startPrior, resetPrior):
+                posterior = active*(resetPrior if i < nSteps - 1 else finalPrior)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    posterior /= np.sum(posterior, axis=axes)[expand]
+                segments[:nActive, i - first] = posterior
+                segments[nActive:, i - first] = 0.
+
+            # local evidence: 1/(sum of posterior/likelihood) for all segments that contain a time step
+            flatSegments = segments.reshape(len(block), nSteps - first, -1)
+            for start in range(first, nSteps, stepBlockSize):
+                stop = min(start + stepBlockSize, nSteps)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    inverseLikelihood = np.array([1./self._computeLikelihood(i).ravel() for i in range(start, stop)])
+                    inverseLikelihood = inverseLikelihood.astype(self.dtype)
+                for j, a in enumerate(block):
+                    # segments [a, b) with b > start and non-zero hyper-prior weight (row b-1 holds the segment)
+                    ends = np.flatnonzero(np.isfinite(logPriorWeights[a, max(a, start) + 1:])) + max(a, start) + 1
+                    if len(ends) == 0:
+                        continue
+                    steps = np.arange(start, stop)
+                    with np.errstate(divide='ignore', invalid='ignore'):
+                        sums = flatSegments[j, ends - 1 - first].dot(inverseLikelihood.T)*latticeVolume
+                        contained = (steps[None, :] < ends[:, None]) & (steps[None, :] >= a)
+                        terms = np.exp(logPriorWeights[a, ends])[:, None]/sums
+                    localEvidence[start:stop] += np.sum(np.where(contained, terms, 0.), axis=0)
+
+            # average posterior sequence: each segment distribution contributes to all time steps of the segment
+            # (summed in reverse order, so that only non-negative values are added)
+            running = np.zeros([len(block)] + self.gridSize, dtype=self.dtype)
+            for i in range(nSteps - 1, first - 1, -1):
+                weights = np.exp(logWeights[block, i + 1])
+                used = weights > 0.
+                running[used] += weights[used][expand]*segments[used, i - first]
+                nStarted = np.searchsorted(block, i, side='right')
+                self.averagePosteriorSequence[i] += np.sum(running[:nStarted], axis=0)
+            del segments
+
+        return localEvidence
+
+    def _segmentFilter(self, block, startPrior, resetPrior):
+        """
+        Runs forward passes from multiple segment starts at once (see _segmentationFit). The parameter distributions
+        of all started segments are stacked and updated in a single loop over time steps. Distributions that contain
+        only zeros are kept (with a normalization constant of zero).
+
+        Args:
+            block(ndarray): Sorted segment starts (index of the first time step of the segment)
+            startPrior(ndarray): Parameter distribution at the first time step of the data
+            resetPrior(ndarray): Parameter distribution right after a change-point
+
+        Returns:
+            Generator object that yields the time step, the number of started segments, their (normalized) filtering
+            distributions and their normalization constants
+        """
+        nSteps = len(self.formattedData)
+
+        distributions = np.empty([len(block)] + self.gridSize, dtype=self.dtype)
+        nActive = 0
+        for i in range(block[0], nSteps):
+            nStarted = np.searchsorted(block, i, side='right')
+            for j in range(nActive, nStarted):
+                distributions[j] = startPrior if block[j] == 0 else resetPrior
+            nActive = nStarted
+
+            active = distributions[:nActive]
+            active *= self._computeLikelihood(i)
+            norm = self._normalizeDistribution(active)
+            yield i, nActive, active, norm
+
+    @staticmethod
+    def _segmentTails(logWeights):
+        """
+        Computes the summed weight of all segments that start at a given time step and end after a given time step.
+
+        Args:
+            logWeights(ndarray): Log-weights of segments (first axis enumerates segment starts, second axis the
+                segment ends)
+
+        Returns:
+            ndarray: Summed weights (first axis enumerates segment starts, second axis time steps)
+        """
+        return np.cumsum(np.exp(logWeights[:, :0:-1]), axis=1)[:, ::-1]
+
+    @staticmethod
+    def _segmentationWeights(logSegmentEvidence, logPriors):
+        """
+        Computes the summed weight of all ordered combinations of change-point times that contain a given data segment
+        [a, b), by forward and backward recursions over the change-points. The weight of a combination is the product
+        of the evidence values of its segments and the hyper-prior values of its change-points.
+
+        Args:
+            logSegmentEvidence(ndarray): Log-evidence of all segments [a, b) (-inf for b <= a)
+            logPriors(ndarray): Log-hyper-prior values of all change-points (first axis enumerates change-points,
+                second axis segment boundaries)
+
+        Returns:
+            ndarray, float: Log-weights of all segments, and the log-weight of all combinations
+        """
+        nPoints = len(logPriors)
+        nSteps = len(logSegmentEvidence) - 1
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # forward recursion: weight of all combinations of the first m change-points with the m-th one at b
+            logForward = np.zeros((nPoints + 1, nSteps + 1)) - np.inf
+            logForward[0, 0] = 0.
+            for m in range(1, nPoints + 1):
+                logForward[m] = logPriors[m-1] + logsumexp(logForward[m-1][:, None] + logSegmentEvidence, axis=0)
+
+            # backward recursion: weight of all combinations of the change-points after the m-th one at a
+            logBackward = np.zeros((nPoints + 1, nSteps + 1)) - np.inf
+            logBackward[nPoints] = logSegmentEvidence[:, nSteps]
+            for m in range(nPoints - 1, -1, -1):
+                logBackward[m] = logsumexp(logSegmentEvidence + (logPriors[m] + logBackward[m+1])[None, :], axis=1)
+
+            # segment [a, b) lies between the m-th and the (m+1)-th change-point
+            logWeights = np.zeros((nSteps + 1, nSteps + 1)) - np.inf
+            for m in range(nPoints):
+                logWeights = np.logaddexp(logWeights, logForward[m][:, None] + logSegmentEvidence +
+                                          (logPriors[m] + logBackward[m+1])[None, :])
+            logWeights[:, nSteps] = np.logaddexp(logWeights[:, nSteps],
+                                                 logForward[nPoints] + logSegmentEvidence[:, nSteps])
+
+        return logWeights, logBackward[0, 0]
+
+    def _getSegmentChangepointIndices(self):
+        """
+        Checks whether the transition model is split into independent data segments by change-points, i.e. whether
+        all change-points re-set the parameter distribution of the complete transition model. This is the case for
+        change-point models within (nested) combined transition models, and for serial transition models that couple
+        sub-models without change-/break-points by change-points only. All change-point values have to be time stamps.
+
+        Returns:
+            list: Indices of the change-point hyper-parameters (in the attribute 'flatHyperParameterNames'), or None if
+                the transition model is not split into independent segments
+        """
+        transitionModel = self.transitionModel
+        if str(transitionModel) == 'Serial transition model':
+            if not np.all(transitionModel.changePointMask):
+                return None
+            subModels = transitionModel.models
+            names = transitionModel.hyperParameterNames
+            if any(len(list(flatten(self._unpackChangepointNames(m)))) > 0 for m in subModels):
+                return None
+        else:
+            subModels = [transitionModel]
+            names = list(flatten(self._unpackChangepointNames(transitionModel)))
+
+        # (nested) serial transition models within sub-models are not supported
+        if len(names) == 0 or any(len(list(flatten(self._unpackBreakpointNames(m)))) > 0 for m in subModels):
+            return None
+
+        indices = [self.flatHyperParameterNames.index(name) for name in names]
+        for i in indices:
+            if not np.all(np.in1d(np.atleast_1d(self.flatHyperParameters[i]), self.formattedTimestamps)):
+                return None
+        return indices
+
+    def _fitSegments(self, hyperParamValues):
+        """
+        Computes the evidence of a combination of change-point times (and other hyper-parameter values) from the forward
+        passes over the data segments between the change-points. Forward passes are taken from (or added to) the
+        segment cache (attribute 'segmentCache'), so that a data segment is only fitted once for all combinations of
+        change-point times that contain it. Log-evidence and local evidence values are identical to the ones of a fit
+        with evidenceOnly set to True.
+
+        Args:
+            hyperParamValues: Values of the hyper-parameters (in the order of the attribute 'flatHyperParameterNames')
+        """
+        hyperParamValues = np.asarray(hyperParamValues)
+        nSteps = len(self.formattedData)
+
+        # segment boundaries (index of the first time step after a change-point) and values of all other
+        # hyper-parameters, which determine the transition model within a segment
+        isChangepoint = np.zeros(len(hyperParamValues), dtype=bool)
+        isChangepoint[self.segmentChangepointIndices] = True
+        boundaries = np.searchsorted(self.formattedTimestamps, np.sort(hyperParamValues[isChangepoint])) + 1
+        boundaries = np.concatenate([[0], boundaries, [nSteps]])
+        hyperParamKey = tuple(hyperParamValues[~isChangepoint])
+
+        self.logEvidence = 0.
+        localEvidence = []
+        for index, (start, stop) in enumerate(zip(boundaries[:-1], boundaries[1:])):
+            if stop > start:
+                logEvidence, segmentLocalEvidence, _ = self._fitSegment(index, start, stop, hyperParamKey)
+                self.logEvidence += logEvidence
+                localEvidence.append(segmentLocalEvidence)
+        self.localEvidence = np.concatenate(localEvidence)
+        self.logEvidence += np.log(np.prod(self.latticeConstant))  # integration yields evidence, not only sum
+
+        if not np.isfinite(self.logEvidence):
+            self._warnEmptyDistribution('Forward pass')
+            self.logEvidence = -np.inf
+
+        self.prunedTimeStep = None
+        self.posteriorSequence = []
+        self.posteriorMeanValues = []
+        self.posteriorVarianceValues = []
+
+    def _fitSegment(self, index, start, stop, hyperParamKey):
+        """
+        Runs the forward pass over a data segment between two change-points (see _fitSegments). If the segment is not
+        cached, but the same segment without its last time step is, the cached forward pass is extended by one time
+        step. The hyper-parameter values of the current combination have to be set.
+
+        Args:
+            index(int): Index of the segment (i.e. number of preceding change-points)
+            start(int): Index of the first time step of the segment
+            stop(int): Index of the time step after the segment
+            hyperParamKey(tuple): Values of all hyper-parameters other than change-points
+
+        Returns:
+            tuple: Log-evidence, local evidence values and filtering distribution of the last time step of the segment
+        """
+        key = (index, start, stop, hyperParamKey)
+        entry = self.segmentCache.get(key)
+        if entry is not None:
+            return entry
+
+        timestamps = self.formattedTimestamps
+        previous = self.segmentCache.get((index, start, stop - 1, hyperParamKey)) if stop - 1 > start else None
+        if previous is not None:
+            logEvidence, localEvidence, alpha = previous
+            first = stop - 1
+            alpha = self.transitionModel.computeForwardPrior(alpha, timestamps[stop - 2])
+        else:
+            logEvidence = 0.
+            localEvidence = np.array([])
+            first = start
+            if start == 0:
+                alpha = self._computePrior(silent=True)
+            else:
+                # parameter distribution right after the change-point does not depend on the distribution before
+                alpha = self.transitionModel.computeForwardPrior(np.ones(self.gridSize, dtype=self.dtype),
+                                                                 timestamps[start - 1])
+
+        newLocalEvidence = np.zeros(stop - first) + np.nan
+        if np.isfinite(logEvidence):
+            for i in range(first, stop):
+                if i > first:
+                    alpha = self.transitionModel.computeForwardPrior(alpha, timestamps[i - 1])
+
+                # distributions may be shared with the cache, they are not modified in place
+                alpha = alpha*self._computeLikelihood(i)
+                norm = np.sum(alpha, dtype=np.float64)
+                if not norm > 0.:
+                    logEvidence = -np.inf
+                    break
+                alpha /= norm
+                logEvidence += np.log(norm)
+                newLocalEvidence[i - first] = norm*np.prod(self.latticeConstant)
+
+        entry = (logEvidence, np.append(localEvidence, newLocalEvidence), alpha)
+        self.segmentCache.put(key, entry)
+        return entry
+
+    def _supportsPrefixSharing(self, forwardOnly, evidenceOnly):
+        """
+        Checks whether the hyper-grid values can be fitted by forward passes that share common prefixes (see
+        _prefixSharingFit). This requires a serial transition model with at least one break-point, and a forward-only
+        fit (storing joint distributions) or an evidence-only fit in linear space without pruning.
+
+        Args:
+            forwardOnly(bool): see fit
+            evidenceOnly(bool): see fit
+
+        Returns:
+            bool: True if forward passes can share common prefixes, False otherwise
+        """
+        transitionModel = self.transitionModel
+        if str(transitionModel) != 'Serial transition model' or np.all(transitionModel.changePointMask):
+            return False
+        if not evidenceOnly and (not forwardOnly or self.marginalsOnly):
+            return False
+        return isinstance(self.hyperGridValues, HyperGrid) and not self.logSpace and self.pruningMargin is None
+
+    def _prefixSharingFit(self, forwardOnly, evidenceOnly, silent):
+        """
+        Fits all hyper-grid values of a serial transition model (see _supportsPrefixSharing) by forward passes that
+        share common prefixes. The forward pass up to a break-point only depends on the hyper-parameters of the
+        preceding sub-models and break-points. The hyper-grid values are therefore visited in the order of a prefix tree
+        (sorted by the parameters of the first sub-model, the first break time, the parameters of the second sub-model,
+        and so on), and each forward pass continues from the filtering distribution of the last time step it shares with
+        the previous one. Filtering distributions are stored as snapshots at all break times; the accumulated
+        log-evidence and local evidence values are kept for all time steps. For forward-only fits, the filtering
+        distribution of each time step is added to the average posterior sequence once, weighted by all hyper-grid
+        values that share it. The results are identical to the ones of fitting all hyper-grid values one by one. See
+        fit for a description of the arguments.
+        """
+        nSteps = len(self.formattedData)
+        latticeVolume = np.prod(self.latticeConstant)
+        blockSize = max(1, int(2**23/np.prod(self.gridSize)))
+        transitionModel = self.transitionModel
+        timestamps = self.formattedTimestamps
+
+        # hyper-parameters in chronological order: parameters of the j-th sub-model, followed by the j-th break time
+        # (sub-model parameters precede all break times in the flat list of hyper-parameters)
+        sizes = [len(list(flatten(self._unpackHyperParameters(m)))) for m in transitionModel.models]
+        offsets = np.cumsum([0] + sizes)
+        columns = []
+        columnLevels = []
+        for j, size in enumerate(sizes):
+            columns += list(range(offsets[j], offsets[j+1])) + ([offsets[-1] + j] if j < len(sizes) - 1 else [])
+            columnLevels += [j]*size + ([-(j+1)] if j < len(sizes) - 1 else [])
+        columns = np.array(columns)
+        columnLevels = np.array(columnLevels)
+
+        values = self.hyperGridValues[:]
+        order = np.lexsort(values[:, columns].T[::-1])
+
+        # index of the time step after which the j-th break-point applies (last time step of the preceding sub-model)
+        breakSteps = np.searchsorted(timestamps, values[:, offsets[-1]:])
+
+        # first time step at which the forward pass of a hyper-grid value differs from the one of its predecessor: a
+        # different parameter of sub-model j changes all time steps after the (j-1)-th break, a different break time
+        # changes all time steps after the earlier one of both break times
+        sortedValues = values[order][:, columns]
+        firstColumns = np.argmax(sortedValues[1:] != sortedValues[:-1], axis=1)
+        levels = columnLevels[firstColumns]
+        divergence = np.zeros(len(order) - 1, dtype=int)
+        for position, level in enumerate(levels):
+            previous, current = breakSteps[order[position]], breakSteps[order[position + 1]]
+            if level < 0:
+                divergence[position] = min(previous[-level-1], current[-level-1]) + 1
+            elif level > 0:
+                divergence[position] = current[level-1] + 1
+        divergence[np.all(sortedValues[1:] == sortedValues[:-1], axis=1)] = nSteps
+        divergence = np.minimum(divergence, nSteps)
+
+        if not silent:
+            print('    + Computing {} forward passes with shared prefixes ({} of {} time steps).'
+                  .format(len(order), nSteps + np.sum(nSteps - divergence), len(order)*nSteps))
+
+        # state of the forward pass that is continued by the next hyper-grid value
+        heldLogEvidence = np.zeros(nSteps)
+        heldLocalEvidence = np.zeros(nSteps)
+        prior = self._computePrior(silent=True)
+        snapshots = {}
+        failedStep = nSteps
+        held = None
+        if not evidenceOnly:
+            held = self._allocateSequence([nSteps] + self.gridSize)
+            weightSums = np.zeros(nSteps)
+
+        logEvidenceValues = np.zeros(len(order))
+        localEvidenceValues = np.zeros((len(order), nSteps))
+        for position, index in enumerate(order):
+            start = 0 if position == 0 else divergence[position - 1]
+            self._setSelectedHyperParameters(values[index])
+
+            # forward passes that share a prefix with zero evidence fail as well
+            if start < nSteps and start <= failedStep:
+                failedStep = nSteps
+                for i in [i for i in snapshots if i >= start]:
+                    del snapshots[i]
+
+                # filtering distributions that are re-computed are added to the average posterior sequence, weighted
+                # by all hyper-grid values that have shared them
+                if held is not None:
+                    for i in range(start, nSteps, blockSize):
+                        weights = weightSums[i:i+blockSize]
+                        self.averagePosteriorSequence[i:i+blockSize] += \
+                            weights.reshape((-1,) + (1,)*len(self.gridSize))*held[i:i+blockSize]
+                    weightSums[start:] = 0.
+
+                if start == 0:
+                    alpha = prior
+                    logEvidence = 0.
+                else:
+                    alpha = transitionModel.computeForwardPrior(snapshots[start - 1], timestamps[start - 1])
+                    logEvidence = heldLogEvidence[start - 1]
+
+                breaks = set(breakSteps[index])
+                for i in range(start, nSteps):
+                    if i > start:
+                        alpha = transitionModel.computeForwardPrior(alpha, timestamps[i - 1])
+
+                    # snapshots are shared with later forward passes, distributions are not modified in place
+                    alpha = alpha*self._computeLikelihood(i)
+                    norm = np.sum(alpha, dtype=np.float64)
+                    if not norm > 0.:
+                        failedStep = i
+                        heldLogEvidence[i:] = -np.inf
+                        heldLocalEvidence[i:] = np.nan
+                        if held is not None:
+                            held[i:] = 0.
+                        break
+
+                    alpha /= norm
+                    logEvidence += np.log(norm)
+                    heldLogEvidence[i] = logEvidence
+                    heldLocalEvidence[i] = norm*latticeVolume
+                    if held is not None:
+                        held[i] = alpha
+                    if i in breaks:
+                        snapshots[i] = alpha
+
+            logEvidenceValues[position] = heldLogEvidence[-1] + np.log(latticeVolume)
+            localEvidenceValues[position] = heldLocalEvidence
+
+            if not np.isfinite(logEvidenceValues[position]):
+                self._warnEmptyDistribution('Forward pass')
+            elif held is not None:
+                # weights are stored relative to the largest one (see _addToAveragePosteriorSequence)
+                logWeight = logEvidenceValues[position] + np.log(self.flatHyperPriorValues[index])
+                if logWeight > self.averageLogWeight:
+                    if np.isfinite(self.averageLogWeight):
+                        scale = np.exp(self.averageLogWeight - logWeight)
+                        self.averagePosteriorSequence *= scale
+                        weightSums *= scale
+                    self.averageLogWeight = logWeight
+                weightSums += np.exp(logWeight - self.averageLogWeight)
+
+        if held is not None:
+            for i in range(0, nSteps, blockSize):
+                weights = weightSums[i:i+blockSize]
+                self.averagePosteriorSequence[i:i+blockSize] += \
+                    weights.reshape((-1,) + (1,)*len(self.gridSize))*held[i:i+blockSize]
+            del held
+
+        # results are stored in the order of the hyper-grid values
+        inverse = np.argsort(order)
+        self.logEvidenceList += list(logEvidenceValues[inverse])
+        self.localEvidenceList += list(localEvidenceValues[inverse])
+        self.prunedList += [False]*len(order)
+
+    def _runParallelFit(self, nJobs, backend, forwardOnly, evidenceOnly, silent, vectorized, memoryBudget, pool=None):
+        """
+        Distributes the hyper-grid values among multiple processes (see _parallelFit) and collects the reductions of
+        all partial fits (see _getFitReductions).
+
+        Args:
+            nJobs(int): Number of processes to employ.
+            backend(str): Multiprocessing backend, either 'multiprocessing' or 'pathos' (see fit).
+            forwardOnly(bool): see fit
+            evidenceOnly(bool): see fit
+            silent(bool): see fit
+            vectorized(bool): see fit
+            memoryBudget(float): see fit
+            pool(WorkerPool): Long-lived pool of worker processes (optional, replaces the backend)
+
+        Returns:
+            list: Reductions of the partial fits (one tuple per process)
+        """
+        global _forkedStudy
+
+        args = (range(nJobs), [nJobs]*nJobs, [forwardOnly]*nJobs, [evidenceOnly]*nJobs, [silent]*nJobs,
+                [vectorized]*nJobs, [memoryBudget]*nJobs)
+
+        if pool is not None:
+            # only attributes that are needed by the workers are serialized (average posterior sequences are
+            # re-initialized by each worker)
+            S = copy(self)
+            S.posteriorSequence = []
+            S.marginalPosteriorSequences = []
+            S.averagePosteriorSequence = None
+            S.averageMarginalPosteriorSequences = []
+            return pool.fit(S, list(zip(*args)))
+
+        if backend == 'multiprocessing':
+            if not hasattr(os, 'fork'):
+                raise ConfigurationError('The "multiprocessing" backend requires a system that supports forking of '
+                                         'processes. Use backend="pathos" instead.')
+            try:
+                context = multiprocessing.get_context('fork')
+            except AttributeError:  # Python 2 always forks worker processes on POSIX systems
+                context = multiprocessing
+
+            if not silent:
+                print('    + Creating {} processes.'.format(nJobs))
+
+            # worker processes inherit the study from the main process instead of receiving a pickled copy
+            _forkedStudy = self
+            pool = context.Pool(processes=nJobs)
+            try:
+                reductions = pool.map(_forkedParallelFit, list(zip(*args)))
+            finally:
+                pool.terminate()
+                _forkedStudy = None
+            return reductions
+
+        if backend == 'pathos':
+            try:
+                from pathos.multiprocessing import ProcessPool
+            except ImportError:
+                raise ImportError('No module named pathos.multiprocessing. This module represents an optional '
+                                  'dependency of bayesloop and is therefore not installed alongside bayesloop.')
+
+            # prepare parallel execution
+            if not silent:
+                print('    + Creating {} processes.'.format(nJobs))
+            pool = ProcessPool(nodes=nJobs)
+
+            # use parallelFit method to create copies of this HyperStudy instance with only partial
+            # hyper-grid values
+            subStudies = pool.map(self._parallelFit, *args)
+
+            # prevent memory pile-up in main process
+            pool.close()
+            pool.join()
+            pool.terminate()
+            pool.restart()
+
+            return [S._getFitReductions(averages=not evidenceOnly) for S in subStudies]
+
+        raise ConfigurationError('Unknown multiprocessing backend "{}". Available options: "auto", '
+                                 '"multiprocessing", "pathos".'.format(backend))
+
+    def _getFitReductions(self, averages=True):
+        """
+        Returns the results of a (partial) fit that are needed to merge it with the results of other partial fits.
+
+        Args:
+            averages(bool): If set to False, no average posterior distributions are returned (e.g. for fits that only
+                compute evidence values).
+
+        Returns:
+            list, list, list, ndarray, float: Log-evidence values, local evidence values and pruning flags (see fit)
+                for all hyper-grid values, the (unnormalized) average posterior sequence (list of average marginal
+                distributions if the attribute 'marginalsOnly' is set to True; None if averages is set to False) and
+                the logarithm of its scale (see _addToAveragePosteriorSequence)
+        """
+        if not averages:
+            return self.logEvidenceList, self.localEvidenceList, self.prunedList, None, -np.inf
+        elif self.marginalsOnly:
+            average = self.averageMarginalPosteriorSequences
+        else:
+            average = self.averagePosteriorSequence
+        return self.logEvidenceList, self.localEvidenceList, self.prunedList, average, self.averageLogWeight
+
+    def _parallelFit(self, idx, nJobs, forwardOnly, evidenceOnly, silent, vectorized=False, memoryBudget=1000.):
         """
         This method is called by the fit method of the HyperStudy class. It creates a copy of the current class
         instance and performs a fit based on a subset of the specified hyper-parameter grid. The method thus allows
@@ -1458,7 +3443,7 @@ class HyperStudy(Study):
 
         Args:
             idx(int): Index from 0 to (nJobs-1), indicating which part of the hyper-grid values are to be analyzed.
-            nJobs(int): Number of processes to employ. Multiprocessing is based on the 'pathos' module.
+            nJobs(int): Number of processes to employ.
             forwardOnly(bool): If set to True, the fitting process is terminated after the forward pass. The resulting
                 posterior distributions are so-called "filtering distributions" which - at each time step -
                 only incorporate the information of past data points. This option thus emulates an online
@@ -1466,14 +3451,29 @@ class HyperStudy(Study):
             evidenceOnly(bool): If set to True, only forward pass is run and evidence is calculated. In contrast to the
                 forwardOnly option, no posterior mean values are computed and no posterior distributions are stored.
             silent(bool): If set to True, no output is generated by the fitting method.
+            vectorized(bool): If set to True, the hyper-grid values of this process are fitted in batches (see fit).
+            memoryBudget(float): Maximal size (in megabytes) of the stacked parameter distributions of a vectorized
+                fit.
 
         Returns:
             HyperStudy instance
         """
         S = copy(self)
-        S.hyperGridValues = np.array_split(S.hyperGridValues, nJobs)[idx]
+        S.hyperGridValues = S.hyperGridValues.split(nJobs)[idx]
         S.flatHyperPriorValues = np.array_split(S.flatHyperPriorValues, nJobs)[idx]
 
+        # each sub-study collects its own evidence values and accumulates its own average posterior sequence (the
+        # main study may already contain results of previous fits, e.g. of the coarse hyper-grid of an adaptive fit)
+        S.logEvidenceList = []
+        S.localEvidenceList = []
+        S.prunedList = []
+        if not evidenceOnly:
+            S._initAveragePosteriorSequence()
+
+        if vectorized and S._supportsVectorizedFit(silent=(silent or idx < nJobs-1)):
+            S._vectorizedFit(forwardOnly, evidenceOnly, (silent or idx < nJobs-1), memoryBudget)
+            return S
+
         # show progressbar for last process if silent=False
         if not silent and idx == nJobs-1:
             # first assume jupyter notebook and tray to use tqdm-widget, if it fails, use normal tqdm-progressbar
@@ -1485,22 +3485,9 @@ class HyperStudy(Study):
             enum = enumerate(S.hyperGridValues)
 
         for i, hyperParamValues in enum:
-            S._setSelectedHyperParameters(hyperParamValues)
-
-            # call fit method from parent class
-            Study.fit(S, forwardOnly=forwardOnly, evidenceOnly=evidenceOnly, silent=True)
-
-            S.logEvidenceList.append(S.logEvidence)
-            S.localEvidenceList.append(S.localEvidence)
-            if (not evidenceOnly) and np.isfinite(S.logEvidence):
-                # For numerical stability, zeros in posterior distribution are replaced with small constant.
-                # Note that this is typically only the case for hyper-parameter values with low likelihood. The
-                # procedure therefore has no (measurable) effect on the average posterior sequence.
-                S.posteriorSequence[S.posteriorSequence < 10. ** -300] = 10. ** -300
-                S.averagePosteriorSequence = np.logaddexp(S.averagePosteriorSequence,
-                                                          np.log(S.posteriorSequence) +
-                                                          S.logEvidence +
-                                                          np.log(S.flatHyperPriorValues[i]))
+            if i > 0 and S._deadlinePassed():
+                break
+            S._fitHyperGridValue(i, hyperParamValues, forwardOnly, evidenceOnly)
 
         # remove progressbar correctly
         if not silent and idx == nJobs-1:
@@ -1508,6 +3495,253 @@ class HyperStudy(Study):
 
         return S
 
+    def _supportsVectorizedFit(self, silent=False):
+        """
+        Checks whether the hyper-grid values can be fitted in batches (see _vectorizedFit). This requires that the
+        transition model (and all of its sub-models) supports batch transformations, and that the fit is carried out
+        in linear space without a posterior callback and without pruning (see fit).
+
+        Args:
+            silent(bool): If set to True, no output is generated by this method.
+
+        Returns:
+            bool: True if a vectorized fit is possible, False otherwise
+        """
+        def supportsBatch(transitionModel):
+            if not hasattr(transitionModel, 'computeForwardPriorBatch'):
+                return False
+            if hasattr(transitionModel, 'models'):
+                return all(supportsBatch(m) for m in transitionModel.models)
+            return True
+
+        if supportsBatch(self.transitionModel) and not self.logSpace and self.posteriorCallback is None and \
+                self.pruningMargin is None:
+            return True
+
+        if not silent:
+            print('    ! WARNING: Vectorized fit is not available for this transition model or fit option, fitting '
+                  'hyper-grid values one by one.')
+        return False
+
+    def _vectorizedFit(self, forwardOnly, evidenceOnly, silent, memoryBudget):
+        """
+        Fits all hyper-grid values in batches. The parameter distributions of all hyper-grid values in a batch are
+        stacked along a leading axis and are processed in a single loop over time steps (see _fitBatch), so that the
+        overhead of the loop is paid once per batch instead of once per hyper-grid value. The number of hyper-grid
+        values in a batch is chosen such that the stacked parameter distributions (and a few arrays of working memory)
+        do not exceed the given memory budget.
+
+        Args:
+            forwardOnly(bool): If set to True, only the forward pass is run (filtering distributions are averaged).
+            evidenceOnly(bool): If set to True, only the forward pass is run and evidence is calculated.
+            silent(bool): If set to True, no output is generated by this method.
+            memoryBudget(float): Maximal size (in megabytes) of the stacked parameter distributions.
+        """
+        stepsStored = 0 if evidenceOnly else len(self.formattedData)
+        memberSize = (stepsStored + 4)*np.prod(self.gridSize)*np.dtype(self.dtype).itemsize/2.**20
+        batchSize = int(min(max(1, memoryBudget // memberSize), len(self.hyperGridValues)))
+
+        # show progressbar if silent=False
+        if not silent:
+            print('    + Fitting {} hyper-grid values at a time.'.format(batchSize))
+            # first assume jupyter notebook and try to use tqdm-widget; if it fails, use normal tqdm-progressbar
+            try:
+                progress = tqdm_notebook(total=len(self.hyperGridValues))
+            except:
+                progress = tqdm(total=len(self.hyperGridValues))
+
+        for start in range(0, len(self.hyperGridValues), batchSize):
+            if start > 0 and self._deadlinePassed():
+                break
+
+            # hyper-parameters are set to arrays that contain one value for each member of the batch
+            values = self.hyperGridValues[start:start+batchSize]
+            self._setSelectedHyperParameters(list(values.T))
+
+            logEvidence, localEvidence, sequences = self._fitBatch(len(values), forwardOnly, evidenceOnly)
+
+            self.logEvidenceList += list(logEvidence)
+            self.localEvidenceList += list(localEvidence)
+            self.prunedList += [False]*len(values)
+
+            if not evidenceOnly:
+                for i in range(len(values)):
+                    if not np.isfinite(logEvidence[i]):
+                        continue
+
+                    self.posteriorSequence = sequences[i]
+                    if self.marginalsOnly:
+                        self.marginalPosteriorSequences = \
+                            [np.sum(sequences[i], axis=tuple(k + 1 for k in range(len(self.gridSize)) if k != j))
+                             for j in range(len(self.gridSize))]
+                    self._addToAveragePosteriorSequence(logEvidence[i] + np.log(self.flatHyperPriorValues[start+i]))
+
+            if not silent:
+                progress.update(len(values))
+
+        # release stacked distributions of last batch
+        self.posteriorSequence = []
+        self.marginalPosteriorSequences = []
+
+        # remove progressbar correctly
+        if not silent:
+            progress.close()
+
+    def _fitBatch(self, nMembers, forwardOnly, evidenceOnly):
+        """
+        Runs the forward (and backward) pass for a batch of hyper-grid values at once. The current hyper-parameter
+        values of the transition model are expected to be arrays that contain one value for each member of the batch
+        (see _vectorizedFit). The computation follows the fit method of the Study class, but all parameter
+        distributions carry an additional leading axis that enumerates the members of the batch.
+
+        Args:
+            nMembers(int): Number of hyper-grid values in the batch
+            forwardOnly(bool): If set to True, only the forward pass is run.
+            evidenceOnly(bool): If set to True, only the forward pass is run and no distributions are stored.
+
+        Returns:
+            ndarray, ndarray, ndarray: Log-evidence values (one per member), local evidence values (first axis
+                enumerates members) and sequences of parameter distributions (first axis enumerates members, second
+                axis enumerates time steps; None if evidenceOnly is set to True)
+        """
+        nSteps = len(self.formattedData)
+        axes = tuple(range(1, len(self.gridSize) + 1))  # axis 0 enumerates members of batch
+        expand = (slice(None),) + (None,)*len(self.gridSize)  # broadcasts one value per member to the grid
+        latticeVolume = np.prod(self.latticeConstant)
+
+        logEvidence = np.zeros(nMembers)
+        localEvidence = np.empty((nMembers, nSteps))
+        valid = np.ones(nMembers, dtype=bool)
+
+        sequences = None
+        if not evidenceOnly:
+            sequences = self._allocateSequence([nMembers, nSteps] + self.gridSize)
+
+        # set prior distribution for forward-pass
+        alpha = np.empty([nMembers] + self.gridSize, dtype=self.dtype)
+        alpha[:] = self._computePrior(silent=True)
+
+        # forward pass
+        for i in range(nSteps):
+            alpha *= self._computeLikelihood(i)
+
+            # normalize alpha (for numerical stability), the normalization constants are used to compute evidence
+            norm = self._normalizeDistribution(alpha)
+
+            # if all probability values of a member are zero, normalization is not possible
+            invalid = valid & ~(norm > 0.)
+            self._warnEmptyDistribution('Forward pass', count=np.sum(invalid))
+            valid &= ~invalid
+            norm[~valid] = 1.
+
+            logEvidence += np.log(norm)
+            localEvidence[:, i] = norm*latticeVolume
+
+            if sequences is not None:
+                sequences[:, i] = alpha
+
+            alpha = self.transitionModel.computeForwardPriorBatch(alpha, self.formattedTimestamps[i])
+
+        logEvidence += np.log(latticeVolume)  # integration yields evidence, not only sum
+
+        if not (forwardOnly or evidenceOnly):
+            # set prior distribution for backward-pass
+            if self.observationModel.prior is not None:
+                prior = self._computePrior(silent=True)
+            else:
+                prior = np.ones(self.gridSize, dtype=self.dtype)  # flat prior
+
+            # normalize beta (for numerical stability only)
+            beta = np.empty([nMembers] + self.gridSize, dtype=self.dtype)
+            beta[:] = prior/np.sum(prior)
+
+            # backward pass
+            for i in np.arange(0, nSteps)[::-1]:
+                # posterior ~ alpha*beta (computed in place)
+                posterior = sequences[:, i]
+                posterior *= beta
+
+                # normalize posterior wrt the parameters
+                norm = self._normalizeDistribution(posterior)
+
+                invalid = valid & ~(norm > 0.)
+                self._warnEmptyDistribution('Posterior', count=np.sum(invalid))
+                valid &= ~invalid
+
+                # re-use (or re-compute) likelihood
+                likelihood = self._computeLikelihood(i)
+
+                # compute local evidence
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    localEvidence[:, i] = 1./(np.sum(posterior/likelihood, axis=axes)*latticeVolume)
+
+                # compute (normalized) beta for next iteration
+                beta = self.transitionModel.computeBackwardPriorBatch(beta*likelihood, self.formattedTimestamps[i])
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    beta /= np.sum(beta, axis=axes)[expand]
+
+        logEvidence[~valid] = -np.inf
+
+        return logEvidence, localEvidence, sequences
+
+    def _initAveragePosteriorSequence(self):
+        """
+        Allocates the average posterior sequence (or the average marginal posterior distributions if the attribute
+        'marginalsOnly' is set to True). The average posterior distribution is accumulated in linear space, relative to
+        the largest weight that has been added so far (see _addToAveragePosteriorSequence). This way, it can be updated
+        iteratively without storing all individual posterior distributions (after the iteration over all
+        hyper-parameter values is done, it is normalized).
+        """
+        if self.marginalsOnly:
+            self.averageMarginalPosteriorSequences = [np.zeros([len(self.formattedData), n], dtype=self.dtype)
+                                                      for n in self.gridSize]
+        else:
+            self.averagePosteriorSequence = self._allocateSequence([len(self.formattedData)]+self.gridSize)
+            self.averagePosteriorSequence.fill(0.)
+        self.averageLogWeight = -np.inf
+
+    def _addToAveragePosteriorSequence(self, logWeight, sequence=None):
+        """
+        Adds the current posterior sequence (weighted by the given log-weight) to the average posterior sequence. The
+        average is stored in linear space, scaled by the largest weight that has been added so far (its logarithm is
+        stored in the attribute 'averageLogWeight'), so that the update only involves a single multiply-add. Only if
+        the new weight exceeds the largest weight, the average is re-scaled. The update is carried out in place, for
+        blocks of time steps, so that no temporary arrays of the size of the complete posterior sequence are created.
+
+        Args:
+            logWeight(float): Logarithm of the weight, i.e. log-evidence plus log-prior of the hyper-parameter values
+            sequence: Sequence of parameter distributions that is added instead of the current posterior sequence
+                (list of marginal distributions if the attribute 'marginalsOnly' is set to True). Used to merge the
+                partial average of another process, together with its log-scale as logWeight.
+        """
+        if sequence is None:
+            sequence = self.marginalPosteriorSequences if self.marginalsOnly else self.posteriorSequence
+
+        # re-scale average so that it stays relative to the largest weight
+        if logWeight > self.averageLogWeight:
+            if np.isfinite(self.averageLogWeight):
+                scale = np.exp(self.averageLogWeight - logWeight)
+                if self.marginalsOnly:
+                    for average in self.averageMarginalPosteriorSequences:
+                        average *= scale
+                else:
+                    self.averagePosteriorSequence *= scale
+            self.averageLogWeight = logWeight
+
+        # weights that underflow have no (measurable) effect on the average posterior sequence
+        weight = np.exp(logWeight - self.averageLogWeight)
+        if weight == 0.:
+            return
+
+        if self.marginalsOnly:
+            for average, marginal in zip(self.averageMarginalPosteriorSequences, sequence):
+                average += weight*marginal
+            return
+
+        blockSize = max(1, int(2**23/np.prod(self.gridSize)))
+        for i in range(0, len(sequence), blockSize):
+            self.averagePosteriorSequence[i:i+blockSize] += weight*sequence[i:i+blockSize]
+
     # optimization methods are inherited from Study class, but cannot be used in this case
     def optimize(self, *args, **kwargs):
         raise NotImplementedError('HyperStudy object has no optimizing method.')
@@ -1567,19 +3801,10 @@ class HyperStudy(Study):
 
         paramIndex = self._getHyperParameterIndex(self.transitionModel, name)
 
-        axesToMarginalize = list(range(len(self.flatHyperParameterNames)))
-        axesToMarginalize.remove(paramIndex)
-
-        # reshape hyper-parameter distribution for easy marginalizing
-        hyperGridSteps = []
-        for x in self.flatHyperParameters:
-            if isinstance(x, Iterable):
-                hyperGridSteps.append(len(x))
-            else:
-                hyperGridSteps.append(1)
-
-        distribution = self.hyperParameterDistribution.reshape(hyperGridSteps, order='C')
-        marginalDistribution = np.squeeze(np.apply_over_axes(np.sum, distribution, axesToMarginalize))
+        # the hyper-parameter distribution is only stored for the fitted hyper-grid values and is expanded to the
+        # values of the selected hyper-parameter
+        marginalDistribution = self.hyperGridValues.marginalize(self.hyperParameterDistribution, [paramIndex],
+                                                                self.evaluatedIndices)
         marginalDistribution *= np.prod(self.hyperGridConstant)  # convert to probability (from density)
 
         x = self.flatHyperParameters[paramIndex]
@@ -1642,20 +3867,10 @@ class HyperStudy(Study):
             switch = True
             paramIndices = paramIndices[::-1]
 
-        axesToMarginalize = list(range(len(self.flatHyperParameterNames)))
-        for p in paramIndices:
-            axesToMarginalize.remove(p)
-
-        # reshape hyper-parameter distribution for easy marginalizing
-        hyperGridSteps = []
-        for x in self.flatHyperParameters:
-            if isinstance(x, Iterable):
-                hyperGridSteps.append(len(x))
-            else:
-                hyperGridSteps.append(1)
-
-        distribution = self.hyperParameterDistribution.reshape(hyperGridSteps, order='C')
-        marginalDistribution = np.squeeze(np.apply_over_axes(np.sum, distribution, axesToMarginalize))
+        # the hyper-parameter distribution is only stored for the fitted hyper-grid values and is expanded to the
+        # values of the selected hyper-parameters
+        marginalDistribution = self.hyperGridValues.marginalize(self.hyperParameterDistribution, paramIndices,
+                                                                self.evaluatedIndices)
         marginalDistribution *= np.prod(self.hyperGridConstant)  # convert to probability (from density)
 
         x, y = [self.flatHyperParameters[i] for i in paramIndices]
@@ -1761,14 +3976,13 @@ class ChangepointStudy(HyperStudy):
     average model from all possible change points and creates a probability distribution of change point times. It
     supports any number of change-points and arbitarily combined models.
     """
-    def __init__(self, silent=False):
-        super(ChangepointStudy, self).__init__(silent=silent)
+    def __init__(self, silent=False, **kwargs):
+        super(ChangepointStudy, self).__init__(silent=silent, **kwargs)
 
         # store all possible combinations of change-points (even the ones that are assigned a probability of zero),
         # to reconstruct change-point distribution after analysis
         self.allHyperGridValues = []
-        self.allHyperPriorValues = []
-        self.mask = []  # mask to select valid change-point combinations
+        self.validIndices = []  # indices of valid change-point combinations (in 'allHyperGridValues')
 
         self.userDefinedGrid = False  # needed to ensure that user-defined hyper-grid is not overwritten by fit-method
         self.hyperGridBackup = []  # needed to reconstruct hyperGrid attribute in the case of break-point model
@@ -1776,7 +3990,9 @@ class ChangepointStudy(HyperStudy):
         if not silent:
             print('  --> Change-point analysis')
 
-    def fit(self, forwardOnly=False, evidenceOnly=False, silent=False, nJobs=1):
+    def fit(self, forwardOnly=False, evidenceOnly=False, silent=False, nJobs=1, backend='auto', pool=None,
+            pruningMargin=None, timeBudget=None, checkpointDirectory=None, checkpointPeriod=600., resume=False,
+            engine='auto'):
         """
         This method over-rides the corresponding method of the HyperStudy-class. It runs the algorithm for all possible
         combinations of change-points (and possible scans a range of values for other hyper-parameters). The posterior
@@ -1791,7 +4007,21 @@ class ChangepointStudy(HyperStudy):
             evidenceOnly(bool): If set to True, only forward pass is run and evidence is calculated. In contrast to the
                 forwardOnly option, no posterior mean values are computed and no posterior distributions are stored.
             silent(bool): If set to True, reduced output is generated by the fitting method.
-            nJobs(int): Number of processes to employ. Multiprocessing is based on the 'pathos' module.
+            nJobs(int): Number of processes to employ (not used by specialized engines, see argument engine).
+            backend(str): Multiprocessing backend for nJobs > 1 (see HyperStudy.fit).
+            pool(WorkerPool): Long-lived pool of worker processes (see HyperStudy.fit, not used by specialized engines).
+            pruningMargin(float): Log-evidence margin for abandoning unlikely change-point combinations early (see
+                HyperStudy.fit). Indices of pruned combinations refer to the attribute 'hyperGridValues'.
+            timeBudget(float): Wall-clock time (in seconds) after which the fit is stopped (see HyperStudy.fit).
+            checkpointDirectory(str): Directory for periodic checkpoints of the fit (see HyperStudy.fit).
+            checkpointPeriod(float): Approximate wall-clock time (in seconds) between two checkpoints.
+            resume(bool): If set to True, the fit is continued from the last checkpoint (see HyperStudy.fit).
+            engine(str): If set to 'auto', a single change-point between static segments is evaluated by a
+                change-point scan, multiple change-points between static segments by exact segmentation, and
+                evidence-only or forward-only fits of models with break-points by forward passes that share common
+                prefixes, instead of fitting each combination separately (specialized engines that run in a single
+                process, see HyperStudy.fit for the conditions). If set to 'grid', all combinations are fitted one by
+                one.
         """
         # format data/timestamps once, so number of data segments is known
         self.formattedData = movingWindow(self.rawData, self.observationModel.segmentLength)
@@ -1830,22 +4060,19 @@ class ChangepointStudy(HyperStudy):
 
         # first create standard hyper-grid
         self._createHyperGrid()
-        self.allHyperGridValues = self.hyperGridValues[:]
-        self.allHyperPriorValues = self.flatHyperPriorValues[:]
+        self.allHyperGridValues = self.hyperGridValues
 
         # extract hyper-grid values that belong to changepoints
         pointMask = np.sum([np.array(self.flatHyperParameterNames) == p for p in points], axis=0).astype(np.bool)
-        maskedHyperGridValues = self.allHyperGridValues[:, pointMask]
 
-        # only accept if change-point values are ordered (and not equal)
-        self.mask = np.array(
-            [all(x[i] < x[i + 1] for i in range(len(points) - 1)) for x in maskedHyperGridValues],
-            dtype=bool)
-        self.hyperGridValues = self.allHyperGridValues[self.mask]
-        self.flatHyperPriorValues = self.allHyperPriorValues[self.mask]
+        # only accept if change-point values are ordered (and not equal); only ordered combinations are enumerated, and
+        # the hyper-grid only stores their indices
+        self.validIndices = self.allHyperGridValues.orderedIndices(np.flatnonzero(pointMask))
+        self.hyperGridValues = self.allHyperGridValues.subset(self.validIndices)
 
-        # correct prior values to ensure correct normalization after sorting out combinations
-        self.flatHyperPriorValues *= np.sum(self.allHyperPriorValues)/np.sum(self.allHyperPriorValues[self.mask])
+        # correct prior values to ensure correct normalization after sorting out combinations (joint prior values are
+        # only computed for valid combinations, see HyperStudy.fit)
+        self.hyperPriorScale = self.allHyperGridValues.priorSum()/self.hyperGridValues.priorSum()
 
         # call fit method of hyper-study
         HyperStudy.fit(self,
@@ -1853,17 +4080,15 @@ class ChangepointStudy(HyperStudy):
                        evidenceOnly=evidenceOnly,
                        silent=silent,
                        nJobs=nJobs,
-                       customHyperGrid=True)
-
-        # for proper plotting, hyperGridValues must include all possible combinations of hyper-parameter values. We
-        # therefore have to include invalid combinations and assign the probability zero to them.
-        temp = np.zeros(len(self.allHyperGridValues))
-        temp[self.mask] = self.hyperParameterDistribution
-        self.hyperParameterDistribution = temp
-
-        temp = np.zeros(len(self.allHyperPriorValues))
-        temp[self.mask] = self.flatHyperPriorValues
-        self.flatHyperPriorValues = temp
+                       customHyperGrid=True,
+                       backend=backend,
+                       pool=pool,
+                       pruningMargin=pruningMargin,
+                       timeBudget=timeBudget,
+                       checkpointDirectory=checkpointDirectory,
+                       checkpointPeriod=checkpointPeriod,
+                       resume=resume,
+                       engine=engine)
 
     def _unpackSerialTransitionModels(self, transitionModel):
         """
@@ -1913,16 +4138,17 @@ class ChangepointStudy(HyperStudy):
             print('! WARNING: Switching order of change-/breakpoints to obtain positive values for duration.')
             paramIndices = paramIndices[::-1]
 
-        values = self.hyperGridValues[:, paramIndices].T
-        duration = np.unique(values[1] - values[0])  # get all possible differences between time points
-        durationDistribution = np.zeros(len(duration))  # initialize array for distribution
+        # get all possible differences between time points of valid combinations (the lazy hyper-grid is evaluated in
+        # chunks)
+        differences = np.concatenate([np.diff(chunk[:, paramIndices], axis=1)[:, 0]
+                                      for chunk in self.hyperGridValues.chunks()])
 
-        # loop over all hyper-grid points and collect probabilities for different durations
-        for i, values in enumerate(self.allHyperGridValues[:, paramIndices]):
-            if values[1] > values[0]:
-                # get matching index in duration (rounding needed because of finite precision)
-                idx = np.where(duration.round(10) == (values[1]-values[0]).round(10))[0][0]
-                durationDistribution[idx] += self.hyperParameterDistribution[i]
+        # collect probabilities for different durations (rounding needed because of finite precision); the
+        # hyper-parameter distribution is only stored for the fitted combinations
+        _, first, inverse = np.unique(differences.round(10), return_index=True, return_inverse=True)
+        duration = differences[first]
+        durationDistribution = np.bincount(inverse[self.evaluatedIndices], weights=self.hyperParameterDistribution,
+                                           minlength=len(duration))
 
         # properly normalize duration distribution
         durationDistribution /= np.sum(durationDistribution)
@@ -1957,8 +4183,8 @@ class OnlineStudy(HyperStudy):
         storeHistory(bool): If true, posterior distributions and their mean values, as well as hyper-posterior
             distributions are stored for all time steps.
     """
-    def __init__(self, storeHistory=False, silent=False):
-        super(OnlineStudy, self).__init__(silent=silent)
+    def __init__(self, storeHistory=False, silent=False, **kwargs):
+        super(OnlineStudy, self).__init__(silent=silent, **kwargs)
 
         self.firstStep = True
 
@@ -2022,7 +4248,10 @@ class OnlineStudy(HyperStudy):
         self.hyperParameterNames.append(self.flatHyperParameterNames[:])
         self.hyperGridConstants.append(self.hyperGridConstant[:])
         self.hyperPrior.append(self.flatHyperPriors[:])
-        self.hyperPriorValues.append(self.flatHyperPriorValues[:])
+        if len(self.hyperGridValues) > 0:
+            self.hyperPriorValues.append(self.hyperGridValues.priorValues())
+        else:
+            self.hyperPriorValues.append(self.flatHyperPriorValues[:])
 
         # count individual transition models
         self.tmCounts = []
@@ -2138,7 +4367,7 @@ class OnlineStudy(HyperStudy):
             self.hyperLogEvidenceList = np.array([0. for tmc in self.tmCounts])
 
             # initialize parameter posterior
-            self.parameterPosterior = [np.zeros([tmc] + self.gridSize) for tmc in self.tmCounts]
+            self.parameterPosterior = [np.zeros([tmc] + self.gridSize, dtype=self.dtype) for tmc in self.tmCounts]
 
             # initialize hyper-parameter distribution
             self.hyperParameterDistribution = [np.zeros(tmc) for tmc in self.tmCounts]
@@ -2148,16 +4377,16 @@ class OnlineStudy(HyperStudy):
             self.localTransitionModelDistribution = np.zeros(len(self.transitionModels))
 
             # initialize transition model posterior
-            self.transitionModelPosterior = np.zeros([len(self.transitionModels)] + self.gridSize)
+            self.transitionModelPosterior = np.zeros([len(self.transitionModels)] + self.gridSize, dtype=self.dtype)
 
             # initialize marginalized posterior
-            self.marginalizedPosterior = np.zeros(self.gridSize)
+            self.marginalizedPosterior = np.zeros(self.gridSize, dtype=self.dtype)
 
         # select data segment
         dataSegment = self.rawData[-self.observationModel.segmentLength:]
 
         # compute current likelihood only once
-        likelihood = self.observationModel.processedPdf(self.grid, dataSegment)
+        likelihood = self.observationModel.processedPdf(self.grid, dataSegment).astype(self.dtype, copy=False)
 
         # loop over all hypotheses/transition models
         for i, (tm, hpv) in enumerate(zip(self.transitionModels, self.hyperParameterValues)):
@@ -2179,7 +4408,7 @@ class OnlineStudy(HyperStudy):
                 else:  # in all other time steps transform "old" alpha/posterior
                     alphai = self.transitionModel.computeForwardPrior(self.parameterPosterior[i][j],
                                                                       len(self.formattedData)-1)*likelihood
-                ni = np.sum(alphai)
+                ni = np.sum(alphai, dtype=np.float64)
 
                 # update log-evidence list
                 self.logEvidenceList[i][j] += np.log(ni)
@@ -2223,7 +4452,7 @@ class OnlineStudy(HyperStudy):
         tmd = deepcopy(self.transitionModelDistribution)
         while len(self.transitionModelPosterior.shape) > len(tmd.shape):
             tmd = np.expand_dims(tmd, axis=-1)
-        self.marginalizedPosterior = np.sum(self.transitionModelPosterior * tmd, axis=0)
+        self.marginalizedPosterior = np.sum(self.transitionModelPosterior * tmd, axis=0).astype(self.dtype)
 
         # compute log-evidence value marginalized over different transition models
         self.logEvidence = logsumexp(self.hyperLogEvidenceList + np.log(self.transitionModelPrior))
@@ -2370,6 +4599,58 @@ class OnlineStudy(HyperStudy):
         """
         return self.getParameterDistributions(name, plot=plot, density=density, **kwargs)
 
+    def getParameterQuantiles(self, name, q=(0.05, 0.5, 0.95)):
+        """
+        Computes quantiles of the marginal posterior distribution of a parameter for all past time steps. Only
+        available if Online Study is created with flag 'storeHistory=True'. See :meth:`.Study.getParameterQuantiles`.
+
+        Args:
+            name(str): Name of the parameter
+            q(float, list, tuple, ndarray): Probability value(s) between 0 and 1
+
+        Returns:
+            ndarray: Quantile values (first axis enumerates probability values if more than one is specified, second
+                axis enumerates time steps)
+        """
+        if not self.storeHistory:
+            raise PostProcessingError('To get past parameter distributions, Online Study must be called with flag'
+                                      '"storeHistory=True". Use "getCurrentParameterDistribution" instead.')
+
+        # methods of Study class can only handle arrays, not lists
+        self.posteriorSequence = np.array(self.posteriorSequence)
+        quantiles = Study.getParameterQuantiles(self, name, q=q)
+
+        # re-transform array to list, so online study may continue to append values
+        self.posteriorSequence = list(self.posteriorSequence)
+        return quantiles
+
+    def getParameterCredibleIntervals(self, name, mass=0.9, method='hdi'):
+        """
+        Computes credible intervals of the marginal posterior distribution of a parameter for all past time steps. Only
+        available if Online Study is created with flag 'storeHistory=True'. See
+        :meth:`.Study.getParameterCredibleIntervals`.
+
+        Args:
+            name(str): Name of the parameter
+            mass(float): Probability mass contained in the credible interval
+            method(str): Either 'hdi' for highest-density intervals or 'equal-tailed' for equal-tailed intervals
+
+        Returns:
+            ndarray, ndarray: The first array contains the lower bounds, the second one the upper bounds of the
+                credible interval for all time steps
+        """
+        if not self.storeHistory:
+            raise PostProcessingError('To get past parameter distributions, Online Study must be called with flag'
+                                      '"storeHistory=True". Use "getCurrentParameterDistribution" instead.')
+
+        # methods of Study class can only handle arrays, not lists
+        self.posteriorSequence = np.array(self.posteriorSequence)
+        intervals = Study.getParameterCredibleIntervals(self, name, mass=mass, method=method)
+
+        # re-transform array to list, so online study may continue to append values
+        self.posteriorSequence = list(self.posteriorSequence)
+        return intervals
+
     def plotParameterEvolution(self, name, color='b', gamma=0.5, **kwargs):
         """
         Plots a series of marginal posterior distributions corresponding to a single model parameter, together with the
@@ -1,9 +1,12 @@
 #!/usr/bin/env python
 """
-The following functions save or load instances of all `Study` types using the Python package `dill`.
+The following functions save or load instances of all `Study` types using the Python package `dill`. Checkpoints of
+running fits are written in a compact format based on NumPy files instead (see HyperStudy.fit).
 """
 
 from __future__ import division, print_function
+import os
+import numpy as np
 import dill
 
 
@@ -35,3 +38,75 @@ def load(filename):
     print('+ Successfully loaded study.')
 
     return S
+
+
+def _writeCheckpoint(directory, state, arrays):
+    """
+    Writes a checkpoint of a running fit to the given directory. Large arrays (e.g. the average posterior sequence)
+    are written as raw .npy files, all other values are collected in a single .npz file. The .npz file is replaced
+    atomically and written last, so that an interrupted write leaves the previous checkpoint intact.
+
+    Args:
+        directory(str): Checkpoint directory (created if it does not exist)
+        state(dict): Arrays and values that describe the state of the fit
+        arrays(list): Large arrays that are stored in separate files
+    """
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    # increment counter, so that array files of the previous checkpoint are not overwritten
+    previous = _readCheckpointCounter(directory)
+    counter = previous + 1
+
+    for i, array in enumerate(arrays):
+        np.save(os.path.join(directory, 'array_{}_{}.npy'.format(counter, i)), array)
+
+    tempPath = os.path.join(directory, 'state.tmp')
+    with open(tempPath, 'wb') as f:
+        np.savez(f, counter=counter, nArrays=len(arrays), **state)
+    getattr(os, 'replace', os.rename)(tempPath, os.path.join(directory, 'state.npz'))
+
+    # array files of previous checkpoint are no longer needed
+    for fileName in os.listdir(directory):
+        if fileName.startswith('array_') and not fileName.startswith('array_{}_'.format(counter)):
+            os.remove(os.path.join(directory, fileName))
+
+
+def _readCheckpoint(directory):
+    """
+    Reads a checkpoint that was written by _writeCheckpoint. Large arrays are memory-mapped (read-only).
+
+    Args:
+        directory(str): Checkpoint directory
+
+    Returns:
+        dict, list: State of the fit and list of large arrays. (None, None) if the directory contains no checkpoint.
+    """
+    path = os.path.join(directory, 'state.npz')
+    if not os.path.isfile(path):
+        return None, None
+
+    with np.load(path) as f:
+        state = {key: f[key] for key in f.files}
+
+    counter = int(state.pop('counter'))
+    arrays = [np.load(os.path.join(directory, 'array_{}_{}.npy'.format(counter, i)), mmap_mode='r')
+              for i in range(int(state.pop('nArrays')))]
+    return state, arrays
+
+
+def _readCheckpointCounter(directory):
+    """
+    Returns the counter of the last checkpoint in the given directory (0 if there is none).
+
+    Args:
+        directory(str): Checkpoint directory
+
+    Returns:
+        int: Checkpoint counter
+    """
+    path = os.path.join(directory, 'state.npz')
+    if not os.path.isfile(path):
+        return 0
+    with np.load(path) as f:
+        return int(f['counter'])
@@ -6,6 +6,7 @@ This file includes basic helper functions.
 from __future__ import division, print_function
 import numpy as np
 import matplotlib.colors as colors
+from collections import OrderedDict
 
 
 def assignNestedItem(lst, index, value):
@@ -140,3 +141,333 @@ def freeSymbols(rv):
         symbols = rv._sorted_args[1].distribution.free_symbols
 
     return list(symbols)
+
+
+class HyperGrid(object):
+    """
+    Lazy representation of a grid of hyper-parameter values, i.e. of all combinations of the values of the individual
+    hyper-parameters. Combinations (rows) are only computed on demand from their flat index, so that the complete grid
+    never needs to be stored in memory. For indexing, iteration and len(), the grid behaves like a 2D array with one
+    row per combination and one column per hyper-parameter. A subset of rows (e.g. valid combinations of change-points
+    or the part of the grid that is analyzed by a single process) is stored as a range or as an array of flat indices.
+
+    Args:
+        values(list): Values of each hyper-parameter (array or single value)
+        priors(list): Hyper-prior values of each hyper-parameter (optional, same shapes as values)
+        indices(ndarray): Flat indices of the selected combinations (optional, all combinations by default)
+    """
+    def __init__(self, values, priors=None, indices=None):
+        self.values = [np.atleast_1d(v) for v in values]
+        self.priors = None if priors is None else [np.atleast_1d(p) for p in priors]
+        self.steps = tuple(len(v) for v in self.values)
+        self.dtype = np.result_type(*self.values)
+
+        # selected combinations are either stored as a range (start, stop) or as an array of flat indices
+        self.start = 0
+        self.stop = int(np.prod(self.steps))
+        self.indices = None if indices is None else np.asarray(indices, dtype=np.int64)
+
+    def __len__(self):
+        if self.indices is not None:
+            return len(self.indices)
+        return self.stop - self.start
+
+    @property
+    def shape(self):
+        return len(self), len(self.values)
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            rowKey, columnKey = key
+            return self[rowKey][..., columnKey]
+        return self._getRows(self._getFlatIndices(key))
+
+    def __iter__(self):
+        for chunk in self.chunks():
+            for row in chunk:
+                yield row
+
+    def __array__(self, dtype=None):
+        rows = self[:]
+        return rows if dtype is None else rows.astype(dtype)
+
+    def _getFlatIndices(self, key):
+        """
+        Converts a row index (integer, slice, integer array or boolean mask) into flat indices of the complete grid.
+
+        Args:
+            key: Row index
+
+        Returns:
+            int or ndarray: Flat index (indices)
+        """
+        if self.indices is not None:
+            return self.indices[key]
+
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            return self.start + np.arange(start, stop, step)
+
+        key = np.asarray(key)
+        if key.dtype == bool:
+            if len(key) != len(self):
+                raise IndexError('Boolean mask does not match the number of hyper-grid values.')
+            key = np.flatnonzero(key)
+        if np.any(key >= len(self)) or np.any(key < -len(self)):
+            raise IndexError('Index out of range of hyper-grid values.')
+        return self.start + np.where(key < 0, key + len(self), key)
+
+    def _getRows(self, flatIndices):
+        """
+        Computes the combinations of hyper-parameter values for the given flat indices.
+
+        Args:
+            flatIndices(int, ndarray): Flat indices of the complete grid
+
+        Returns:
+            ndarray: Hyper-parameter values (last axis enumerates hyper-parameters)
+        """
+        multiIndex = np.unravel_index(flatIndices, self.steps)
+        rows = np.empty(np.shape(flatIndices) + (len(self.values),), dtype=self.dtype)
+        for j, (v, i) in enumerate(zip(self.values, multiIndex)):
+            rows[..., j] = v[i]
+        return rows
+
+    def chunks(self, size=2**16):
+        """
+        Iterates over the hyper-grid values in chunks.
+
+        Args:
+            size(int): Number of combinations of hyper-parameter values per chunk
+
+        Returns:
+            Generator object that yields 2D arrays of hyper-parameter values
+        """
+        for i in range(0, len(self), size):
+            yield self[i:i+size]
+
+    def subset(self, key):
+        """
+        Selects a subset of the combinations of hyper-parameter values without computing them.
+
+        Args:
+            key: Row index (slice, integer array or boolean mask)
+
+        Returns:
+            HyperGrid: Lazy grid of the selected combinations
+        """
+        subset = HyperGrid(self.values, priors=self.priors)
+        if self.indices is None and isinstance(key, slice) and key.step in (None, 1):
+            start, stop, step = key.indices(len(self))
+            subset.start = self.start + start
+            subset.stop = self.start + max(start, stop)
+        else:
+            subset.indices = np.atleast_1d(self._getFlatIndices(key))
+        return subset
+
+    def split(self, n):
+        """
+        Splits the hyper-grid values into n parts of (almost) equal size (in the same way as numpy.array_split).
+
+        Args:
+            n(int): Number of parts
+
+        Returns:
+            list: Lazy grids of all parts
+        """
+        size, remainder = divmod(len(self), n)
+        bounds = np.cumsum([0] + [size + 1]*remainder + [size]*(n - remainder))
+        return [self.subset(slice(a, b)) for a, b in zip(bounds[:-1], bounds[1:])]
+
+    def spaceFillingOrder(self):
+        """
+        Determines an order of the hyper-grid values that fills the grid from coarse to fine. The leading values form a
+        coarse lattice (every 2^k-th value of each hyper-parameter, including the first and the last value), which is
+        subsequently refined by bisection. Within each level of refinement, values are ordered by the bit-reversal of
+        their rank, so that any leading part of the order covers the grid evenly.
+
+        Returns:
+            ndarray: Row indices of all hyper-grid values
+        """
+        # depth of a value is the number of bisections of the axis that are needed to reach it (first and last value
+        # have depth zero); the depth of a combination is the largest depth of its values
+        depths = np.zeros(len(self), dtype=np.int64)
+        for i, n in zip(np.unravel_index(self._getFlatIndices(slice(None)), self.steps), self.steps):
+            maxDepth = int(np.ceil(np.log2(max(n - 1, 1))))
+            k = np.arange(1, n)
+            axisDepths = np.zeros(n, dtype=np.int64)
+            axisDepths[1:] = np.maximum(maxDepth - np.log2(k & -k).astype(np.int64), 0)
+            axisDepths[-1] = 0
+            depths = np.maximum(depths, axisDepths[i])
+
+        order = np.argsort(depths, kind='mergesort')
+        bounds = np.flatnonzero(np.diff(depths[order])) + 1
+        for group in np.split(np.arange(len(order)), bounds):
+            rank = np.arange(len(group))
+            bits = int(np.ceil(np.log2(max(len(group), 2))))
+            reversedRank = np.zeros(len(group), dtype=np.int64)
+            for b in range(bits):
+                reversedRank |= ((rank >> b) & 1) << (bits - 1 - b)
+            order[group] = order[group][np.argsort(reversedRank)]
+        return order
+
+    def orderedIndices(self, columns):
+        """
+        Determines the row indices of all hyper-grid values for which the values of the given hyper-parameters strictly
+        increase (e.g. valid combinations of change-points). For a complete grid, only the increasing combinations of
+        these hyper-parameters are enumerated (by merging each value with all larger values of the next
+        hyper-parameter), so that invalid combinations are never computed.
+
+        Args:
+            columns(list): Indices of the hyper-parameters (in the required order)
+
+        Returns:
+            ndarray: Row indices (in ascending order)
+        """
+        columns = list(columns)
+
+        # grids that only contain a subset of all combinations are evaluated in chunks
+        if self.indices is not None or len(self) != int(np.prod(self.steps)):
+            return np.flatnonzero(np.concatenate([np.zeros(0, dtype=bool)] +
+                                                 [np.all(np.diff(chunk[:, columns], axis=1) > 0, axis=1)
+                                                  for chunk in self.chunks()]))
+
+        strides = np.cumprod((1,) + self.steps[::-1])[::-1][1:].astype(np.int64)
+
+        # flat indices of increasing combinations of the given hyper-parameters
+        flatIndices = np.zeros(1, dtype=np.int64)
+        if len(columns) > 0:
+            lastIndices = np.arange(self.steps[columns[0]])
+            flatIndices = lastIndices*strides[columns[0]]
+        for previous, column in zip(columns[:-1], columns[1:]):
+            order = np.argsort(self.values[column], kind='mergesort')
+            first = np.searchsorted(self.values[column][order], self.values[previous][lastIndices], side='right')
+            counts = self.steps[column] - first
+            offsets = np.arange(np.sum(counts)) - np.repeat(np.cumsum(counts) - counts, counts)
+            lastIndices = order[np.repeat(first, counts) + offsets]
+            flatIndices = np.repeat(flatIndices, counts) + lastIndices*strides[column]
+
+        # all values of the remaining hyper-parameters are combined with each increasing combination
+        for column in [c for c in range(len(self.values)) if c not in columns]:
+            flatIndices = np.add.outer(flatIndices, np.arange(self.steps[column])*strides[column]).ravel()
+        return np.sort(flatIndices)
+
+    def priorValues(self, key=slice(None)):
+        """
+        Computes the joint hyper-prior values (product of the hyper-prior values of all hyper-parameters) of the
+        selected combinations of hyper-parameter values.
+
+        Args:
+            key: Row index (default: all rows)
+
+        Returns:
+            ndarray: Joint hyper-prior values
+        """
+        flatIndices = self._getFlatIndices(key)
+        if self.priors is None:
+            return np.ones(np.shape(flatIndices))
+
+        multiIndex = np.unravel_index(flatIndices, self.steps)
+        values = np.ones(np.shape(flatIndices))
+        for p, i in zip(self.priors, multiIndex):
+            values = values*p[i]
+        return values
+
+    def priorSum(self):
+        """
+        Computes the sum of the joint hyper-prior values of all selected combinations of hyper-parameter values. For a
+        complete grid, the sum factorizes into the sums of the hyper-prior values of the individual hyper-parameters,
+        otherwise the joint hyper-prior values are summed up in chunks.
+
+        Returns:
+            float: Sum of joint hyper-prior values
+        """
+        if self.indices is None and len(self) == int(np.prod(self.steps)):
+            if self.priors is None:
+                return float(len(self))
+            return float(np.prod([np.sum(p) for p in self.priors]))
+
+        return float(np.sum([np.sum(self.priorValues(slice(i, i+2**16))) for i in range(0, len(self), 2**16)]))
+
+    def marginalize(self, weights, columns, key=slice(None)):
+        """
+        Sums up weights that are attached to the selected combinations of hyper-parameter values over all but the given
+        hyper-parameters. Only the selected combinations are evaluated, so that a sparse set of weights (e.g. the
+        hyper-parameter distribution of a partial fit) is expanded to the values of the given hyper-parameters only.
+
+        Args:
+            weights(ndarray): Weights of the selected combinations
+            columns(list): Indices of the hyper-parameters that are kept
+            key: Row index of the combinations that the weights belong to (default: all rows)
+
+        Returns:
+            ndarray: Summed weights (one axis per kept hyper-parameter)
+        """
+        multiIndex = np.unravel_index(self._getFlatIndices(key), self.steps)
+        steps = [self.steps[c] for c in columns]
+        index = np.ravel_multi_index([multiIndex[c] for c in columns], steps)
+        return np.bincount(index, weights=weights, minlength=int(np.prod(steps))).reshape(steps)
+
+
+class SegmentCache(object):
+    """
+    Least-recently-used cache of forward passes over data segments between change-points. Each entry stores the
+    log-evidence of a segment, the local evidence values of its time steps and the (normalized) filtering distribution
+    of its last time step, so that a segment can also be extended by further time steps. Entries are keyed by the
+    segment bounds, the index of the sub-model and the values of all other hyper-parameters. If the total size of all
+    entries exceeds the size limit, the least recently used entries are evicted.
+
+    Args:
+        size(float): Maximal size of all entries (in megabytes)
+    """
+    def __init__(self, size):
+        self.size = size
+        self.nBytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """
+        Returns the entry of the given key and marks it as most recently used.
+
+        Args:
+            key(tuple): Key of the entry
+
+        Returns:
+            tuple: Log-evidence, local evidence values and filtering distribution (None if the key is not cached)
+        """
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.entries[key] = entry
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        """
+        Adds an entry to the cache and evicts the least recently used entries if the size limit is exceeded. Entries
+        that exceed the size limit on their own are not stored.
+
+        Args:
+            key(tuple): Key of the entry
+            entry(tuple): Log-evidence, local evidence values and filtering distribution
+        """
+        entryBytes = entry[1].nbytes + entry[2].nbytes
+        if entryBytes > self.size*2.**20:
+            return
+
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.nBytes -= previous[1].nbytes + previous[2].nbytes
+
+        self.entries[key] = entry
+        self.nBytes += entryBytes
+        while self.nBytes > self.size*2.**20:
+            _, evicted = self.entries.popitem(last=False)
+            self.nBytes -= evicted[1].nbytes + evicted[2].nbytes
@@ -13,7 +13,7 @@ from sympy import lambdify
 from sympy.stats import density
 from .jeffreys import getJeffreysPrior
 from scipy.misc import factorial
-from scipy.special import iv
+from scipy.special import iv, gammaln, xlogy
 from .exceptions import ConfigurationError, PostProcessingError
 from .helper import cint, oint, freeSymbols
 from inspect import getargspec
@@ -24,7 +24,12 @@ class ObservationModel:
     """
     Observation model class that handles missing data points and multi-dimensional data. All observation
     models included in bayesloop inherit from this class.
+
+    The parameter grid is passed to the pdf-methods as a list of open (sparse) arrays that broadcast against each other
+    (see numpy.meshgrid with sparse=True). Models that cannot handle such arrays may set the attribute 'denseGrid' to
+    True, to receive broadcasted arrays with the full shape of the parameter grid instead.
     """
+    denseGrid = False
 
     def __str__(self):
         return self.name
@@ -41,16 +46,163 @@ class ObservationModel:
         Returns:
             ndarray: Discretized pdf (with same shape as grid)
         """
+        return self.processedPdfBatch(grid, np.array([dataSegment]))[0]
+
+    def processedPdfBatch(self, grid, dataSegments):
+        """
+        Vectorized version of the processedPdf-method. Processes multidimensional data and missing data for a block of
+        data segments and passes the block to the pdfBatch-method of the child class.
+
+        Args:
+            grid(list): Discrete parameter grid
+            dataSegments(ndarray): Array of data segments from formatted data (first axis enumerates segments)
+
+        Returns:
+            ndarray: Discretized pdf values (first axis enumerates segments, remaining axes have the shape of the grid)
+        """
+        grid = self._prepareGrid(grid)
+
         # if self.multipyLikelihoods == True, multi-dimensional data is processed one dimension at a time;
         # likelihoods are then multiplied
-        if len(dataSegment.shape) == 2 and self.multiplyLikelihoods:
-            return np.prod(np.array([self.processedPdf(grid, d) for d in dataSegment.T]), axis=0)
+        if len(dataSegments.shape) == 3 and self.multiplyLikelihoods:
+            pdf = self.processedPdfBatch(grid, dataSegments[:, :, 0])
+            for j in range(1, dataSegments.shape[2]):
+                pdf = pdf*self.processedPdfBatch(grid, dataSegments[:, :, j])
+            return pdf
 
         # check for missing data
-        if np.isnan(dataSegment).any():
-            return np.ones_like(grid[0])  # grid of ones does not alter the current prior distribution
+        missing = np.isnan(dataSegments.reshape(len(dataSegments), -1).astype(np.float)).any(axis=1)
+        if not np.any(missing):
+            return self.pdfBatch(grid, dataSegments)
 
-        return self.pdf(grid, dataSegment)
+        # grid of ones does not alter the current prior distribution
+        pdf = np.ones([len(dataSegments)] + list(np.broadcast(*grid).shape))
+        if not np.all(missing):
+            pdf[~missing] = self.pdfBatch(grid, dataSegments[~missing])
+        return pdf
+
+    def pdfBatch(self, grid, dataSegments):
+        """
+        Evaluates the pdf for a block of data segments. All built-in observation models override this method with a
+        vectorized version, custom models fall back on evaluating the pdf-method for one data segment at a time.
+
+        Args:
+            grid(list): Discrete parameter grid
+            dataSegments(ndarray): Array of data segments from formatted data (first axis enumerates segments)
+
+        Returns:
+            ndarray: Discretized pdf values (first axis enumerates segments, remaining axes have the shape of the grid)
+        """
+        # pdf values are broadcasted to the full shape of the grid, in case the pdf does not depend on all parameters
+        shape = np.broadcast(*grid).shape
+        return np.array([np.broadcast_to(self.pdf(grid, dataSegment), shape) for dataSegment in dataSegments])
+
+    def processedLogPdf(self, grid, dataSegment):
+        """
+        Log-space version of the processedPdf-method. This method is called by the fit-method of the Study class if the
+        fit is carried out in log-space.
+
+        Args:
+            grid(list): Discrete parameter grid
+            dataSegment(ndarray): Data segment from formatted data
+
+        Returns:
+            ndarray: Discretized log-pdf (with same shape as grid)
+        """
+        return self.processedLogPdfBatch(grid, np.array([dataSegment]))[0]
+
+    def processedLogPdfBatch(self, grid, dataSegments):
+        """
+        Log-space version of the processedPdfBatch-method. Log-likelihood values of multi-dimensional data are summed
+        up, missing data points result in a log-likelihood of zero.
+
+        Args:
+            grid(list): Discrete parameter grid
+            dataSegments(ndarray): Array of data segments from formatted data (first axis enumerates segments)
+
+        Returns:
+            ndarray: Discretized log-pdf values (first axis enumerates segments, remaining axes have the shape of the
+                grid)
+        """
+        grid = self._prepareGrid(grid)
+
+        # if self.multipyLikelihoods == True, multi-dimensional data is processed one dimension at a time;
+        # log-likelihoods are then summed up
+        if len(dataSegments.shape) == 3 and self.multiplyLikelihoods:
+            logPdf = self.processedLogPdfBatch(grid, dataSegments[:, :, 0])
+            for j in range(1, dataSegments.shape[2]):
+                logPdf = logPdf + self.processedLogPdfBatch(grid, dataSegments[:, :, j])
+            return logPdf
+
+        # check for missing data
+        missing = np.isnan(dataSegments.reshape(len(dataSegments), -1).astype(np.float)).any(axis=1)
+        if not np.any(missing):
+            return self.logpdfBatch(grid, dataSegments)
+
+        # grid of zeros does not alter the current prior distribution
+        logPdf = np.zeros([len(dataSegments)] + list(np.broadcast(*grid).shape))
+        if not np.all(missing):
+            logPdf[~missing] = self.logpdfBatch(grid, dataSegments[~missing])
+        return logPdf
+
+    def logpdf(self, grid, dataSegment):
+        """
+        Logarithm of the probability density function.
+
+        Args:
+            grid(list): Discrete parameter grid
+            dataSegment(ndarray): Data segment from formatted data
+
+        Returns:
+            ndarray: Discretized log-pdf (with same shape as grid)
+        """
+        return self.logpdfBatch(grid, np.array([dataSegment]))[0]
+
+    def logpdfBatch(self, grid, dataSegments):
+        """
+        Evaluates the logarithm of the pdf for a block of data segments. All built-in observation models override this
+        method to compute log-pdf values directly, custom models fall back on the logarithm of the pdfBatch-method.
+
+        Args:
+            grid(list): Discrete parameter grid
+            dataSegments(ndarray): Array of data segments from formatted data (first axis enumerates segments)
+
+        Returns:
+            ndarray: Discretized log-pdf values (first axis enumerates segments, remaining axes have the shape of the
+                grid)
+        """
+        with np.errstate(divide='ignore'):
+            return np.log(self.pdfBatch(grid, dataSegments).astype(np.float))
+
+    def _prepareGrid(self, grid):
+        """
+        Returns the parameter grid in the form expected by the pdf-methods of the model. Open (sparse) grid arrays are
+        broadcasted to the full grid shape if the attribute 'denseGrid' is set to True. Broadcasting creates read-only
+        views, so that no additional memory is allocated.
+
+        Args:
+            grid(list): Discrete parameter grid
+
+        Returns:
+            list: Discrete parameter grid
+        """
+        if self.denseGrid:
+            return np.broadcast_arrays(*grid)
+        return grid
+
+    def _batchValues(self, values, grid):
+        """
+        Reshapes an array that contains one value per data segment, such that it broadcasts against the parameter grid
+        along a new first axis.
+
+        Args:
+            values(ndarray): One-dimensional array of values (one for each data segment)
+            grid(list): Discrete parameter grid
+
+        Returns:
+            ndarray: Reshaped array of values
+        """
+        return np.reshape(values, [-1] + [1]*len(grid))
 
 
 class NumPy(ObservationModel):
@@ -68,6 +220,8 @@ class NumPy(ObservationModel):
             bayesloop.oint()) Example: 'mu', bl.cint(-1, 1, 100), 'sigma', bl.oint(0, 3, 100)
         prior: custom prior distribution that may be passed as a NumPy array that has tha same shape as the parameter
             grid, as a(lambda) function or as a (list of) SymPy random variable(s)
+        denseGrid(bool): If set to True, the arrays of parameter values are passed to the function with the full shape
+            of the parameter grid. By default, open (sparse) arrays are passed that only broadcast to the full shape.
 
     Example:
     ::
@@ -120,11 +274,12 @@ class NumPy(ObservationModel):
 
         # check for unknown keyword-arguments
         for key in kwargs.keys():
-            if key not in ['prior']:
+            if key not in ['prior', 'denseGrid']:
                 raise TypeError("__init__() got an unexpected keyword argument '{}'".format(key))
 
         # get allowed keyword-arguments
         self.prior = kwargs.get('prior', None)
+        self.denseGrid = kwargs.get('denseGrid', False)
 
     def pdf(self, grid, dataSegment):
         """
@@ -436,6 +591,36 @@ class Bernoulli(ObservationModel):
 
         return temp
 
+    def pdfBatch(self, grid, dataSegments):
+        """
+        Vectorized probability density function of the Bernoulli model
+
+        Args:
+            grid(list): Parameter grid for discrete values of the parameter p
+            dataSegments(ndarray): Array of data segments from formatted data (each a single number of events)
+
+        Returns:
+            ndarray: Discretized Bernoulli pdf values (first axis enumerates data segments)
+        """
+        p = np.where((grid[0] >= 0.) & (grid[0] <= 1.), grid[0], 0.)  # 0 <= p <= 1
+        success = self._batchValues(dataSegments[:, 0], grid).astype(np.bool)
+
+        return np.where(success, p, 1. - p)
+
+    def logpdfBatch(self, grid, dataSegments):
+        """
+        Vectorized log-pdf of the Bernoulli model
+
+        Args:
+            grid(list): Parameter grid for discrete values of the parameter p
+            dataSegments(ndarray): Array of data segments from formatted data (each a single number of events)
+
+        Returns:
+            ndarray: Discretized Bernoulli log-pdf values (first axis enumerates data segments)
+        """
+        with np.errstate(divide='ignore'):
+            return np.log(self.pdfBatch(grid, dataSegments))
+
     def estimateParameterValues(self, name, rawData):
         """
         Returns appropriate boundaries based on the imported data. Is called in case fit method is called and no
@@ -499,6 +684,35 @@ class Poisson(ObservationModel):
         """
         return (grid[0] ** dataSegment[0]) * (np.exp(-grid[0])) / (np.math.factorial(dataSegment[0]))
 
+    def pdfBatch(self, grid, dataSegments):
+        """
+        Vectorized probability density function of the Poisson model
+
+        Args:
+            grid(list): Parameter grid for discrete rate (lambda) values
+            dataSegments(ndarray): Array of data segments from formatted data (each a single number of events)
+
+        Returns:
+            ndarray: Discretized Poisson pdf values (first axis enumerates data segments)
+        """
+        k = self._batchValues(dataSegments[:, 0], grid)
+        return (grid[0] ** k) * (np.exp(-grid[0])) / factorial(k)
+
+    def logpdfBatch(self, grid, dataSegments):
+        """
+        Vectorized log-pdf of the Poisson model
+
+        Args:
+            grid(list): Parameter grid for discrete rate (lambda) values
+            dataSegments(ndarray): Array of data segments from formatted data (each a single number of events)
+
+        Returns:
+            ndarray: Discretized Poisson log-pdf values (first axis enumerates data segments)
+        """
+        k = self._batchValues(dataSegments[:, 0], grid)
+        with np.errstate(divide='ignore'):
+            return xlogy(k, grid[0]) - grid[0] - gammaln(k + 1.)
+
     def estimateParameterValues(self, name, rawData):
         """
         Returns appropriate boundaries based on the imported data. Is called in case fit method is called and no
@@ -564,6 +778,34 @@ class Gaussian(ObservationModel):
         return np.exp(
             -((dataSegment[0] - grid[0]) ** 2.) / (2. * grid[1] ** 2.) - .5 * np.log(2. * np.pi * grid[1] ** 2.))
 
+    def pdfBatch(self, grid, dataSegments):
+        """
+        Vectorized probability density function of the Gaussian model.
+
+        Args:
+            grid(list): Parameter grid for discrete values of mean and standard deviation
+            dataSegments(ndarray): Array of data segments from formatted data (each containing a single measurement)
+
+        Returns:
+            ndarray: Discretized Normal pdf values (first axis enumerates data segments).
+        """
+        x = self._batchValues(dataSegments[:, 0], grid)
+        return np.exp(-((x - grid[0]) ** 2.) / (2. * grid[1] ** 2.) - .5 * np.log(2. * np.pi * grid[1] ** 2.))
+
+    def logpdfBatch(self, grid, dataSegments):
+        """
+        Vectorized log-pdf of the Gaussian model.
+
+        Args:
+            grid(list): Parameter grid for discrete values of mean and standard deviation
+            dataSegments(ndarray): Array of data segments from formatted data (each containing a single measurement)
+
+        Returns:
+            ndarray: Discretized Normal log-pdf values (first axis enumerates data segments).
+        """
+        x = self._batchValues(dataSegments[:, 0], grid)
+        return -((x - grid[0]) ** 2.) / (2. * grid[1] ** 2.) - .5 * np.log(2. * np.pi * grid[1] ** 2.)
+
     def estimateParameterValues(self, name, rawData):
         """
         Returns appropriate boundaries based on the imported data. Is called in case fit method is called and no
@@ -632,6 +874,34 @@ class Laplace(ObservationModel):
         """
         return np.exp(-np.abs(dataSegment[0] - grid[0])/grid[1])/(2.*grid[1])
 
+    def pdfBatch(self, grid, dataSegments):
+        """
+        Vectorized probability density function of the Laplace model.
+
+        Args:
+            grid(list): Parameter grid for discrete values of mean and scale
+            dataSegments(ndarray): Array of data segments from formatted data (each containing a single measurement)
+
+        Returns:
+            ndarray: Discretized Laplace pdf values (first axis enumerates data segments).
+        """
+        x = self._batchValues(dataSegments[:, 0], grid)
+        return np.exp(-np.abs(x - grid[0])/grid[1])/(2.*grid[1])
+
+    def logpdfBatch(self, grid, dataSegments):
+        """
+        Vectorized log-pdf of the Laplace model.
+
+        Args:
+            grid(list): Parameter grid for discrete values of mean and scale
+            dataSegments(ndarray): Array of data segments from formatted data (each containing a single measurement)
+
+        Returns:
+            ndarray: Discretized Laplace log-pdf values (first axis enumerates data segments).
+        """
+        x = self._batchValues(dataSegments[:, 0], grid)
+        return -np.abs(x - grid[0])/grid[1] - np.log(2.*grid[1])
+
     def estimateParameterValues(self, name, rawData):
         """
         Returns appropriate boundaries based on the imported data. Is called in case fit method is called and no
@@ -703,6 +973,38 @@ class GaussianMean(ObservationModel):
         return np.exp(-((dataSegment[0, 0] - grid[0]) ** 2.) / (2. * dataSegment[0, 1] ** 2.) -
                       .5 * np.log(2. * np.pi * dataSegment[0, 1] ** 2.))
 
+    def pdfBatch(self, grid, dataSegments):
+        """
+        Vectorized probability density function of the Gaussian mean model.
+
+        Args:
+            grid(list): Parameter grid for discrete values of the mean
+            dataSegments(ndarray): Array of data segments from formatted data (each containing a tuple of observed mean
+                value and the given standard deviation)
+
+        Returns:
+            ndarray: Discretized Normal pdf values (first axis enumerates data segments).
+        """
+        x = self._batchValues(dataSegments[:, 0, 0], grid)
+        std = self._batchValues(dataSegments[:, 0, 1], grid)
+        return np.exp(-((x - grid[0]) ** 2.) / (2. * std ** 2.) - .5 * np.log(2. * np.pi * std ** 2.))
+
+    def logpdfBatch(self, grid, dataSegments):
+        """
+        Vectorized log-pdf of the Gaussian mean model.
+
+        Args:
+            grid(list): Parameter grid for discrete values of the mean
+            dataSegments(ndarray): Array of data segments from formatted data (each containing a tuple of observed mean
+                value and the given standard deviation)
+
+        Returns:
+            ndarray: Discretized Normal log-pdf values (first axis enumerates data segments).
+        """
+        x = self._batchValues(dataSegments[:, 0, 0], grid)
+        std = self._batchValues(dataSegments[:, 0, 1], grid)
+        return -((x - grid[0]) ** 2.) / (2. * std ** 2.) - .5 * np.log(2. * np.pi * std ** 2.)
+
     def estimateParameterValues(self, name, rawData):
         """
         Returns appropriate boundaries based on the imported data. Is called in case fit method is called and no
@@ -764,6 +1066,34 @@ class WhiteNoise(ObservationModel):
         """
         return np.exp(-(dataSegment[0] ** 2.) / (2. * grid[0] ** 2.) - .5 * np.log(2. * np.pi * grid[0] ** 2.))
 
+    def pdfBatch(self, grid, dataSegments):
+        """
+        Vectorized probability density function of the white noise process.
+
+        Args:
+            grid(list): Parameter grid for discrete values of noise amplitude
+            dataSegments(ndarray): Array of data segments from formatted data (each containing a single measurement)
+
+        Returns:
+            ndarray: Discretized pdf values (first axis enumerates data segments).
+        """
+        x = self._batchValues(dataSegments[:, 0], grid)
+        return np.exp(-(x ** 2.) / (2. * grid[0] ** 2.) - .5 * np.log(2. * np.pi * grid[0] ** 2.))
+
+    def logpdfBatch(self, grid, dataSegments):
+        """
+        Vectorized log-pdf of the white noise process.
+
+        Args:
+            grid(list): Parameter grid for discrete values of noise amplitude
+            dataSegments(ndarray): Array of data segments from formatted data (each containing a single measurement)
+
+        Returns:
+            ndarray: Discretized log-pdf values (first axis enumerates data segments).
+        """
+        x = self._batchValues(dataSegments[:, 0], grid)
+        return -(x ** 2.) / (2. * grid[0] ** 2.) - .5 * np.log(2. * np.pi * grid[0] ** 2.)
+
     def estimateParameterValues(self, name, rawData):
         """
         Returns appropriate boundaries based on the imported data. Is called in case fit method is called and no
@@ -828,6 +1158,36 @@ class AR1(ObservationModel):
         return np.exp(-((dataSegment[1] - grid[0] * dataSegment[0]) ** 2.) / (2. * grid[1] ** 2.) - .5 * np.log(
             2. * np.pi * grid[1] ** 2.))
 
+    def pdfBatch(self, grid, dataSegments):
+        """
+        Vectorized probability density function of the Auto-regressive process of first order
+
+        Args:
+            grid(list): Parameter grid for discrete values of the correlation coefficient and noise amplitude
+            dataSegments(ndarray): Array of data segments from formatted data (each a pair of measurements)
+
+        Returns:
+            ndarray: Discretized pdf values (first axis enumerates data segments).
+        """
+        x0 = self._batchValues(dataSegments[:, 0], grid)
+        x1 = self._batchValues(dataSegments[:, 1], grid)
+        return np.exp(-((x1 - grid[0] * x0) ** 2.) / (2. * grid[1] ** 2.) - .5 * np.log(2. * np.pi * grid[1] ** 2.))
+
+    def logpdfBatch(self, grid, dataSegments):
+        """
+        Vectorized log-pdf of the Auto-regressive process of first order
+
+        Args:
+            grid(list): Parameter grid for discrete values of the correlation coefficient and noise amplitude
+            dataSegments(ndarray): Array of data segments from formatted data (each a pair of measurements)
+
+        Returns:
+            ndarray: Discretized log-pdf values (first axis enumerates data segments).
+        """
+        x0 = self._batchValues(dataSegments[:, 0], grid)
+        x1 = self._batchValues(dataSegments[:, 1], grid)
+        return -((x1 - grid[0] * x0) ** 2.) / (2. * grid[1] ** 2.) - .5 * np.log(2. * np.pi * grid[1] ** 2.)
+
     def estimateParameterValues(self, name, rawData):
         """
         Returns estimated boundaries based on the imported data. Is called in case fit method is called and no
@@ -893,6 +1253,42 @@ class ScaledAR1(ObservationModel):
         return np.exp(-((dataSegment[1] - r * dataSegment[0]) ** 2.) / (2. * sScaled ** 2.) - .5 * np.log(
             2. * np.pi * sScaled ** 2.))
 
+    def pdfBatch(self, grid, dataSegments):
+        """
+        Vectorized probability density function of the scaled Auto-regressive process of first order
+
+        Args:
+            grid(list): Parameter grid for discerete values of the correlation coefficient and standard deviation
+            dataSegments(ndarray): Array of data segments from formatted data (each a pair of measurements)
+
+        Returns:
+            ndarray: Discretized pdf values (first axis enumerates data segments).
+        """
+        r = grid[0]
+        s = grid[1]
+        sScaled = s*np.sqrt(1 - r**2.)
+        x0 = self._batchValues(dataSegments[:, 0], grid)
+        x1 = self._batchValues(dataSegments[:, 1], grid)
+        return np.exp(-((x1 - r * x0) ** 2.) / (2. * sScaled ** 2.) - .5 * np.log(2. * np.pi * sScaled ** 2.))
+
+    def logpdfBatch(self, grid, dataSegments):
+        """
+        Vectorized log-pdf of the scaled Auto-regressive process of first order
+
+        Args:
+            grid(list): Parameter grid for discerete values of the correlation coefficient and standard deviation
+            dataSegments(ndarray): Array of data segments from formatted data (each a pair of measurements)
+
+        Returns:
+            ndarray: Discretized log-pdf values (first axis enumerates data segments).
+        """
+        r = grid[0]
+        s = grid[1]
+        sScaled = s*np.sqrt(1 - r**2.)
+        x0 = self._batchValues(dataSegments[:, 0], grid)
+        x1 = self._batchValues(dataSegments[:, 1], grid)
+        return -((x1 - r * x0) ** 2.) / (2. * sScaled ** 2.) - .5 * np.log(2. * np.pi * sScaled ** 2.)
+
     def estimateParameterValues(self, name, rawData):
         """
         Returns estimated boundaries based on the imported data. Is called in case fit method is called and no
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""
+The following class provides a pool of worker processes that is kept alive across multiple fits of `HyperStudy` and
+`ChangepointStudy` instances. Studies are serialized using the Python package `dill` and sent to the workers once per
+fit, so that the cost of creating the worker processes (and importing bayesloop and its dependencies) is paid only
+once.
+"""
+
+from __future__ import division, print_function
+import multiprocessing
+import dill
+from .exceptions import ConfigurationError
+
+
+def _initWorker():
+    """
+    Initializes a worker process by importing bayesloop and its dependencies, so that the first fit does not pay for
+    these imports.
+    """
+    import sympy.stats
+    import scipy.stats
+    import bayesloop
+
+
+def _fitPayload(task):
+    """
+    Fits a part of the hyper-grid values of a serialized study within a worker process.
+
+    Args:
+        task(tuple): Serialized study and arguments of HyperStudy._parallelFit
+
+    Returns:
+        tuple: Reductions of the partial fit (see HyperStudy._getFitReductions)
+    """
+    payload, args = task
+    study = dill.loads(payload)
+
+    evidenceOnly = args[3]
+    return study._parallelFit(*args)._getFitReductions(averages=not evidenceOnly)
+
+
+class WorkerPool(object):
+    """
+    Long-lived pool of worker processes that can be passed to the fit method of HyperStudy and ChangepointStudy
+    instances (keyword argument 'pool'). The worker processes are created once and are re-used by all subsequent fits,
+    until the pool is closed. The pool can also be used as a context manager.
+
+    Example:
+    ::
+        with bl.WorkerPool(4) as pool:
+            for data in dataSets:
+                S.load(data)
+                S.fit(pool=pool)
+
+    Args:
+        nJobs(int): Number of worker processes. If not set, one process per CPU is created.
+    """
+    def __init__(self, nJobs=None):
+        if nJobs is None:
+            nJobs = multiprocessing.cpu_count()
+
+        self.nJobs = nJobs
+        self.pool = multiprocessing.Pool(processes=nJobs, initializer=_initWorker)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def fit(self, study, args):
+        """
+        Distributes a partial fit of the given study among the worker processes. The study is serialized only once.
+
+        Args:
+            study: Instance of HyperStudy (or ChangepointStudy)
+            args(list): Arguments of HyperStudy._parallelFit for each partial fit
+
+        Returns:
+            list: Reductions of all partial fits (see HyperStudy._getFitReductions)
+        """
+        if self.pool is None:
+            raise ConfigurationError('Worker pool has already been closed.')
+
+        payload = dill.dumps(study, protocol=dill.HIGHEST_PROTOCOL)
+        return self.pool.map(_fitPayload, [(payload, a) for a in args])
+
+    def close(self):
+        """
+        Terminates all worker processes of the pool.
+        """
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
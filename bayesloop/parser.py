@@ -70,6 +70,9 @@ class Parser:
 
         self.names = []
         for study in studies:
+            if getattr(study, 'marginalsOnly', False):
+                raise ConfigurationError('Parser instance needs the joint posterior distributions, which are not '
+                                         'stored by studies with "marginalsOnly=True".')
             self.names.extend(study.observationModel.parameterNames)
 
             try:
@@ -266,7 +269,7 @@ class Parser:
                     names = study.observationModel.parameterNames
                     for i, name in enumerate(names):
                         index = study.observationModel.parameterNames.index(name)
-                        self.parameters.append(Parameter(np.ravel(study.grid[index]),
+                        self.parameters.append(Parameter(np.ravel(np.broadcast_to(study.grid[index], study.gridSize)),
                                                          np.array([np.ravel(post) for post in study.posteriorSequence]),
                                                          name=name,
                                                          study=study))
@@ -274,7 +277,7 @@ class Parser:
                     names = study.observationModel.parameterNames
                     for i, name in enumerate(names):
                         index = study.observationModel.parameterNames.index(name)
-                        self.parameters.append(Parameter(np.ravel(study.grid[index]),
+                        self.parameters.append(Parameter(np.ravel(np.broadcast_to(study.grid[index], study.gridSize)),
                                                          np.ravel(study.marginalizedPosterior),
                                                          name=name,
                                                          time=study.formattedTimestamps[-1],
@@ -287,7 +290,7 @@ class Parser:
                 names = study.observationModel.parameterNames
                 for i, name in enumerate(names):
                     index = study.observationModel.parameterNames.index(name)
-                    self.parameters.append(Parameter(np.ravel(study.grid[index]),
+                    self.parameters.append(Parameter(np.ravel(np.broadcast_to(study.grid[index], study.gridSize)),
                                                      np.ravel(study.posteriorSequence[timeIndex]),
                                                      name=name,
                                                      time=t,
@@ -353,11 +356,8 @@ class Parser:
                         # probability values
                         normedDist = study.hyperParameterDistribution / np.sum(study.hyperParameterDistribution)
 
-                        # hyper-parameter values
-                        try:
-                            values = study.allHyperGridValues  # Changepoint-Study
-                        except AttributeError:
-                            values = study.hyperGridValues  # Hyper-Study
+                        # hyper-parameter values (probability values are only stored for fitted hyper-grid values)
+                        values = study.hyperGridValues[study.evaluatedIndices]
 
                         self.parameters.append(HyperParameter(values[:, index],
                                                               normedDist,
@@ -23,6 +23,11 @@ class TransitionModel:
     """
     Parent class for transition models. All transition models inherit from this class. It is currently only used to
     identify transition models as such.
+
+    Transition models may additionally implement the methods computeForwardPriorBatch and computeBackwardPriorBatch,
+    which transform a stack of parameter distributions at once (first axis enumerates the distributions). In this
+    case, each hyper-parameter value may be given as an array with one value for each distribution of the stack. These
+    methods are used by the vectorized fit method of the HyperStudy class.
     """
 
 
@@ -57,6 +62,22 @@ class Static(TransitionModel):
     def computeBackwardPrior(self, posterior, t):
         return self.computeForwardPrior(posterior, t - 1)
 
+    def computeForwardPriorBatch(self, posteriors, t):
+        """
+        Compute new priors from a stack of old posteriors (moving forwards in time).
+
+        Args:
+            posteriors(ndarray): Parameter distributions from current time step (first axis enumerates distributions)
+            t(int): integer time step
+
+        Returns:
+            ndarray: Prior parameter distributions for subsequent time step
+        """
+        return posteriors
+
+    def computeBackwardPriorBatch(self, posteriors, t):
+        return self.computeForwardPriorBatch(posteriors, t - 1)
+
 
 class GaussianRandomWalk(TransitionModel):
     """
@@ -111,6 +132,36 @@ class GaussianRandomWalk(TransitionModel):
     def computeBackwardPrior(self, posterior, t):
         return self.computeForwardPrior(posterior, t - 1)
 
+    def computeForwardPriorBatch(self, posteriors, t):
+        """
+        Compute new priors from a stack of old posteriors (moving forwards in time). The Gaussian filter is applied
+        once for each distinct value of the standard deviation.
+
+        Args:
+            posteriors(ndarray): Parameter distributions from current time step (first axis enumerates distributions)
+            t(int): integer time step
+
+        Returns:
+            ndarray: Prior parameter distributions for subsequent time step
+        """
+        axisToTransform = self.study.observationModel.parameterNames.index(self.selectedParameter)
+        normedSigmas = np.broadcast_to(self.hyperParameterValues[0], len(posteriors)) / \
+            self.latticeConstant[axisToTransform]
+        normedSigmas = np.maximum(normedSigmas, 0.0)  # gaussian_filter1d cannot handle negative st.dev.
+
+        uniqueSigmas = np.unique(normedSigmas)
+        if len(uniqueSigmas) == 1:
+            return gaussian_filter1d(posteriors, uniqueSigmas[0], axis=axisToTransform+1)
+
+        newPriors = np.empty_like(posteriors)
+        for normedSigma in uniqueSigmas:
+            selected = normedSigmas == normedSigma
+            newPriors[selected] = gaussian_filter1d(posteriors[selected], normedSigma, axis=axisToTransform+1)
+        return newPriors
+
+    def computeBackwardPriorBatch(self, posteriors, t):
+        return self.computeForwardPriorBatch(posteriors, t - 1)
+
 
 class AlphaStableRandomWalk(TransitionModel):
     """
@@ -239,7 +290,7 @@ class AlphaStableRandomWalk(TransitionModel):
             ndarray: convolution
         """
         gs = np.array(self.study.gridSize)
-        padded_distribution = np.zeros(3*np.array(gs))
+        padded_distribution = np.zeros(3*np.array(gs), dtype=distribution.dtype)
         if len(gs) == 2:
             padded_distribution[gs[0]:2*gs[0], gs[1]:2*gs[1]] = distribution
         elif len(gs) == 1:
@@ -251,7 +302,7 @@ class AlphaStableRandomWalk(TransitionModel):
         elif len(gs) == 1:
             convolution = padded_convolution[gs[0]:2*gs[0]]
 
-        return convolution
+        return convolution.astype(distribution.dtype, copy=False)
 
 
 class ChangePoint(TransitionModel):
@@ -292,24 +343,56 @@ class ChangePoint(TransitionModel):
             ndarray: Prior parameter distribution for subsequent time step
         """
         if t == self.hyperParameterValues[0]:
-            # check if custom prior is used by observation model
-            if hasattr(self.study.observationModel.prior, '__call__'):
-                prior = self.study.observationModel.prior(*self.study.grid)
-            elif isinstance(self.study.observationModel.prior, np.ndarray):
-                prior = deepcopy(self.study.observationModel.prior)
-            else:
-                prior = np.ones(self.study.gridSize)  # flat prior
-
-            # normalize prior (necessary in case an improper prior is used)
-            prior /= np.sum(prior)
-            prior *= np.prod(self.study.latticeConstant)
-            return prior
+            return self._computeResetPrior()
         else:
             return posterior
 
     def computeBackwardPrior(self, posterior, t):
         return self.computeForwardPrior(posterior, t - 1)
 
+    def computeForwardPriorBatch(self, posteriors, t):
+        """
+        Compute new priors from a stack of old posteriors (moving forwards in time).
+
+        Args:
+            posteriors(ndarray): Parameter distributions from current time step (first axis enumerates distributions)
+            t(int): integer time step
+
+        Returns:
+            ndarray: Prior parameter distributions for subsequent time step
+        """
+        reset = np.broadcast_to(self.hyperParameterValues[0] == t, len(posteriors))
+        if not np.any(reset):
+            return posteriors
+
+        newPriors = posteriors.copy()
+        newPriors[reset] = self._computeResetPrior()
+        return newPriors
+
+    def computeBackwardPriorBatch(self, posteriors, t):
+        return self.computeForwardPriorBatch(posteriors, t - 1)
+
+    def _computeResetPrior(self):
+        """
+        Computes the parameter distribution right after the change-point, based on the prior distribution of the
+        observation model.
+
+        Returns:
+            ndarray: Prior parameter distribution
+        """
+        # check if custom prior is used by observation model
+        if hasattr(self.study.observationModel.prior, '__call__'):
+            prior = self.study.observationModel.prior(*self.study.grid)*np.ones(self.study.gridSize)
+        elif isinstance(self.study.observationModel.prior, np.ndarray):
+            prior = deepcopy(self.study.observationModel.prior)
+        else:
+            prior = np.ones(self.study.gridSize, dtype=self.study.dtype)  # flat prior
+
+        # normalize prior (necessary in case an improper prior is used)
+        prior /= np.sum(prior)
+        prior *= np.prod(self.study.latticeConstant)
+        return prior
+
 
 class Independent(TransitionModel):
     """
@@ -343,11 +426,11 @@ class Independent(TransitionModel):
         """
         # check if custom prior is used by observation model
         if hasattr(self.study.observationModel.prior, '__call__'):
-            prior = self.study.observationModel.prior(*self.study.grid)
+            prior = self.study.observationModel.prior(*self.study.grid)*np.ones(self.study.gridSize)
         elif isinstance(self.study.observationModel.prior, np.ndarray):
             prior = deepcopy(self.study.observationModel.prior)
         else:
-            prior = np.ones(self.study.gridSize)  # flat prior
+            prior = np.ones(self.study.gridSize, dtype=self.study.dtype)  # flat prior
 
         # normalize prior (necessary in case an improper prior is used)
         prior /= np.sum(prior)
@@ -356,6 +439,24 @@ class Independent(TransitionModel):
     def computeBackwardPrior(self, posterior, t):
         return self.computeForwardPrior(posterior, t - 1)
 
+    def computeForwardPriorBatch(self, posteriors, t):
+        """
+        Compute new priors from a stack of old posteriors (moving forwards in time).
+
+        Args:
+            posteriors(ndarray): Parameter distributions from current time step (first axis enumerates distributions)
+            t(int): integer time step
+
+        Returns:
+            ndarray: Prior parameter distributions for subsequent time step
+        """
+        newPriors = np.empty_like(posteriors)
+        newPriors[:] = self.computeForwardPrior(None, t)
+        return newPriors
+
+    def computeBackwardPriorBatch(self, posteriors, t):
+        return self.computeForwardPriorBatch(posteriors, t - 1)
+
 
 class RegimeSwitch(TransitionModel):
     """
@@ -408,6 +509,30 @@ class RegimeSwitch(TransitionModel):
     def computeBackwardPrior(self, posterior, t):
         return self.computeForwardPrior(posterior, t - 1)
 
+    def computeForwardPriorBatch(self, posteriors, t):
+        """
+        Compute new priors from a stack of old posteriors (moving forwards in time).
+
+        Args:
+            posteriors(ndarray): Parameter distributions from current time step (first axis enumerates distributions)
+            t(int): integer time step
+
+        Returns:
+            ndarray: Prior parameter distributions for subsequent time step
+        """
+        axes = tuple(range(1, posteriors.ndim))
+        limits = (10.**np.broadcast_to(self.hyperParameterValues[0], len(posteriors)))*np.prod(self.latticeConstant)
+        limits = limits.reshape((-1,) + (1,)*len(axes)).astype(posteriors.dtype)
+        newPriors = np.maximum(posteriors, limits)
+
+        # transformation above violates proper normalization; re-normalization needed
+        newPriors /= np.sum(newPriors, axis=axes, keepdims=True)
+
+        return newPriors
+
+    def computeBackwardPriorBatch(self, posteriors, t):
+        return self.computeForwardPriorBatch(posteriors, t - 1)
+
 
 class NotEqual(TransitionModel):
     """
@@ -467,6 +592,33 @@ class NotEqual(TransitionModel):
     def computeBackwardPrior(self, posterior, t):
         return self.computeForwardPrior(posterior, t - 1)
 
+    def computeForwardPriorBatch(self, posteriors, t):
+        """
+        Compute new priors from a stack of old posteriors (moving forwards in time).
+
+        Args:
+            posteriors(ndarray): Parameter distributions from current time step (first axis enumerates distributions)
+            t(int): integer time step
+
+        Returns:
+            ndarray: Prior parameter distributions for subsequent time step
+        """
+        axes = tuple(range(1, posteriors.ndim))
+        limits = (10**np.broadcast_to(self.hyperParameterValues[0], len(posteriors)))*np.prod(self.latticeConstant)
+        limits = limits.reshape((-1,) + (1,)*len(axes)).astype(posteriors.dtype)
+
+        newPriors = np.amax(posteriors, axis=axes, keepdims=True) - posteriors
+        newPriors /= np.sum(newPriors, axis=axes, keepdims=True)
+        newPriors = np.maximum(newPriors, limits)
+
+        # transformation above violates proper normalization; re-normalization needed
+        newPriors /= np.sum(newPriors, axis=axes, keepdims=True)
+
+        return newPriors
+
+    def computeBackwardPriorBatch(self, posteriors, t):
+        return self.computeForwardPriorBatch(posteriors, t - 1)
+
 
 class Deterministic(TransitionModel):
     """
@@ -655,6 +807,39 @@ class CombinedTransitionModel(TransitionModel):
 
         return newPrior
 
+    def computeForwardPriorBatch(self, posteriors, t):
+        """
+        Compute new priors from a stack of old posteriors (moving forwards in time). All sub-models need to support
+        batch transformations.
+
+        Args:
+            posteriors(ndarray): Parameter distributions from current time step (first axis enumerates distributions)
+            t(int): integer time step
+
+        Returns:
+            ndarray: Prior parameter distributions for subsequent time step
+        """
+        newPriors = posteriors.copy()
+
+        for m in self.models:
+            m.latticeConstant = self.latticeConstant  # latticeConstant needs to be propagated to sub-models
+            m.study = self.study  # study needs to be propagated to sub-models
+            m.tOffset = self.tOffset
+            newPriors = m.computeForwardPriorBatch(newPriors, t)
+
+        return newPriors
+
+    def computeBackwardPriorBatch(self, posteriors, t):
+        newPriors = posteriors.copy()
+
+        for m in self.models:
+            m.latticeConstant = self.latticeConstant
+            m.study = self.study
+            m.tOffset = self.tOffset
+            newPriors = m.computeBackwardPriorBatch(newPriors, t)
+
+        return newPriors
+
 
 class SerialTransitionModel(TransitionModel):
     """
@@ -795,11 +980,11 @@ class SerialTransitionModel(TransitionModel):
         if t in np.array(self.hyperParameterValues)[self.changePointMask]:
             # check if custom prior is used by observation model
             if hasattr(self.study.observationModel.prior, '__call__'):
-                prior = self.study.observationModel.prior(*self.study.grid)
+                prior = self.study.observationModel.prior(*self.study.grid)*np.ones(self.study.gridSize)
             elif isinstance(self.study.observationModel.prior, np.ndarray):
                 prior = deepcopy(self.study.observationModel.prior)
             else:
-                prior = np.ones(self.study.gridSize)  # flat prior
+                prior = np.ones(self.study.gridSize, dtype=self.study.dtype)  # flat prior
 
             # normalize prior (necessary in case an improper prior is used)
             prior /= np.sum(prior)
@@ -98,3 +98,158 @@ class TestTwoParameterModel:
         np.testing.assert_allclose(np.array([d, p]),
                                    [[1., 2., 3.], [0.00373717, 0.40402616, 0.59223667]],
                                    rtol=1e-05, err_msg='Erroneous values in duration distribution.')
+
+    def test_fit_changepoint_scan(self):
+        # single change-point is fitted by one forward and one backward pass instead of one fit per change-point time
+        data = np.array([1, 2, 1, 2, 1, 8, 9, 8, 9, 8])
+        studies = []
+        for scan in [True, False]:
+            S = bl.ChangepointStudy()
+            S.loadData(data)
+            S.setOM(bl.om.Poisson('rate', bl.oint(0, 15, 100)))
+            S.setTM(bl.tm.ChangePoint('t', 'all'))
+
+            if not scan:
+                S._supportsChangepointScan = lambda: False
+            S.fit()
+            studies.append(S)
+        S, R = studies
+        assert S._supportsChangepointScan()
+
+        # test model evidence value
+        np.testing.assert_almost_equal(S.logEvidence, R.logEvidence, decimal=10,
+                                       err_msg='Erroneous log-evidence value.')
+
+        # test hyper-parameter distribution
+        np.testing.assert_allclose(S.hyperParameterDistribution, R.hyperParameterDistribution, rtol=1e-10,
+                                   err_msg='Erroneous values in hyper-parameter distribution.')
+
+        # test parameter mean values
+        np.testing.assert_allclose(S.getParameterMeanValues('rate'), R.getParameterMeanValues('rate'), rtol=1e-10,
+                                   err_msg='Erroneous posterior mean values.')
+
+        # test local evidence values
+        np.testing.assert_allclose(S.localEvidence, R.localEvidence, rtol=1e-10,
+                                   err_msg='Erroneous local evidence values.')
+
+    def test_fit_segmentation(self):
+        # multiple change-points are fitted by exact segmentation instead of one fit per combination of change-points
+        data = np.array([1, 2, 1, 2, 1, 8, 9, 8, 9, 8, 3, 4, 3])
+        studies = []
+        for engine in ['auto', 'grid']:
+            S = bl.ChangepointStudy()
+            S.loadData(data)
+            S.setOM(bl.om.Gaussian('mean', bl.cint(0, 10, 20), 'sigma', bl.oint(0, 5, 15), prior=lambda m, s: 1/s**3))
+            S.setTM(bl.tm.SerialTransitionModel(bl.tm.Static(),
+                                                bl.tm.ChangePoint('t1', 'all'),
+                                                bl.tm.Static(),
+                                                bl.tm.ChangePoint('t2', 'all', prior=lambda t: t + 1.),
+                                                bl.tm.Static()))
+            S.fit(engine=engine)
+            studies.append(S)
+        S, R = studies
+        assert S._supportsSegmentation()
+
+        # test model evidence value
+        np.testing.assert_almost_equal(S.logEvidence, R.logEvidence, decimal=10,
+                                       err_msg='Erroneous log-evidence value.')
+
+        # test hyper-parameter distribution
+        np.testing.assert_allclose(S.hyperParameterDistribution, R.hyperParameterDistribution, rtol=1e-10,
+                                   err_msg='Erroneous values in hyper-parameter distribution.')
+
+        # test parameter mean values
+        np.testing.assert_allclose(S.getParameterMeanValues('mean'), R.getParameterMeanValues('mean'), rtol=1e-10,
+                                   err_msg='Erroneous posterior mean values.')
+
+        # test local evidence values
+        np.testing.assert_allclose(S.localEvidence, R.localEvidence, rtol=1e-10,
+                                   err_msg='Erroneous local evidence values.')
+
+    def test_fit_segment_cache(self):
+        # forward passes over data segments between change-points are shared among combinations of change-points
+        data = np.array([1, 2, 1, 2, 1, 8, 9, 8, 9, 8, 3, 4, 3])
+        studies = []
+        for segmentCacheSize in [100., 0.]:
+            S = bl.ChangepointStudy(segmentCacheSize=segmentCacheSize)
+            S.loadData(data)
+            S.setOM(bl.om.Poisson('rate', bl.oint(0, 15, 50)))
+            S.setTM(bl.tm.SerialTransitionModel(bl.tm.Static(),
+                                                bl.tm.ChangePoint('t1', 'all'),
+                                                bl.tm.GaussianRandomWalk('sigma', [0.1, 0.5], target='rate'),
+                                                bl.tm.ChangePoint('t2', 'all'),
+                                                bl.tm.Static()))
+            S.fit(evidenceOnly=True)
+            studies.append(S)
+        S, R = studies
+
+        # test model evidence value
+        np.testing.assert_almost_equal(S.logEvidence, R.logEvidence, decimal=10,
+                                       err_msg='Erroneous log-evidence value.')
+
+        # test hyper-parameter distribution
+        np.testing.assert_allclose(S.hyperParameterDistribution, R.hyperParameterDistribution, rtol=1e-10,
+                                   err_msg='Erroneous values in hyper-parameter distribution.')
+
+        # test local evidence values
+        np.testing.assert_allclose(S.localEvidence, R.localEvidence, rtol=1e-10,
+                                   err_msg='Erroneous local evidence values.')
+
+    def test_fit_prefix_sharing(self):
+        # forward passes of combinations of break-points with a common prefix are continued from a shared snapshot
+        data = np.array([1, 2, 1, 2, 1, 8, 9, 8, 9, 8, 3, 4, 3])
+        for kwargs in [{'evidenceOnly': True}, {'forwardOnly': True}]:
+            studies = []
+            for engine in ['auto', 'grid']:
+                S = bl.ChangepointStudy()
+                S.loadData(data)
+                S.setOM(bl.om.Poisson('rate', bl.oint(0, 15, 50)))
+                S.setTM(bl.tm.SerialTransitionModel(bl.tm.Static(),
+                                                    bl.tm.BreakPoint('t1', 'all'),
+                                                    bl.tm.GaussianRandomWalk('sigma', [0.1, 0.5], target='rate'),
+                                                    bl.tm.BreakPoint('t2', 'all'),
+                                                    bl.tm.Static()))
+                S.fit(engine=engine, **kwargs)
+                studies.append(S)
+            S, R = studies
+
+            # test model evidence value
+            np.testing.assert_almost_equal(S.logEvidence, R.logEvidence, decimal=10,
+                                           err_msg='Erroneous log-evidence value.')
+
+            # test hyper-parameter distribution
+            np.testing.assert_allclose(S.hyperParameterDistribution, R.hyperParameterDistribution, rtol=1e-10,
+                                       err_msg='Erroneous values in hyper-parameter distribution.')
+
+            # test local evidence values
+            np.testing.assert_allclose(S.localEvidence, R.localEvidence, rtol=1e-10,
+                                       err_msg='Erroneous local evidence values.')
+
+            # test posterior mean values of the forward pass
+            if 'forwardOnly' in kwargs:
+                np.testing.assert_allclose(S.posteriorMeanValues, R.posteriorMeanValues, rtol=1e-10,
+                                           err_msg='Erroneous posterior mean values.')
+
+    def test_ordered_combinations(self):
+        # only ordered combinations of change-points are enumerated, duration distribution is computed by binning
+        S = bl.ChangepointStudy()
+        S.loadData(np.array([1, 2, 1, 2, 1, 8, 9, 8, 9, 8, 3, 4, 3]))
+        S.setOM(bl.om.Poisson('rate', bl.oint(0, 15, 50)))
+        S.setTM(bl.tm.SerialTransitionModel(bl.tm.Static(),
+                                            bl.tm.ChangePoint('t1', 'all'),
+                                            bl.tm.GaussianRandomWalk('sigma', [0.1, 0.5], target='rate'),
+                                            bl.tm.ChangePoint('t2', 'all'),
+                                            bl.tm.Static()))
+        S.fit(evidenceOnly=True)
+
+        # test indices of valid combinations
+        values = S.allHyperGridValues[:]
+        np.testing.assert_array_equal(S.validIndices, np.flatnonzero(values[:, 1] < values[:, 2]),
+                                      err_msg='Erroneous indices of valid change-point combinations.')
+
+        # test duration distribution
+        d, p = S.getDurationDistribution(['t1', 't2'])
+        differences = np.diff(S.hyperGridValues[:][:, 1:], axis=1)[:, 0]
+        p0 = np.array([np.sum(S.hyperParameterDistribution[differences == x]) for x in np.arange(1, 12)])
+        np.testing.assert_allclose(np.array([d, p]), [np.arange(1., 12.), p0/np.sum(p0)], rtol=1e-10,
+                                   err_msg='Erroneous values in duration distribution.')
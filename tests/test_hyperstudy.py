@@ -4,6 +4,7 @@ from __future__ import print_function, division
 import bayesloop as bl
 import numpy as np
 import sympy.stats as stats
+import pytest
 
 
 class TestTwoParameterModel:
@@ -102,6 +103,366 @@ class TestTwoParameterModel:
                                    rtol=1e-05, err_msg='Erroneous probability values in joint hyper-parameter '
                                                        'distribution.')
 
+    def test_fit_storage_directory(self, tmpdir):
+        # carry out fit (average posterior sequence is stored in memory-mapped file)
+        S = bl.HyperStudy(storageDirectory=str(tmpdir))
+        S.loadData(np.array([1, 2, 3, 4, 5]))
+        S.setOM(bl.om.Gaussian('mean', bl.cint(0, 6, 20), 'sigma', bl.oint(0, 2, 20), prior=lambda m, s: 1/s**3))
+        S.setTM(bl.tm.GaussianRandomWalk('sigma', bl.cint(0, 0.2, 2), target='mean'))
+        S.fit()
+
+        assert isinstance(S.posteriorSequence, np.memmap)
+
+        # test parameter distributions
+        np.testing.assert_allclose(S.getParameterDistributions('mean', density=False)[1][:, 5],
+                                   [0.01042107, 0.00766233, 0.00618352, 0.00554651, 0.00548637],
+                                   rtol=1e-05, err_msg='Erroneous posterior distribution values.')
+
+        # test parameter mean values
+        np.testing.assert_allclose(S.getParameterMeanValues('mean'),
+                                   [2.88534505, 2.93135361, 3., 3.06864639, 3.11465495],
+                                   rtol=1e-05, err_msg='Erroneous posterior mean values.')
+
+        # test model evidence value
+        np.testing.assert_almost_equal(S.logEvidence, -16.0629517262, decimal=5,
+                                       err_msg='Erroneous log-evidence value.')
+
+    def test_fit_marginals_only(self):
+        # carry out fit (only average marginal distributions are stored)
+        S = bl.HyperStudy(marginalsOnly=True)
+        S.loadData(np.array([1, 2, 3, 4, 5]))
+        S.setOM(bl.om.Gaussian('mean', bl.cint(0, 6, 20), 'sigma', bl.oint(0, 2, 20), prior=lambda m, s: 1/s**3))
+        S.setTM(bl.tm.GaussianRandomWalk('sigma', bl.cint(0, 0.2, 2), target='mean'))
+        S.fit()
+
+        # test parameter distributions
+        np.testing.assert_allclose(S.getParameterDistributions('mean', density=False)[1][:, 5],
+                                   [0.01042107, 0.00766233, 0.00618352, 0.00554651, 0.00548637],
+                                   rtol=1e-05, err_msg='Erroneous posterior distribution values.')
+
+        # test parameter mean values
+        np.testing.assert_allclose(S.getParameterMeanValues('mean'),
+                                   [2.88534505, 2.93135361, 3., 3.06864639, 3.11465495],
+                                   rtol=1e-05, err_msg='Erroneous posterior mean values.')
+
+        # test model evidence value
+        np.testing.assert_almost_equal(S.logEvidence, -16.0629517262, decimal=5,
+                                       err_msg='Erroneous log-evidence value.')
+
+    def test_fit_shared_likelihood_cache(self):
+        # carry out fit (likelihood values are computed only once for all hyper-grid values)
+        S = bl.HyperStudy()
+        S.loadData(np.array([1, 2, 3, 4, 5]))
+        L = bl.om.Gaussian('mean', bl.cint(0, 6, 20), 'sigma', bl.oint(0, 2, 20), prior=lambda m, s: 1/s**3)
+        S.setOM(L)
+        S.setTM(bl.tm.GaussianRandomWalk('sigma', bl.cint(0, 0.2, 2), target='mean'))
+
+        # count evaluations of the observation model
+        calls = []
+        pdfBatch = L.processedPdfBatch
+        L.processedPdfBatch = lambda grid, dataSegments: calls.append(len(dataSegments)) or pdfBatch(grid, dataSegments)
+        L.processedPdf = None  # single data segments must not be evaluated
+        S.fit()
+
+        assert sum(calls) == 5
+        assert S.likelihoodCache is None
+
+        # test parameter mean values
+        np.testing.assert_allclose(S.getParameterMeanValues('mean'),
+                                   [2.88534505, 2.93135361, 3., 3.06864639, 3.11465495],
+                                   rtol=1e-05, err_msg='Erroneous posterior mean values.')
+
+        # test model evidence value
+        np.testing.assert_almost_equal(S.logEvidence, -16.0629517262, decimal=5,
+                                       err_msg='Erroneous log-evidence value.')
+
+    def test_fit_vectorized(self):
+        # carry out fit (all hyper-grid values are processed in batches of two)
+        S = bl.HyperStudy()
+        S.loadData(np.array([1, 2, 3, 4, 5]))
+        S.setOM(bl.om.Gaussian('mean', bl.cint(0, 6, 20), 'sigma', bl.oint(0, 2, 20), prior=lambda m, s: 1/s**3))
+
+        T = bl.tm.CombinedTransitionModel(bl.tm.GaussianRandomWalk('sigma', bl.cint(0, 0.2, 2), target='mean'),
+                                          bl.tm.RegimeSwitch('log10pMin', [-3, -1]))
+
+        S.setTM(T)
+        S.fit(vectorized=True, memoryBudget=0.06)
+
+        # test parameter distributions
+        np.testing.assert_allclose(S.getParameterDistributions('mean', density=False)[1][:, 5],
+                                   [5.80970506e-03, 1.12927905e-01, 4.44501254e-02, 1.00250119e-02, 1.72751309e-05],
+                                   rtol=1e-05, err_msg='Erroneous posterior distribution values.')
+
+        # test parameter mean values
+        np.testing.assert_allclose(S.getParameterMeanValues('mean'),
+                                   [0.96492471, 2.09944204, 2.82451616, 3.72702495, 5.0219119],
+                                   rtol=1e-05, err_msg='Erroneous posterior mean values.')
+
+        # test model evidence value
+        np.testing.assert_almost_equal(S.logEvidence, -10.7601875492, decimal=5,
+                                       err_msg='Erroneous log-evidence value.')
+
+        # hyper-parameter values are restored after the fit
+        np.testing.assert_array_equal(S.transitionModel.models[1].hyperParameterValues[0], [-3, -1])
+
+    def test_fit_multiprocessing(self):
+        # carry out fit (hyper-grid values are distributed among two forked processes)
+        S = bl.HyperStudy()
+        S.loadData(np.array([1, 2, 3, 4, 5]))
+        S.setOM(bl.om.Gaussian('mean', bl.cint(0, 6, 20), 'sigma', bl.oint(0, 2, 20), prior=lambda m, s: 1/s**3))
+        S.setTM(bl.tm.GaussianRandomWalk('sigma', bl.cint(0, 0.2, 2), target='mean'))
+        S.fit(nJobs=2, backend='multiprocessing')
+
+        # test parameter mean values
+        np.testing.assert_allclose(S.getParameterMeanValues('mean'),
+                                   [2.88534505, 2.93135361, 3., 3.06864639, 3.11465495],
+                                   rtol=1e-05, err_msg='Erroneous posterior mean values.')
+
+        # test model evidence value
+        np.testing.assert_almost_equal(S.logEvidence, -16.0629517262, decimal=5,
+                                       err_msg='Erroneous log-evidence value.')
+
+    def test_fit_worker_pool(self):
+        # carry out two fits using the same (long-lived) pool of worker processes
+        with bl.WorkerPool(2) as pool:
+            for i in range(2):
+                S = bl.HyperStudy()
+                S.loadData(np.array([1, 2, 3, 4, 5]))
+                S.setOM(bl.om.Gaussian('mean', bl.cint(0, 6, 20), 'sigma', bl.oint(0, 2, 20),
+                                       prior=lambda m, s: 1/s**3))
+                S.setTM(bl.tm.GaussianRandomWalk('sigma', bl.cint(0, 0.2, 2), target='mean'))
+                S.fit(pool=pool)
+
+                # test parameter mean values
+                np.testing.assert_allclose(S.getParameterMeanValues('mean'),
+                                           [2.88534505, 2.93135361, 3., 3.06864639, 3.11465495],
+                                           rtol=1e-05, err_msg='Erroneous posterior mean values.')
+
+                # test model evidence value
+                np.testing.assert_almost_equal(S.logEvidence, -16.0629517262, decimal=5,
+                                               err_msg='Erroneous log-evidence value.')
+
+    def test_fit_average_posterior(self):
+        # carry out fit (evidence values of hyper-grid values differ by many orders of magnitude)
+        data = np.array([1, 2, 3, 4, 5, 1, 2, 3, 4, 5])*10.
+        S = bl.HyperStudy()
+        S.loadData(data)
+        S.setOM(bl.om.Gaussian('mean', bl.cint(0, 60, 50), 'sigma', bl.oint(0, 20, 50), prior=lambda m, s: 1/s**3))
+        S.setTM(bl.tm.GaussianRandomWalk('sigma', [0., 1., 10., 20.], target='mean'))
+        S.fit()
+
+        # compare to evidence-weighted average of individual fits
+        posteriorSequences = []
+        logEvidences = []
+        for sigma in [0., 1., 10., 20.]:
+            S2 = bl.Study()
+            S2.loadData(data)
+            S2.setOM(bl.om.Gaussian('mean', bl.cint(0, 60, 50), 'sigma', bl.oint(0, 20, 50), prior=lambda m, s: 1/s**3))
+            S2.setTM(bl.tm.GaussianRandomWalk('sigma', sigma, target='mean'))
+            S2.fit()
+            posteriorSequences.append(S2.posteriorSequence)
+            logEvidences.append(S2.logEvidence)
+
+        weights = np.exp(np.array(logEvidences) - np.amax(logEvidences))
+        average = np.sum(weights[:, None, None, None]*np.array(posteriorSequences), axis=0)/np.sum(weights)
+
+        np.testing.assert_allclose(S.posteriorSequence, average, rtol=1e-8, atol=1e-300,
+                                   err_msg='Erroneous average posterior sequence.')
+
+    def test_lazy_hyper_grid(self):
+        S = bl.HyperStudy()
+        S.loadData(np.array([1, 2, 3, 4, 5]))
+        S.setOM(bl.om.Gaussian('mean', bl.cint(0, 6, 20), 'sigma', bl.oint(0, 2, 20), prior=lambda m, s: 1/s**3))
+
+        T = bl.tm.CombinedTransitionModel(bl.tm.GaussianRandomWalk('sigma', bl.cint(0, 0.2, 3), target='mean'),
+                                          bl.tm.RegimeSwitch('log10pMin', [-3, -2, -1], prior=np.array([1., 2., 1.])))
+        S.setTM(T)
+        S._createHyperGrid()
+
+        # combinations of hyper-parameter values are computed on demand
+        values = np.array([[0., 0., 0., 0.1, 0.1, 0.1, 0.2, 0.2, 0.2],
+                           [-3, -2, -1, -3, -2, -1, -3, -2, -1]]).T
+        np.testing.assert_allclose(S.hyperGridValues[:], values, err_msg='Erroneous hyper-grid values.')
+        np.testing.assert_allclose(S.hyperGridValues[[1, -1], 1], [-2, -1], err_msg='Erroneous hyper-grid values.')
+        np.testing.assert_allclose(S.hyperGridValues.priorValues(), np.tile([0.25, 0.5, 0.25], 3)/0.3,
+                                   err_msg='Erroneous hyper-prior values.')
+        np.testing.assert_almost_equal(S.hyperGridValues.priorSum(), 10., decimal=10,
+                                       err_msg='Erroneous sum of hyper-prior values.')
+
+        # weights of selected hyper-grid values are expanded to the values of individual hyper-parameters
+        np.testing.assert_allclose(S.hyperGridValues.marginalize([1., 2., 3.], [1], [0, 4, 5]), [1., 2., 3.],
+                                   err_msg='Erroneous marginalized weights.')
+
+        # split hyper-grid values among processes
+        parts = S.hyperGridValues.split(2)
+        np.testing.assert_allclose(parts[1][:], values[5:], err_msg='Erroneous partial hyper-grid values.')
+
+        # select subset of hyper-grid values
+        subset = S.hyperGridValues.subset(values[:, 1] > -3)
+        np.testing.assert_allclose(list(subset), values[values[:, 1] > -3], err_msg='Erroneous hyper-grid subset.')
+
+    def test_fit_adaptive(self):
+        # carry out fit (coarse hyper-grid contains every fourth value, and the last value)
+        S = bl.HyperStudy()
+        S.loadData(np.array([1, 2, 3, 4, 5]))
+        S.setOM(bl.om.Gaussian('mean', bl.cint(0, 6, 20), 'sigma', bl.oint(0, 2, 20), prior=lambda m, s: 1/s**3))
+        S.setTM(bl.tm.GaussianRandomWalk('sigma', bl.cint(0, 0.8, 9), target='mean'))
+        S.fit(adaptive=True, coarseStep=4, refinementMass=0.5)
+
+        # test hyper-parameter distribution (values in neighborhood of improbable coarse values are not fitted)
+        np.testing.assert_allclose(S.getHyperParameterDistribution('sigma')[1],
+                                   [2.02015172e-04, 0., 0., 0., 1.44346942e-03, 2.34155395e-02, 1.30603121e-01,
+                                    3.24491695e-01, 5.19844160e-01],
+                                   rtol=1e-05, err_msg='Erroneous values in hyper-parameter distribution.')
+
+        # test model evidence value
+        np.testing.assert_almost_equal(S.logEvidence, -9.8847472938, decimal=5,
+                                       err_msg='Erroneous log-evidence value.')
+
+        # refining all coarse values yields result of standard fit
+        S.fit(adaptive=True, coarseStep=4, refinementMass=1.)
+        np.testing.assert_almost_equal(S.logEvidence, -9.8839043449, decimal=5,
+                                       err_msg='Erroneous log-evidence value.')
+
+    def test_fit_adaptive_lower_bound(self):
+        # log-evidence and local evidence of an adaptive fit only contain fitted values (without re-normalization)
+        S = bl.HyperStudy()
+        S.loadData(np.array([1, 2, 3, 4, 5]))
+        S.setOM(bl.om.Gaussian('mean', bl.cint(0, 6, 20), 'sigma', bl.oint(0, 2, 20), prior=lambda m, s: 1/s**3))
+        S.setTM(bl.tm.GaussianRandomWalk('sigma', bl.cint(0.1, 0.9, 9), target='mean'))
+        S.fit(evidenceOnly=True)
+        logEvidence, localEvidence = S.logEvidence, S.localEvidence
+
+        S.fit(evidenceOnly=True, adaptive=True, coarseStep=4, refinementMass=0.5)
+        assert S.logEvidence < logEvidence
+        assert np.all(S.localEvidence < localEvidence)
+
+    def test_fit_pruning(self):
+        # carry out fit (change-points after the jump are abandoned during the forward pass)
+        S = bl.HyperStudy()
+        S.loadData(np.array([1, 2, 1, 2, 8, 9, 8, 9, 8, 9]))
+        S.setOM(bl.om.Poisson('rate', bl.oint(0, 15, 100)))
+        S.setTM(bl.tm.ChangePoint('t', 'all'))
+        S.fit(pruningMargin=10.)
+
+        # test pruned hyper-grid values and their share of the hyper-parameter distribution
+        np.testing.assert_array_equal(S.prunedIndices, [7, 8], err_msg='Erroneous pruned hyper-grid values.')
+        np.testing.assert_almost_equal(S.prunedMass, 4.514459276e-05, decimal=10,
+                                       err_msg='Erroneous pruned probability mass.')
+
+        # test hyper-parameter distribution
+        np.testing.assert_allclose(S.getHyperParameterDistribution('t')[1],
+                                   [1.48858304e-04, 8.21450137e-04, 4.39042102e-02, 9.45624098e-01, 9.02040924e-03,
+                                    3.49374181e-04, 9.28261178e-05, 2.31807435e-05, 1.55925994e-05],
+                                   atol=1e-5, err_msg='Erroneous values in hyper-parameter distribution.')
+
+        # test model evidence value (result of standard fit: -24.774845441)
+        np.testing.assert_almost_equal(S.logEvidence, -24.774839069, decimal=5,
+                                       err_msg='Erroneous log-evidence value.')
+
+        # evidence-only fit is pruned in the same way
+        S.fit(evidenceOnly=True, pruningMargin=10.)
+        np.testing.assert_almost_equal(S.logEvidence, -24.774839069, decimal=5,
+                                       err_msg='Erroneous log-evidence value.')
+
+    def test_fit_time_budget(self):
+        S = bl.HyperStudy()
+        S.loadData(np.array([1, 2, 3, 4, 5]))
+        S.setOM(bl.om.Gaussian('mean', bl.cint(0, 6, 20), 'sigma', bl.oint(0, 2, 20), prior=lambda m, s: 1/s**3))
+        S.setTM(bl.tm.GaussianRandomWalk('sigma', bl.cint(0, 0.8, 9), target='mean'))
+
+        # hyper-grid values are fitted from coarse to fine
+        S._createHyperGrid()
+        np.testing.assert_array_equal(S.hyperGridValues.spaceFillingOrder(), [0, 8, 4, 2, 6, 1, 5, 3, 7],
+                                      err_msg='Erroneous order of hyper-grid values.')
+
+        # exhausted time budget: only the first value is fitted
+        S.fit(timeBudget=0.)
+        np.testing.assert_array_equal(S.evaluatedIndices, [0], err_msg='Erroneous evaluated hyper-grid values.')
+        np.testing.assert_allclose(S.getHyperParameterDistribution('sigma')[1], [1., 0., 0., 0., 0., 0., 0., 0., 0.],
+                                   err_msg='Erroneous values in hyper-parameter distribution.')
+
+        # sufficient time budget yields result of standard fit
+        S.fit(timeBudget=3600.)
+        np.testing.assert_array_equal(np.sort(S.evaluatedIndices), np.arange(9),
+                                      err_msg='Erroneous evaluated hyper-grid values.')
+        np.testing.assert_almost_equal(S.logEvidence, -9.8839043449, decimal=5,
+                                       err_msg='Erroneous log-evidence value.')
+
+    def test_fit_time_budget_evidence(self):
+        # hyper-prior is re-normalized among the fitted values: a single fitted value yields its own evidence
+        S = bl.HyperStudy()
+        S.loadData(np.array([1, 2, 3, 4, 5]))
+        S.setOM(bl.om.Gaussian('mean', bl.cint(0, 6, 20), 'sigma', bl.oint(0, 2, 20), prior=lambda m, s: 1/s**3))
+        S.setTM(bl.tm.GaussianRandomWalk('sigma', bl.cint(0.1, 0.9, 9), target='mean'))
+        S.fit(evidenceOnly=True, timeBudget=0.)
+        np.testing.assert_almost_equal(S.logEvidence, S.logEvidenceList[0], decimal=10,
+                                       err_msg='Erroneous log-evidence value.')
+
+    def test_fit_checkpoint_resume(self, tmpdir):
+        # posterior callback aborts the fit during the fourth hyper-grid value
+        def callback(t, posterior):
+            callback.count += 1
+            if callback.count > 15:
+                raise KeyboardInterrupt
+        callback.count = 0
+
+        S = bl.HyperStudy(posteriorCallback=callback)
+        S.loadData(np.array([1, 2, 3, 4, 5]))
+        S.setOM(bl.om.Gaussian('mean', bl.cint(0, 6, 20), 'sigma', bl.oint(0, 2, 20), prior=lambda m, s: 1/s**3))
+        S.setTM(bl.tm.GaussianRandomWalk('sigma', bl.cint(0, 0.8, 9), target='mean'))
+        try:
+            S.fit(checkpointDirectory=str(tmpdir), checkpointPeriod=0.)
+        except KeyboardInterrupt:
+            pass
+
+        # resumed fit only fits remaining hyper-grid values
+        S.posteriorCallback = None
+        S.fit(checkpointDirectory=str(tmpdir), resume=True)
+        np.testing.assert_array_equal(S.evaluatedIndices, np.arange(9),
+                                      err_msg='Erroneous evaluated hyper-grid values.')
+
+        # test model evidence value and mean values (result of standard fit)
+        np.testing.assert_almost_equal(S.logEvidence, -9.8839043449, decimal=5,
+                                       err_msg='Erroneous log-evidence value.')
+        np.testing.assert_allclose(S.getParameterMeanValues('mean'),
+                                   [0.9655735319, 1.938227401, 3., 4.061772599, 5.0344264681],
+                                   rtol=1e-05, err_msg='Erroneous posterior mean values.')
+
+    def test_fit_checkpoint_resume_pruning(self, tmpdir):
+        # posterior callback aborts the fit during the fifth hyper-grid value
+        def callback(t, posterior):
+            callback.count += 1
+            if callback.count > 40:
+                raise KeyboardInterrupt
+        callback.count = 0
+
+        S = bl.HyperStudy(posteriorCallback=callback)
+        S.loadData(np.array([1, 2, 1, 2, 8, 9, 8, 9, 8, 9]))
+        S.setOM(bl.om.Poisson('rate', bl.oint(0, 15, 100)))
+        S.setTM(bl.tm.ChangePoint('t', 'all'))
+        try:
+            S.fit(checkpointDirectory=str(tmpdir), checkpointPeriod=0., pruningMargin=10.)
+        except KeyboardInterrupt:
+            pass
+
+        # resumed fit has to use the same pruning margin
+        S.posteriorCallback = None
+        with pytest.raises(bl.exceptions.ConfigurationError):
+            S.fit(checkpointDirectory=str(tmpdir), resume=True, pruningMargin=5.)
+
+        # resumed fit prunes with respect to the reference of the interrupted fit
+        S.fit(checkpointDirectory=str(tmpdir), resume=True, pruningMargin=10.)
+        R = bl.HyperStudy()
+        R.loadData(np.array([1, 2, 1, 2, 8, 9, 8, 9, 8, 9]))
+        R.setOM(bl.om.Poisson('rate', bl.oint(0, 15, 100)))
+        R.setTM(bl.tm.ChangePoint('t', 'all'))
+        R.fit(pruningMargin=10.)
+
+        np.testing.assert_array_equal(S.prunedIndices, R.prunedIndices, err_msg='Erroneous pruned hyper-grid values.')
+        np.testing.assert_almost_equal(S.logEvidence, R.logEvidence, decimal=10,
+                                       err_msg='Erroneous log-evidence value.')
+
     def test_fit_hyperprior_array(self):
         # carry out fit
         S = bl.HyperStudy()
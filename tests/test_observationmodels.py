@@ -121,6 +121,33 @@ class TestNumPy:
         np.testing.assert_almost_equal(S.logEvidence, 29.792823521784587, decimal=5,
                                        err_msg='Erroneous log-evidence value.')
 
+    def test_numpy_dense_grid(self):
+        # carry out fit
+        S = bl.Study()
+        S.loadData(np.array([1, 2, 3, 4, 5]))
+
+        def likelihood(data, mu, std):
+            x = data
+
+            # function relies on the full shape of the parameter grid
+            assert mu.shape == std.shape
+
+            pdf = np.exp((x - mu) ** 2. / (2 * std ** 2.)) / np.sqrt(2 * np.pi * std ** 2.)
+            return pdf
+
+        L = bl.om.NumPy(likelihood, 'mu', bl.oint(0, 7, 100), 'std', bl.oint(1, 2, 100), denseGrid=True)
+
+        S.setOM(L)
+        S.setTM(bl.tm.Static())
+        S.fit()
+
+        # parameter grid of study is stored as open grid
+        assert S.grid[0].shape == (100, 1)
+
+        # test model evidence value
+        np.testing.assert_almost_equal(S.logEvidence, 29.792823521784587, decimal=5,
+                                       err_msg='Erroneous log-evidence value.')
+
 
 class TestBuiltin:
     def test_bernoulli(self):
@@ -218,3 +245,21 @@ class TestBuiltin:
         S.fit()
         np.testing.assert_almost_equal(S.logEvidence, -4.4178639067800738, decimal=5,
                                        err_msg='Erroneous log-evidence value.')
+
+    def test_pdfbatch_missing_data(self):
+        S = bl.Study()
+        S.loadData(np.array([1, 0, np.nan, 0, 0]))
+
+        L = bl.om.AR1('rho', bl.oint(-1, 1, 100), 'sigma', bl.oint(0, 1, 100))
+        S.setOM(L)
+
+        # vectorized pdf of all data segments
+        dataSegments = bl.preprocessing.movingWindow(S.rawData, L.segmentLength)
+        pdf = L.processedPdfBatch(S.grid, dataSegments)
+
+        # data segments with missing data do not alter the parameter distribution
+        np.testing.assert_allclose(pdf[1:3], 1., err_msg='Erroneous pdf values for missing data.')
+
+        # compare remaining data segments to pdf of individual data segments
+        np.testing.assert_allclose(pdf[[0, 3]], [L.pdf(S.grid, dataSegments[0]), L.pdf(S.grid, dataSegments[3])],
+                                   rtol=1e-10, err_msg='Erroneous vectorized pdf values.')
@@ -4,6 +4,7 @@ from __future__ import print_function, division
 import bayesloop as bl
 import numpy as np
 import sympy.stats as stats
+import pytest
 
 
 class TestOneParameterModel:
@@ -247,6 +248,209 @@ class TestTwoParameterModel:
         np.testing.assert_almost_equal(S.logEvidence, -14.3305753098, decimal=5,
                                        err_msg='Erroneous log-evidence value.')
 
+    def test_fit_variances(self):
+        # carry out fit
+        S = bl.Study()
+        S.loadData(np.array([1, 2, 3, 4, 5]))
+        S.setOM(bl.om.Gaussian('mean', bl.cint(0, 6, 20), 'sigma', bl.oint(0, 2, 20), prior=lambda m, s: 1/s**3))
+
+        T = bl.tm.CombinedTransitionModel(bl.tm.GaussianRandomWalk('sigma', 0.1, target='mean'),
+                                          bl.tm.RegimeSwitch('log10pMin', -3))
+
+        S.setTM(T)
+        S.fit()
+
+        # test parameter variances
+        np.testing.assert_allclose(S.getParameterVarianceValues('mean'),
+                                   [0.15338906, 0.67804762, 0.64794998, 0.57780176, 0.52330673],
+                                   rtol=1e-05, err_msg='Erroneous posterior variances.')
+
+        # test parameter standard deviations
+        np.testing.assert_allclose(S.getParameterStdValues('sigma'),
+                                   [0.25654213, 0.43943535, 0.41924655, 0.39351776, 0.44850412],
+                                   rtol=1e-05, err_msg='Erroneous posterior standard deviations.')
+
+    def test_fit_quantiles(self):
+        # carry out fit
+        S = bl.Study()
+        S.loadData(np.array([1, 2, 3, 4, 5]))
+        S.setOM(bl.om.Gaussian('mean', bl.cint(0, 6, 20), 'sigma', bl.oint(0, 2, 20), prior=lambda m, s: 1/s**3))
+
+        T = bl.tm.CombinedTransitionModel(bl.tm.GaussianRandomWalk('sigma', 0.1, target='mean'),
+                                          bl.tm.RegimeSwitch('log10pMin', -3))
+
+        S.setTM(T)
+        S.fit()
+
+        # test quantiles
+        np.testing.assert_allclose(S.getParameterQuantiles('mean', q=[0.05, 0.5, 0.95]),
+                                   [[0.94736842, 1.26315789, 1.26315789, 1.89473684, 3.15789474],
+                                    [0.94736842, 2.21052632, 2.21052632, 2.84210526, 5.05263158],
+                                    [2.21052632, 3.78947368, 3.78947368, 4.42105263, 5.05263158]],
+                                   rtol=1e-05, err_msg='Erroneous quantile values.')
+
+        # test highest-density intervals
+        np.testing.assert_allclose(S.getParameterCredibleIntervals('mean', mass=0.9),
+                                   [[0.94736842, 0.94736842, 1.26315789, 1.89473684, 3.15789474],
+                                    [1.89473684, 3.47368421, 3.78947368, 4.10526316, 5.05263158]],
+                                   rtol=1e-05, err_msg='Erroneous credible interval.')
+
+    def test_fit_no_likelihood_cache(self):
+        # carry out fit (likelihood values are re-computed in backward pass)
+        S = bl.Study(likelihoodCacheSize=0)
+        S.loadData(np.array([1, 2, 3, 4, 5]))
+        S.setOM(bl.om.Gaussian('mean', bl.cint(0, 6, 20), 'sigma', bl.oint(0, 2, 20), prior=lambda m, s: 1/s**3))
+
+        T = bl.tm.CombinedTransitionModel(bl.tm.GaussianRandomWalk('sigma', 0.1, target='mean'),
+                                          bl.tm.RegimeSwitch('log10pMin', -3))
+
+        S.setTM(T)
+        S.fit()
+
+        # test parameter distributions
+        np.testing.assert_allclose(S.getParameterDistributions('mean', density=False)[1][:, 5],
+                                   [0.02976422, 0.15404218, 0.10859567, 0.02553673, 0.00054109],
+                                   rtol=1e-05, err_msg='Erroneous posterior distribution values.')
+
+        # test model evidence value
+        np.testing.assert_almost_equal(S.logEvidence, -14.3305753098, decimal=5,
+                                       err_msg='Erroneous log-evidence value.')
+
+    def test_fit_marginals_only(self):
+        # carry out fit (only marginal distributions are stored)
+        S = bl.Study(marginalsOnly=True)
+        S.loadData(np.array([1, 2, 3, 4, 5]))
+        S.setOM(bl.om.Gaussian('mean', bl.cint(0, 6, 20), 'sigma', bl.oint(0, 2, 20), prior=lambda m, s: 1/s**3))
+
+        T = bl.tm.CombinedTransitionModel(bl.tm.GaussianRandomWalk('sigma', 0.1, target='mean'),
+                                          bl.tm.RegimeSwitch('log10pMin', -3))
+
+        S.setTM(T)
+        S.fit()
+
+        assert len(S.posteriorSequence) == 0
+
+        # test parameter distributions
+        np.testing.assert_allclose(S.getParameterDistributions('mean', density=False)[1][:, 5],
+                                   [0.02976422, 0.15404218, 0.10859567, 0.02553673, 0.00054109],
+                                   rtol=1e-05, err_msg='Erroneous posterior distribution values.')
+
+        # test parameter mean values
+        np.testing.assert_allclose(S.getParameterMeanValues('mean'),
+                                   [1.08288559, 2.24388932, 2.38033179, 2.98934128, 4.64547841],
+                                   rtol=1e-05, err_msg='Erroneous posterior mean values.')
+
+        # test model evidence value
+        np.testing.assert_almost_equal(S.logEvidence, -14.3305753098, decimal=5,
+                                       err_msg='Erroneous log-evidence value.')
+
+    def test_fit_checkpoints(self):
+        # carry out reference fit
+        S = bl.Study()
+        S.loadData(np.array([1, 2, 3, 4, 5]))
+        S.setOM(bl.om.Gaussian('mean', bl.cint(0, 6, 20), 'sigma', bl.oint(0, 2, 20), prior=lambda m, s: 1/s**3))
+
+        T = bl.tm.CombinedTransitionModel(bl.tm.GaussianRandomWalk('sigma', 0.1, target='mean'),
+                                          bl.tm.RegimeSwitch('log10pMin', -3))
+
+        S.setTM(T)
+        S.fit()
+
+        # carry out fit (forward distributions are only stored at checkpoints, joint posterior is passed to callback)
+        posteriors = {}
+
+        def callback(t, posterior):
+            posteriors[t] = posterior.copy()
+
+        S2 = bl.Study(marginalsOnly=True, checkpointInterval=2, posteriorCallback=callback)
+        S2.loadData(np.array([1, 2, 3, 4, 5]))
+        S2.setOM(bl.om.Gaussian('mean', bl.cint(0, 6, 20), 'sigma', bl.oint(0, 2, 20), prior=lambda m, s: 1/s**3))
+        S2.setTM(T)
+        S2.fit()
+
+        # test joint posterior distributions
+        np.testing.assert_allclose([posteriors[t] for t in S2.formattedTimestamps], S.posteriorSequence,
+                                   rtol=1e-10, err_msg='Erroneous posterior distribution values.')
+
+        # test parameter distributions
+        np.testing.assert_allclose(S2.getParameterDistributions('mean', density=False)[1][:, 5],
+                                   [0.02976422, 0.15404218, 0.10859567, 0.02553673, 0.00054109],
+                                   rtol=1e-05, err_msg='Erroneous posterior distribution values.')
+
+        # test model evidence value
+        np.testing.assert_almost_equal(S2.logEvidence, -14.3305753098, decimal=5,
+                                       err_msg='Erroneous log-evidence value.')
+
+        # checkpoints are only supported if joint distributions are not stored
+        S3 = bl.Study(checkpointInterval=2, posteriorCallback=callback)
+        S3.loadData(np.array([1, 2, 3, 4, 5]))
+        S3.setOM(bl.om.Gaussian('mean', bl.cint(0, 6, 20), 'sigma', bl.oint(0, 2, 20), prior=lambda m, s: 1/s**3))
+        S3.setTM(T)
+        with pytest.raises(bl.exceptions.ConfigurationError):
+            S3.fit()
+
+    def test_fit_float32(self):
+        # carry out fit in single precision
+        S = bl.Study(dtype=np.float32)
+        S.loadData(np.array([1, 2, 3, 4, 5]))
+        S.setOM(bl.om.Gaussian('mean', bl.cint(0, 6, 20), 'sigma', bl.oint(0, 2, 20), prior=lambda m, s: 1/s**3))
+
+        T = bl.tm.CombinedTransitionModel(bl.tm.GaussianRandomWalk('sigma', 0.1, target='mean'),
+                                          bl.tm.RegimeSwitch('log10pMin', -3))
+
+        S.setTM(T)
+        S.fit()
+
+        assert S.posteriorSequence.dtype == np.float32
+
+        # test parameter distributions
+        np.testing.assert_allclose(S.getParameterDistributions('mean', density=False)[1][:, 5],
+                                   [0.02976422, 0.15404218, 0.10859567, 0.02553673, 0.00054109],
+                                   rtol=1e-05, err_msg='Erroneous posterior distribution values.')
+
+        # test model evidence value
+        np.testing.assert_almost_equal(S.logEvidence, -14.3305753098, decimal=5,
+                                       err_msg='Erroneous log-evidence value.')
+
+    def test_fit_log_space(self):
+        # carry out fit in log-space
+        S = bl.Study(logSpace=True)
+        S.loadData(np.array([1, 2, 3, 4, 5]))
+        S.setOM(bl.om.Gaussian('mean', bl.cint(0, 6, 20), 'sigma', bl.oint(0, 2, 20), prior=lambda m, s: 1/s**3))
+
+        T = bl.tm.CombinedTransitionModel(bl.tm.GaussianRandomWalk('sigma', 0.1, target='mean'),
+                                          bl.tm.RegimeSwitch('log10pMin', -3))
+
+        S.setTM(T)
+        S.fit()
+
+        # test parameter distributions
+        np.testing.assert_allclose(S.getParameterDistributions('mean', density=False)[1][:, 5],
+                                   [0.02976422, 0.15404218, 0.10859567, 0.02553673, 0.00054109],
+                                   rtol=1e-05, err_msg='Erroneous posterior distribution values.')
+
+        # test model evidence value
+        np.testing.assert_almost_equal(S.logEvidence, -14.3305753098, decimal=5,
+                                       err_msg='Erroneous log-evidence value.')
+
+    def test_fit_log_space_underflow(self):
+        # likelihood of single data points underflows in linear space
+        S = bl.Study(logSpace=True)
+        S.loadData(np.array([1000, 1010, 990, 1005, 995]))
+        S.setOM(bl.om.Poisson('rate', bl.oint(0, 50, 1000)))
+        S.setTM(bl.tm.Static())
+        S.fit()
+
+        # test model evidence value
+        np.testing.assert_almost_equal(S.logEvidence, -10262.967684, decimal=5,
+                                       err_msg='Erroneous log-evidence value.')
+
+        # posterior distribution piles up at upper parameter boundary
+        np.testing.assert_allclose(np.sum(S.posteriorSequence, axis=1), 1., rtol=1e-10,
+                                   err_msg='Erroneous posterior distribution values.')
+        np.testing.assert_array_equal(np.argmax(S.posteriorSequence, axis=1), 999,
+                                      err_msg='Erroneous posterior distribution values.')
+
     def test_fit_prior_array(self):
         # carry out fit
         S = bl.Study()